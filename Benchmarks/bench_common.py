@@ -0,0 +1,147 @@
+"""
+Shared helpers for the FusedFilamentDesign benchmarks.
+
+The benchmarks need a FreeCAD installation and are meant to be run through
+FreeCADCmd from the root of the addon, e.g.:
+
+    FreeCADCmd Benchmarks/sketch_batch.py
+"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ADDON_DIR not in sys.path:
+    sys.path.insert(0, ADDON_DIR)
+
+import FreeCAD as App
+import Part
+
+
+def make_circle_grid_sketch(container, name: str, count: int, *, pitch: float = 10.0, diameter: float = 3.0):
+    """Create a sketch with `count` circles laid out on a square grid."""
+    if container.TypeId == "PartDesign::Body":
+        sketch = container.newObject("Sketcher::SketchObject", name)
+    else:
+        sketch = container.addObject("Sketcher::SketchObject", name)
+
+    columns = max(1, int(count**0.5 + 0.999))
+    circles = []
+    for i in range(count):
+        center = App.Vector((i % columns) * pitch, (i // columns) * pitch, 0)
+        circles.append(Part.Circle(center, App.Vector(0, 0, 1), diameter / 2))
+    sketch.addGeometry(circles, False)
+    sketch.recompute()
+    return sketch
+
+
+def make_point_grid_sketch(container, name: str, count: int, *, pitch: float = 10.0):
+    """Create a sketch with `count` points laid out on a square grid."""
+    sketch = container.newObject("Sketcher::SketchObject", name)
+
+    columns = max(1, int(count**0.5 + 0.999))
+    points = [Part.Point(App.Vector((i % columns) * pitch, (i // columns) * pitch, 0)) for i in range(count)]
+    sketch.addGeometry(points, False)
+    sketch.recompute()
+    return sketch
+
+
+def make_hole_body(
+    doc,
+    count: int,
+    *,
+    pitch: float = 10.0,
+    thread_size: str = "M3",
+    depth: float = 6.0,
+    counterbore: bool = False,
+):
+    """
+    Create a body with a box-shaped base and a threaded Hole feature drilled
+    from the top face at `count` positions.  With `counterbore`, the Hole gets
+    a plain counterbore.
+    """
+    body = doc.addObject("PartDesign::Body", "Body")
+
+    columns = max(1, int(count**0.5 + 0.999))
+    rows = max(1, (count + columns - 1) // columns)
+    height = depth * 2
+
+    box = body.newObject("PartDesign::AdditiveBox", "Base")
+    box.Length = columns * pitch
+    box.Width = rows * pitch
+    box.Height = height
+    box.Placement.Base = App.Vector(-pitch / 2, -pitch / 2, 0)
+
+    xy_plane = next(f for f in body.Origin.OriginFeatures if f.Role == "XY_Plane")
+    profile = make_circle_grid_sketch(body, "HoleProfile", count, pitch=pitch)
+    profile.AttachmentSupport = [(xy_plane, "")]
+    profile.MapMode = "FlatFace"
+    profile.AttachmentOffset = App.Placement(App.Vector(0, 0, height), App.Rotation())
+
+    hole = body.newObject("PartDesign::Hole", "Hole")
+    hole.Profile = profile
+    hole.Threaded = True
+    hole.ThreadType = "ISOMetricProfile"
+    hole.ThreadSize = thread_size
+    hole.DepthType = "Dimension"
+    hole.Depth = depth
+    if counterbore:
+        hole.HoleCutType = "Counterbore"
+        hole.HoleCutDiameter = pitch * 0.6
+        hole.HoleCutDepth = depth / 3
+    profile.Visibility = False
+
+    doc.recompute()
+    return body, hole
+
+
+def document_stats(doc) -> dict:
+    """Object count, expression count and saved file size of a document."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.FCStd")
+        doc.saveAs(path)
+        size = os.path.getsize(path)
+    expressions = sum(len(obj.ExpressionEngine) for obj in doc.Objects)
+    return {"objects": len(doc.Objects), "expressions": expressions, "file_size": size}
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in kB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        # Reported in bytes instead of kB
+        peak //= 1024
+    return peak
+
+
+def time_full_recompute(doc) -> float:
+    """Touch every object and measure a full recompute of the document."""
+    for obj in doc.Objects:
+        obj.touch()
+    with Stopwatch() as sw:
+        doc.recompute()
+    return sw.elapsed
+
+
+def time_touched_recompute(obj) -> float:
+    """Touch a single object and measure the recompute of everything depending on it."""
+    obj.Document.recompute()
+    obj.touch()
+    with Stopwatch() as sw:
+        obj.Document.recompute()
+    return sw.elapsed
+
+
+class Stopwatch:
+    """Context manager measuring the wall time of its body in seconds."""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.elapsed = None
+        return self
+
+    def __exit__(self, *args):
+        self.elapsed = time.perf_counter() - self.start
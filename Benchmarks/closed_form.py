@@ -0,0 +1,81 @@
+"""
+Benchmark the closed-form sketches of the hole tools against the solved ones.
+
+For each tool, a 500 circle Hole gets its derived sketches once in the default
+mode, where each block of geometry is a small constraint system solved by the
+sketcher, and once in closed-form mode, where every vertex is placed by its
+own expression.  Generation time, the time to solve the derived sketches and
+the recompute after touching the Hole are reported.
+
+    FreeCADCmd Benchmarks/closed_form.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import App, Stopwatch, make_hole_body, time_touched_recompute
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import counterbore_bridges, roof_bridge, teardrop
+
+COUNT = 500
+
+TOOLS = {
+    "teardrop": lambda body, hole, closed_form: teardrop.make_teardrops(
+        body, hole, "120 deg", "90 deg", closed_form=closed_form
+    ),
+    "roof_bridge": lambda body, hole, closed_form: roof_bridge.make_roof_bridges(
+        body,
+        hole,
+        angle="45 deg",
+        rotation="90 deg",
+        do_counterbore=True,
+        bridge_clearance="0.2 mm",
+        closed_form=closed_form,
+    ),
+    "counterbore_bridges": lambda body, hole, closed_form: counterbore_bridges.make_upside_down_counterbores(
+        body, hole, closed_form=closed_form
+    ),
+}
+
+
+def run(tool: str, closed_form: bool) -> dict:
+    doc = App.newDocument("ClosedFormBenchmark")
+    try:
+        body, hole = make_hole_body(doc, COUNT, counterbore=True)
+        with Stopwatch() as generate:
+            with Utils.DeferredRecompute(doc):
+                TOOLS[tool](body, hole, closed_form)
+        doc.recompute()
+
+        profile_sketch = Utils.get_hole_profile_sketch(hole)
+        sketches = [
+            obj
+            for obj in body.Group
+            if obj.TypeId == "Sketcher::SketchObject" and obj is not profile_sketch and len(obj.Geometry) > 0
+        ]
+        with Stopwatch() as solve:
+            for sketch in sketches:
+                sketch.solve()
+
+        return {
+            "generate": generate.elapsed,
+            "solve": solve.elapsed,
+            "recompute": time_touched_recompute(hole),
+        }
+    finally:
+        App.closeDocument(doc.Name)
+
+
+def main():
+    print(f"{'tool':>20} {'mode':>12} {'generate [s]':>13} {'solve [s]':>10} {'recompute [s]':>14}")
+    for tool in TOOLS:
+        for closed_form, mode in [(False, "solved"), (True, "closed-form")]:
+            r = run(tool, closed_form)
+            print(f"{tool:>20} {mode:>12} {r['generate']:>13.3f} {r['solve']:>10.3f} {r['recompute']:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
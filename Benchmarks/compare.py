@@ -0,0 +1,71 @@
+"""
+Compare two result files of the scaling benchmark.
+
+Prints the ratio new/old of every metric and flags the ones that grew beyond
+the threshold.  Exits with a non-zero status if there is any regression, so it
+can gate a CI job.  Does not need FreeCAD:
+
+    python Benchmarks/compare.py old.json new.json --threshold 1.25
+"""
+
+import argparse
+import json
+import sys
+
+METRICS = ["generate", "recompute", "recompute_touched", "objects", "expressions", "peak_rss", "file_size"]
+
+# Timings below this many seconds are too noisy to compare
+MIN_SECONDS = 0.05
+
+
+def load_results(path: str):
+    with open(path) as f:
+        data = json.load(f)
+    return {(r["tool"], r["count"]): r for r in data["results"]}, data.get("revision", "unknown")
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog="compare.py")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.25, help="ratio new/old counted as a regression")
+    args = parser.parse_args(argv)
+
+    old, old_revision = load_results(args.old)
+    new, new_revision = load_results(args.new)
+    print(f"old: {old_revision}\nnew: {new_revision}\n")
+
+    regressions = 0
+    print(f"{'tool':>20} {'count':>6} " + " ".join(f"{m:>10}" for m in METRICS))
+    for key in sorted(set(old) & set(new)):
+        a, b = old[key], new[key]
+        if "error" in a or "error" in b:
+            print(f"{key[0]:>20} {key[1]:>6} {'failed in ' + ('old' if 'error' in a else 'new'):>10}")
+            regressions += "error" in b
+            continue
+
+        cells = []
+        for metric in METRICS:
+            if metric not in a or metric not in b:
+                # Result files of older revisions lack newer metrics
+                cells.append(f"{'-':>10}")
+                continue
+            if metric in ["generate", "recompute", "recompute_touched"] and max(a[metric], b[metric]) < MIN_SECONDS:
+                cells.append(f"{'-':>10}")
+                continue
+            ratio = b[metric] / a[metric] if a[metric] else float("inf")
+            flag = "!" if ratio > args.threshold else " "
+            regressions += ratio > args.threshold
+            cells.append(f"{ratio:>9.2f}{flag}")
+        print(f"{key[0]:>20} {key[1]:>6} " + " ".join(cells))
+
+    missing = sorted(set(old) ^ set(new))
+    if len(missing) > 0:
+        print(f"\nOnly in one of the files: {', '.join(f'{tool}/{count}' for tool, count in missing)}")
+
+    print(f"\n{regressions} regressions above {args.threshold:.2f}x")
+    return 1 if regressions > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,49 @@
+"""
+Benchmark the compound rib thread profile against one shape-binder per circle.
+
+For each circle count, thread forming ribs are generated once with the
+compound profile (one link array and one shape-binder) and once with the
+per-circle shape-binders which are merged afterwards.  Object count, saved file
+size and the time of a full document recompute are reported.
+
+    FreeCADCmd Benchmarks/rib_threads_profile.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import App, document_stats, make_hole_body, time_full_recompute
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core.rib_parameters import RIB_PARAMETERS
+from ffDesign_Core.rib_threads import make_rib_threads
+
+COUNTS = [10, 100, 200]
+
+
+def run(count: int, compound_profile: bool) -> dict:
+    doc = App.newDocument("RibThreadsBenchmark")
+    try:
+        body, hole = make_hole_body(doc, count, thread_size="M3")
+        with Utils.DeferredRecompute(doc):
+            make_rib_threads(body, hole, True, RIB_PARAMETERS["M3"], compound_profile=compound_profile)
+
+        result = document_stats(doc)
+        result["recompute"] = time_full_recompute(doc)
+        return result
+    finally:
+        App.closeDocument(doc.Name)
+
+
+def main():
+    print(f"{'circles':>8} {'mode':>10} {'objects':>8} {'file [kB]':>10} {'recompute [s]':>14}")
+    for count in COUNTS:
+        for compound_profile, mode in [(False, "per-circle"), (True, "compound")]:
+            r = run(count, compound_profile)
+            print(f"{count:>8} {mode:>10} {r['objects']:>8} {r['file_size'] / 1024:>10.1f} {r['recompute']:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
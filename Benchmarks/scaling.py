@@ -0,0 +1,199 @@
+"""
+Scaling benchmark for every hole tool and the zip tie channels.
+
+Each tool is run against a synthetic body whose Hole profile (or reference
+sketch) holds 1, 10, 100 and 1000 circles (points).  Every case runs in its
+own process so the peak RSS belongs to that case alone.  For each case, the
+generation time, the time of a full document recompute, the time of the
+recompute after touching the Hole (or sketch) alone, the object and
+expression counts, the peak RSS and the saved file size are recorded.
+
+    FreeCADCmd Benchmarks/scaling.py --pass --output results.json
+
+Compare two result files, e.g. from two commits, with `compare.py`.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import (
+    ADDON_DIR,
+    App,
+    Stopwatch,
+    document_stats,
+    make_hole_body,
+    make_point_grid_sketch,
+    peak_rss,
+    time_full_recompute,
+    time_touched_recompute,
+)
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core.counterbore_bridges import make_upside_down_counterbores
+from ffDesign_Core.rib_parameters import RIB_PARAMETERS
+from ffDesign_Core.rib_threads import make_rib_threads
+from ffDesign_Core.roof_bridge import make_roof_bridges
+from ffDesign_Core.teardrop import make_teardrops
+from ffDesign_Core.zip_tie_channels import make_zip_tie_channels_from_sketch
+
+COUNTS = [1, 10, 100, 1000]
+
+
+def setup_hole(doc, count: int, *, counterbore: bool = False):
+    return make_hole_body(doc, count, thread_size="M3", counterbore=counterbore)
+
+
+def setup_zip_tie_sketch(doc, count: int):
+    body, _ = make_hole_body(doc, count, thread_size="M3")
+    xy_plane = next(f for f in body.Origin.OriginFeatures if f.Role == "XY_Plane")
+    sketch = make_point_grid_sketch(body, "ZipTiePoints", count)
+    sketch.AttachmentSupport = [(xy_plane, "")]
+    sketch.MapMode = "FlatFace"
+    sketch.AttachmentOffset = App.Placement(App.Vector(0, 0, 6), App.Rotation())
+    doc.recompute()
+    return body, sketch
+
+
+# Each case: (setup, generate)
+CASES = {
+    "teardrop": (
+        setup_hole,
+        lambda body, hole: make_teardrops(body, hole, angle="120 deg", rotation="90 deg"),
+    ),
+    "roof_bridge": (
+        setup_hole,
+        lambda body, hole: make_roof_bridges(
+            body, hole, angle="45 deg", rotation="90 deg", do_counterbore=False, bridge_clearance="0.2 mm"
+        ),
+    ),
+    "teardrop_fast": (
+        setup_hole,
+        lambda body, hole: make_teardrops(body, hole, angle="120 deg", rotation="90 deg", fast=True),
+    ),
+    "roof_bridge_fast": (
+        setup_hole,
+        lambda body, hole: make_roof_bridges(
+            body, hole, angle="45 deg", rotation="90 deg", do_counterbore=False, bridge_clearance="0.2 mm", fast=True
+        ),
+    ),
+    "counterbore_bridges": (
+        lambda doc, count: setup_hole(doc, count, counterbore=True),
+        make_upside_down_counterbores,
+    ),
+    "rib_threads_local": (
+        setup_hole,
+        lambda body, hole: make_rib_threads(body, hole, False, RIB_PARAMETERS["M3"]),
+    ),
+    "rib_threads_global": (
+        setup_hole,
+        lambda body, hole: make_rib_threads(body, hole, True, RIB_PARAMETERS["M3"]),
+    ),
+    "zip_tie_channels": (
+        setup_zip_tie_sketch,
+        lambda body, sketch: make_zip_tie_channels_from_sketch(
+            body, sketch, width="3.5 mm", thickness="1.5 mm", bridge_dia="2.5 mm"
+        ),
+    ),
+}
+
+
+def run_case(name: str, count: int) -> dict:
+    setup, generate = CASES[name]
+
+    doc = App.newDocument("ScalingBenchmark")
+    try:
+        body, feature = setup(doc, count)
+        objects_before = len(doc.Objects)
+
+        with Stopwatch() as sw:
+            with Utils.DeferredRecompute(doc):
+                generate(body, feature)
+
+        result = {"tool": name, "count": count, "generate": sw.elapsed}
+        result["recompute"] = time_full_recompute(doc)
+        result["recompute_touched"] = time_touched_recompute(feature)
+        result.update(document_stats(doc))
+        result["generated_objects"] = result["objects"] - objects_before
+        result["peak_rss"] = peak_rss()
+        return result
+    finally:
+        App.closeDocument(doc.Name)
+
+
+def run_case_in_worker(name: str, count: int, connection):
+    try:
+        connection.send(run_case(name, count))
+    except Exception as e:
+        connection.send({"tool": name, "count": count, "error": f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
+
+
+def run_isolated(name: str, count: int) -> dict:
+    """Run one case in a fresh forked process."""
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=run_case_in_worker, args=(name, count, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = {"tool": name, "count": count, "error": f"worker died with exit code {process.exitcode}"}
+    process.join()
+    return result
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ADDON_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv: list):
+    parser = argparse.ArgumentParser(prog="scaling.py")
+    parser.add_argument("--output", default="scaling.json", help="JSON file to write the results to")
+    parser.add_argument("--tools", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--counts", nargs="+", type=int, default=COUNTS)
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'tool':>20} {'count':>6} {'generate [s]':>13} {'recompute [s]':>14} {'objects':>8} {'RSS [MB]':>9}")
+    for name in args.tools:
+        for count in args.counts:
+            r = run_isolated(name, count)
+            results.append(r)
+            if "error" in r:
+                print(f"{name:>20} {count:>6} failed: {r['error']}")
+                continue
+            print(
+                f"{name:>20} {count:>6} {r['generate']:>13.3f} {r['recompute']:>14.3f} "
+                f"{r['objects']:>8} {r['peak_rss'] / 1024:>9.1f}"
+            )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "revision": git_revision(),
+                "freecad": ".".join(App.Version()[:3]),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    # FreeCADCmd hands arguments to scripts after `--pass`
+    if "--pass" in sys.argv:
+        main(sys.argv[sys.argv.index("--pass") + 1 :])
+    else:
+        main(sys.argv[1:])
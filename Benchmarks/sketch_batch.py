@@ -0,0 +1,60 @@
+"""
+Benchmark creating the per-circle teardrop geometry in a derived sketch.
+
+Compares committing each circle on its own, which is what the generators used
+to do, against committing all circles with a single `SketchBatch.commit()`.
+
+    FreeCADCmd Benchmarks/sketch_batch.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import App, Stopwatch, make_circle_grid_sketch
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core.teardrop import make_parametric_teardrop
+
+COUNTS = [10, 100, 1000]
+
+
+def run(count: int, batched: bool) -> float:
+    doc = App.newDocument("SketchBatchBenchmark")
+    try:
+        body = doc.addObject("PartDesign::Body", "Body")
+        profile = make_circle_grid_sketch(body, "Profile", count)
+        derived = body.newObject("Sketcher::SketchObject", "Derived")
+        circles = Utils.SketchGeometry(profile).circles
+
+        with Stopwatch() as sw:
+            batch = Utils.SketchBatch(derived)
+            for index in circles:
+                make_parametric_teardrop(
+                    batch,
+                    x_expr=f"{profile.Name}.Geometry[{index}].Center.x * 1mm",
+                    y_expr=f"{profile.Name}.Geometry[{index}].Center.y * 1mm",
+                    diameter_expr="3 mm",
+                    angle_expr="90 deg",
+                    rotation_expr="90 deg",
+                )
+                if not batched:
+                    batch.commit()
+            if batched:
+                batch.commit()
+        return sw.elapsed
+    finally:
+        App.closeDocument(doc.Name)
+
+
+def main():
+    print(f"{'circles':>8} {'per-circle [s]':>15} {'batched [s]':>12} {'speedup':>8}")
+    for count in COUNTS:
+        before = run(count, batched=False)
+        after = run(count, batched=True)
+        print(f"{count:>8} {before:>15.3f} {after:>12.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
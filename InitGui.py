@@ -1,45 +1,68 @@
+import time
+
+_ffdesign_startup = time.perf_counter()
+
 import FreeCAD
 import FreeCADGui
 
-import ffDesign_HoleWizard
-import ffDesign_CounterboreBridges
-import ffDesign_RibThreads
-import ffDesign_Teardrop
-import ffDesign_RoofBridge
-import ffDesign_ZipTieChannels
+import ffDesign_Commands
 
+# Not through `ffDesign_Utils`, importing it would load Qt and the GUI helpers
+PREFERENCES = "User parameter:BaseApp/Preferences/Mod/FusedFilamentDesign"
 
-def register_pd_toolbar():
-    import ffDesign_Utils as Utils
 
+def log_message(msg: str) -> None:
+    FreeCAD.Console.PrintMessage(f"[FusedFilamentDesign] {msg}\n")
+
+
+def register_pd_toolbar():
     """Register the PrintDesign toolbar in the PartDesign workbench."""
+    PD_TOOLBAR_COMMANDS = [
+        "ffDesign_About",
+        "ffDesign_HoleWizard",
+        "ffDesign_BatchHoles",
+        "ffDesign_ResyncHole",
+        "ffDesign_ZipTieChannels",
+        "ffDesign_RecomputeReport",
+        "ffDesign_OverhangAnalysis",
+        "ffDesign_OrientHoles",
+    ]
+
     pd_toolbars = FreeCAD.ParamGet("User parameter:BaseApp/Workbench/PartDesignWorkbench/Toolbar")
 
     # all_bars = pd_toolbars.GetGroups()
-    # Utils.Log.info(f"All PartDesign Toolbars: {all_bars!r}")
-
-    PD_TOOLBAR_COMMANDS = ["ffDesign_About", "ffDesign_HoleWizard", "ffDesign_ZipTieChannels"]
+    # log_message(f"All PartDesign Toolbars: {all_bars!r}")
 
+    toolbar = None
     for tb_name in pd_toolbars.GetGroups():
         tb = pd_toolbars.GetGroup(tb_name)
         if tb.GetString("Name") == "FusedFilamentDesign":
-            # Install any new commands that we now provide into the existing toolbar
-            missing = [cmd for cmd in PD_TOOLBAR_COMMANDS if tb.GetString(cmd) == ""]
-            if len(missing) > 0:
-                Utils.Log.info(f"Updating toolbar to include new {', '.join(missing)} as well!")
-
-                # First remove them all
-                for s in tb.GetStrings():
-                    if s not in ["Active", "Name"]:
-                        tb.RemString(s)
-
-                # Then add them back
-                for cmd in PD_TOOLBAR_COMMANDS:
-                    tb.SetString(cmd, "ffDesign")
-
+            toolbar = tb
             break
+
+    # The commands of the toolbar only need to be (re-)registered when they
+    # changed since the last launch, or when the user removed the toolbar.
+    stamp = ";".join(PD_TOOLBAR_COMMANDS)
+    prefs = FreeCAD.ParamGet(PREFERENCES)
+    if toolbar is not None and prefs.GetString("ToolbarStamp") == stamp:
+        return
+
+    if toolbar is not None:
+        # Install any new commands that we now provide into the existing toolbar
+        missing = [cmd for cmd in PD_TOOLBAR_COMMANDS if toolbar.GetString(cmd) == ""]
+        if len(missing) > 0:
+            log_message(f"Updating toolbar to include new {', '.join(missing)} as well!")
+
+            # First remove them all
+            for s in toolbar.GetStrings():
+                if s not in ["Active", "Name"]:
+                    toolbar.RemString(s)
+
+            # Then add them back
+            for cmd in PD_TOOLBAR_COMMANDS:
+                toolbar.SetString(cmd, "ffDesign")
     else:
-        Utils.Log.info(f"Registering toolbar into PartDesign workbench...")
+        log_message(f"Registering toolbar into PartDesign workbench...")
 
         # Create the FusedFilamentDesign toolbar
         ff_toolbar = pd_toolbars.GetGroup("ffDesign")
@@ -51,10 +74,15 @@ def register_pd_toolbar():
 
         ff_toolbar.SetBool("Active", 1)
 
+    prefs.SetString("ToolbarStamp", stamp)
+
 
 # Fake workbench class to make the addon manager happy
 class ffDesignWB:
     pass
 
 
+ffDesign_Commands.register_commands()
 register_pd_toolbar()
+
+log_message(f"Addon startup took {(time.perf_counter() - _ffdesign_startup) * 1000:.1f} ms")
@@ -0,0 +1,82 @@
+from PySide import QtCore
+
+import FreeCADGui as Gui
+import FreeCAD as App
+
+import ffDesign_Utils as Utils
+from ffDesign_Core.batch import HOLE_TOOLS, HoleQuery, apply_hole_tool, find_holes
+
+
+class BatchHolesTaskPanel:
+    ORIENTATIONS = [None, "vertical", "horizontal", "oblique"]
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.body = Gui.ActiveDocument.ActiveView.getActiveObject("pdbody")
+        self.form = Utils.Resources.load_panel("ffDesign_BatchHoles.ui")
+
+        for name, tool in HOLE_TOOLS.items():
+            self.form.Tool.addItem(tool.label, name)
+
+        self.form.ScopeBody.setEnabled(self.body is not None)
+        if self.body is not None:
+            self.form.ScopeBody.toggle()
+        else:
+            self.form.ScopeDocument.toggle()
+
+        self.form.ScopeBody.toggled.connect(self.updateMessage)
+        self.form.ThreadSize.textChanged.connect(self.updateMessage)
+        self.form.OnlyThreaded.stateChanged.connect(self.updateMessage)
+        self.form.OnlyCounterbored.stateChanged.connect(self.updateMessage)
+        self.form.Orientation.currentIndexChanged.connect(self.updateMessage)
+
+        self.updateMessage()
+
+    def build_query(self) -> HoleQuery:
+        thread_size = self.form.ThreadSize.text().strip()
+        return HoleQuery(
+            thread_size=thread_size if thread_size != "" else None,
+            threaded=True if self.form.OnlyThreaded.checkState() == QtCore.Qt.CheckState.Checked else None,
+            counterbored=True if self.form.OnlyCounterbored.checkState() == QtCore.Qt.CheckState.Checked else None,
+            orientation=self.ORIENTATIONS[self.form.Orientation.currentIndex()],
+            print_direction=Utils.get_print_direction(),
+        )
+
+    def find_holes(self) -> list:
+        container = self.body if self.form.ScopeBody.isChecked() else self.doc
+        return find_holes(container, self.build_query())
+
+    def updateMessage(self):
+        n_holes = len(self.find_holes())
+        color = "#008000" if n_holes > 0 else "#800000"
+
+        self.form.InfoMessage.setTextFormat(QtCore.Qt.TextFormat.RichText)
+        self.form.InfoMessage.setText(f'<font color="{color}">{n_holes} matching Hole features</font>')
+
+    def accept(self):
+        try:
+            holes = self.find_holes()
+            tool_name = self.form.Tool.currentData()
+            Gui.Control.closeDialog()
+
+            if len(holes) == 0:
+                raise Utils.ffDesignError("No Hole features match the query!")
+
+            apply_hole_tool(self.doc, tool_name, holes)
+        except Utils.ffDesignError as e:
+            e.emit_to_user()
+
+    def reject(self):
+        Gui.Control.closeDialog()
+
+
+class BatchHolesCommand:
+    def Activated(self):
+        try:
+            if not App.ActiveDocument:
+                raise Utils.ffDesignPreconditionError("No active document")
+
+            dialog = BatchHolesTaskPanel(App.ActiveDocument)
+            Gui.Control.showDialog(dialog)
+        except Utils.ffDesignError as e:
+            e.emit_to_user()
@@ -0,0 +1,262 @@
+import importlib
+import os
+
+import FreeCADGui as Gui
+import FreeCAD as App
+
+QT_TRANSLATE_NOOP = App.Qt.QT_TRANSLATE_NOOP
+
+# Not through `ffDesign_Utils.Resources`, importing it would load Qt and the
+# GUI helpers at startup
+ICONS_PATH = os.path.join(os.path.dirname(__file__), "Resources", "icons")
+
+
+class LazyCommand:
+    """
+    Lightweight command proxy which defers importing the module implementing a
+    command until the command is first activated.
+
+    The resources and the activation check are kept in here so FreeCAD can
+    populate toolbars and menus without pulling in PySide, Part and Sketcher
+    for every tool at startup.  Neither may import `ffDesign_Utils`.
+    """
+
+    def __init__(self, module: str, command: str, *, pixmap: str, menu_text: str, tooltip: str, is_active):
+        self.module = module
+        self.command = command
+        self.pixmap = pixmap
+        self.menu_text = menu_text
+        self.tooltip = tooltip
+        self.is_active = is_active
+        self.instance = None
+
+    def load(self):
+        if self.instance is None:
+            module = importlib.import_module(self.module)
+            self.instance = getattr(module, self.command)()
+        return self.instance
+
+    def GetResources(self):
+        return {
+            "Pixmap": os.path.join(ICONS_PATH, self.pixmap),
+            "MenuText": App.Qt.translate("ffDesign", self.menu_text),
+            "ToolTip": App.Qt.translate("ffDesign", self.tooltip),
+        }
+
+    def Activated(self):
+        self.load().Activated()
+
+    def IsActive(self):
+        return self.is_active()
+
+
+def has_active_document() -> bool:
+    return App.ActiveDocument is not None
+
+
+def get_selection(type_id: str) -> list:
+    """
+    The selected objects, or the tip of the active body if nothing is selected,
+    as `ffDesign_Utils.get_selected_holes()` finds them.  Empty unless all of
+    them are of the given type.
+    """
+    if App.ActiveDocument is None or Gui.ActiveDocument is None:
+        return []
+    sel = Gui.Selection.getSelection()
+    if len(sel) == 0:
+        view = Gui.ActiveDocument.ActiveView
+        body = view.getActiveObject("pdbody") if hasattr(view, "getActiveObject") else None
+        if body is not None and body.Tip is not None:
+            sel = [body.Tip]
+    if len(sel) == 0 or any(obj.TypeId != type_id for obj in sel):
+        return []
+    return sel
+
+
+def selected_holes() -> bool:
+    return len(get_selection("PartDesign::Hole")) > 0
+
+
+def selected_hole() -> bool:
+    return len(get_selection("PartDesign::Hole")) == 1
+
+
+def selected_sketch() -> bool:
+    sel = Gui.Selection.getSelection() if App.ActiveDocument is not None else []
+    return len(sel) == 1 and sel[0].TypeId == "Sketcher::SketchObject"
+
+
+def selected_holes_are_threaded() -> bool:
+    holes = get_selection("PartDesign::Hole")
+    return len(holes) > 0 and all(hole.Threaded for hole in holes)
+
+
+def selected_holes_have_counterbore() -> bool:
+    holes = get_selection("PartDesign::Hole")
+    # As `hole_has_counterbore_maybe()`
+    return len(holes) > 0 and all(hole.HoleCutType != "None" for hole in holes)
+
+
+COMMANDS = {
+    "ffDesign_About": LazyCommand(
+        "ffDesign_Utils",
+        "ffDesignAboutCommand",
+        pixmap="ffDesign_Logo.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "FusedFilamentDesign"),
+        tooltip=QT_TRANSLATE_NOOP("ffDesign", "About the FusedFilamentDesign addon."),
+        is_active=lambda: True,
+    ),
+    "ffDesign_HoleWizard": LazyCommand(
+        "ffDesign_HoleWizard",
+        "HoleWizardCommand",
+        pixmap="ffDesign_HoleWizard.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "Hole Wizard"),
+        tooltip=QT_TRANSLATE_NOOP(
+            "ffDesign",
+            "A wizard for adding various FFF 3d-printing geometry to PartDesign Hole features.\n"
+            "1. Select one or more Hole features.\n"
+            "2. Run this command.\n"
+            "3. Select the kind of geometry you want to add in the task panel, or tick several to add them together.",
+        ),
+        is_active=selected_holes,
+    ),
+    "ffDesign_BatchHoles": LazyCommand(
+        "ffDesign_BatchHoles",
+        "BatchHolesCommand",
+        pixmap="ffDesign_HoleWizard.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "Batch Hole Tools"),
+        tooltip=QT_TRANSLATE_NOOP(
+            "ffDesign",
+            "Apply a hole tool to all matching Hole features at once.\n"
+            "1. Optionally activate the body to search in.\n"
+            "2. Run this command.\n"
+            "3. Select the tool and which Hole features to apply it to in the task panel.",
+        ),
+        is_active=has_active_document,
+    ),
+    "ffDesign_RecomputeReport": LazyCommand(
+        "ffDesign_RecomputeReport",
+        "RecomputeReportCommand",
+        pixmap="ffDesign_Logo.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "Recompute Cost Report"),
+        tooltip=QT_TRANSLATE_NOOP(
+            "ffDesign",
+            "Measure how long each object generated by this addon takes to recompute.\n"
+            "1. Run this command.\n"
+            "2. Sort the report by clicking the column headers or export it as CSV.",
+        ),
+        is_active=has_active_document,
+    ),
+    "ffDesign_OverhangAnalysis": LazyCommand(
+        "ffDesign_OverhangAnalysis",
+        "OverhangAnalysisCommand",
+        pixmap="ffDesign_Logo.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "Overhang Analysis"),
+        tooltip=QT_TRANSLATE_NOOP(
+            "ffDesign",
+            "Find the Hole features whose bores overhang when printed along the print direction.\n"
+            "1. Activate the body to analyze.\n"
+            "2. Run this command.\n"
+            "3. Apply the suggested tools to the listed Holes from the task panel.",
+        ),
+        is_active=has_active_document,
+    ),
+    "ffDesign_OrientHoles": LazyCommand(
+        "ffDesign_OrientHoles",
+        "OrientHolesCommand",
+        pixmap="ffDesign_Logo.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "Orient Holes"),
+        tooltip=QT_TRANSLATE_NOOP(
+            "ffDesign",
+            "Point the teardrops and roof bridges of Hole features up along the print direction.\n"
+            "1. Select Hole features, or activate a body to orient all of its Holes.\n"
+            "2. Run this command.",
+        ),
+        is_active=has_active_document,
+    ),
+    "ffDesign_CounterboreBridges": LazyCommand(
+        "ffDesign_CounterboreBridges",
+        "CounterboreBridgesCommand",
+        pixmap="ffDesign_CounterboreBridges.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "Add counterbore bridges"),
+        tooltip=QT_TRANSLATE_NOOP(
+            "ffDesign",
+            "Add bridges to a counterbored Hole so it can be printed upside down.\n"
+            "1. Select one or more Hole features.\n"
+            "2. The Hole must have a counterbore of some kind.\n"
+            "3. Run this command.\n",
+        ),
+        is_active=selected_holes_have_counterbore,
+    ),
+    "ffDesign_RibThreads": LazyCommand(
+        "ffDesign_RibThreads",
+        "RibThreadsCommand",
+        pixmap="ffDesign_RibThreads.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "Add thread forming ribs"),
+        tooltip=QT_TRANSLATE_NOOP(
+            "ffDesign",
+            "Add ribs to a hole that allow a screw to form its own thread.\n"
+            "1. Select one or more Hole features.\n"
+            "2. The Hole must be threaded using a standard thread size.\n"
+            "3. Run this command.\n",
+        ),
+        is_active=selected_holes_are_threaded,
+    ),
+    "ffDesign_Teardrop": LazyCommand(
+        "ffDesign_Teardrop",
+        "TeardropCommand",
+        pixmap="ffDesign_Teardrop.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "Add teardrop shape"),
+        tooltip=QT_TRANSLATE_NOOP(
+            "ffDesign",
+            "Add a teardrop shape to a hole to avoid a steep overhang.\n"
+            "1. Select one or more Hole features.\n"
+            "2. Run this command.\n",
+        ),
+        is_active=selected_holes,
+    ),
+    "ffDesign_RoofBridge": LazyCommand(
+        "ffDesign_RoofBridge",
+        "RoofBridgeCommand",
+        pixmap="ffDesign_RoofBridge.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "Add roof bridge"),
+        tooltip=QT_TRANSLATE_NOOP(
+            "ffDesign",
+            "Add a roof bridge to a hole to avoid a steep overhang.\n"
+            "1. Select one or more Hole features.\n"
+            "2. Run this command.\n",
+        ),
+        is_active=selected_holes,
+    ),
+    "ffDesign_ResyncHole": LazyCommand(
+        "ffDesign_ResyncHole",
+        "ResyncHoleCommand",
+        pixmap="ffDesign_HoleWizard.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "Resynchronize Hole"),
+        tooltip=QT_TRANSLATE_NOOP(
+            "ffDesign",
+            "Update the generated features of a Hole after circles were added to or removed from its sketch.\n"
+            "1. Select a Hole feature in the active body.\n"
+            "2. Run this command.\n",
+        ),
+        is_active=selected_hole,
+    ),
+    "ffDesign_ZipTieChannels": LazyCommand(
+        "ffDesign_ZipTieChannels",
+        "ZipTieChannelsCommand",
+        pixmap="ffDesign_ZipTieChannels.svg",
+        menu_text=QT_TRANSLATE_NOOP("ffDesign", "Add zip tie channels"),
+        tooltip=QT_TRANSLATE_NOOP(
+            "ffDesign",
+            "Add zip tie channels for easily fastening wires to a part.\n"
+            "1. Select a reference sketch which has points marking the locations of the zip tie channels.\n"
+            "2. Run this command.\n",
+        ),
+        is_active=selected_sketch,
+    ),
+}
+
+
+def register_commands():
+    for name, command in COMMANDS.items():
+        Gui.addCommand(name, command)
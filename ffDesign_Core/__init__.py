@@ -0,0 +1,8 @@
+"""
+GUI-free core of FusedFilamentDesign.
+
+The generators in this package only operate on the document and must not
+import FreeCADGui or PySide, so they can run under FreeCADCmd and in worker
+processes without a display.  The ffDesign_* modules next to this package are
+the GUI layer on top.
+"""
@@ -0,0 +1,202 @@
+import dataclasses
+import typing
+
+import FreeCAD as App
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import counterbore_bridges, orientation, rib_threads, roof_bridge, teardrop
+from ffDesign_Core.rib_parameters import RIB_PARAMETERS, canonical_thread_size
+
+
+@dataclasses.dataclass
+class HoleQuery:
+    """
+    Selects Hole features by their properties.  Criteria that are `None` match
+    any hole.
+    """
+
+    thread_size: typing.Optional[str] = None
+    threaded: typing.Optional[bool] = None
+    counterbored: typing.Optional[bool] = None
+    # One of "vertical", "horizontal" or "oblique"
+    orientation: typing.Optional[str] = None
+    print_direction: App.Vector = dataclasses.field(default_factory=Utils.get_print_direction)
+    # Name of a hole tool whose treatments the Hole must not have yet
+    untreated_by: typing.Optional[str] = None
+
+    def matches(self, hole) -> bool:
+        if self.threaded is not None and bool(hole.Threaded) != self.threaded:
+            return False
+        if self.thread_size is not None:
+            if not hole.Threaded or canonical_thread_size(hole.ThreadSize) != canonical_thread_size(self.thread_size):
+                return False
+        if self.counterbored is not None and Utils.hole_has_counterbore_sure(hole) != self.counterbored:
+            return False
+        if self.untreated_by is not None and len(Utils.get_treatments(hole, self.untreated_by)) > 0:
+            return False
+        if self.orientation is not None:
+            try:
+                orientation = Utils.get_hole_orientation(hole, self.print_direction)
+            except Utils.ffDesignError:
+                return False
+            if orientation != self.orientation:
+                return False
+        return True
+
+
+def find_holes(container, query: HoleQuery) -> list:
+    """Find all Hole features in a body or a whole document matching the query."""
+    if container.TypeId == "PartDesign::Body":
+        objects = container.Group
+    else:
+        objects = container.Objects
+    return [obj for obj in objects if obj.TypeId == "PartDesign::Hole" and query.matches(obj)]
+
+
+def check_counterbore_bridges(hole):
+    # As the command: Holes which may have a counterbore are treated with a
+    # warning, instead of asking for every single one
+    if not Utils.hole_has_counterbore_maybe(hole):
+        raise Utils.ffDesignError(f"{hole.Label} does not have a counterbore.")
+    if not Utils.hole_has_counterbore_sure(hole):
+        Utils.Log.warning(f"{hole.Label} does not seem to have a known counterbore type.")
+
+
+def apply_counterbore_bridges(body, hole, params: dict, merged_holes: list):
+    counterbore_bridges.make_upside_down_counterbores(
+        body, hole, closed_form=params.get("closed_form", False), merged_holes=merged_holes, confirm=False
+    )
+
+
+def check_rib_threads(hole):
+    rib_threads.verify_rib_thread_suitability(hole)
+    if hole.ThreadSize not in RIB_PARAMETERS:
+        raise Utils.ffDesignError(f"No default rib parameters for {hole.ThreadSize} of {hole.Label}.")
+
+
+def apply_rib_threads(body, hole, params: dict, merged_holes: list):
+    rib_param = RIB_PARAMETERS[hole.ThreadSize]
+    rib_threads.make_rib_threads(
+        body, hole, params.get("global_template", True), rib_param, use_library=params.get("template_library")
+    )
+
+
+def tool_rotation(hole, params: dict) -> str:
+    """
+    The `rotation` param, or else the rotation pointing up along the
+    `print_direction` param (default: `Utils.get_print_direction`).
+    """
+    if "rotation" in params:
+        return params["rotation"]
+    print_direction = App.Vector(*params["print_direction"]) if "print_direction" in params else None
+    return orientation.hole_tool_rotation(hole, print_direction)
+
+
+def apply_roof_bridge(body, hole, params: dict, merged_holes: list):
+    roof_bridge.make_roof_bridges(
+        body,
+        hole,
+        angle=params.get("angle", "45 deg"),
+        rotation=tool_rotation(hole, params),
+        do_counterbore=params.get("do_counterbore", False),
+        bridge_clearance=params.get("bridge_clearance", "0.2 mm"),
+        fast=params.get("fast", False),
+        closed_form=params.get("closed_form", False),
+        merged_holes=merged_holes,
+    )
+
+
+def apply_teardrop(body, hole, params: dict, merged_holes: list):
+    teardrop.make_teardrops(
+        body,
+        hole,
+        angle=params.get("angle", "120 deg"),
+        rotation=tool_rotation(hole, params),
+        fast=params.get("fast", False),
+        closed_form=params.get("closed_form", False),
+        merged_holes=merged_holes,
+    )
+
+
+@dataclasses.dataclass
+class HoleTool:
+    label: str
+    apply: typing.Callable
+    check: typing.Optional[typing.Callable] = None
+    uses_shapebinders: bool = False
+    # Key of the Holes which can share generated sketches and pockets
+    merge_key: typing.Optional[typing.Callable] = None
+
+
+HOLE_TOOLS = {
+    "teardrop": HoleTool("Teardrop shape", apply_teardrop, merge_key=teardrop.merge_key),
+    "roof_bridge": HoleTool("Roof bridge", apply_roof_bridge, merge_key=roof_bridge.merge_key),
+    "counterbore_bridges": HoleTool(
+        "Counterbore bridges",
+        apply_counterbore_bridges,
+        check_counterbore_bridges,
+        merge_key=counterbore_bridges.merge_key,
+    ),
+    "rib_threads": HoleTool("Thread forming ribs", apply_rib_threads, check_rib_threads, uses_shapebinders=True),
+}
+
+
+def apply_tool_to_holes(tool: HoleTool, holes: list, params: dict):
+    """
+    Apply a hole tool to suitable holes, without a transaction or recompute of
+    its own.  With the `merge` parameter, compatible Holes of a body share the
+    generated sketches and pockets (see `Utils.group_mergeable_holes`).
+    """
+    if params.get("merge", False) and tool.merge_key is not None:
+        groups = Utils.group_mergeable_holes(holes, tool.merge_key)
+    else:
+        groups = [(hole.getParent(), [hole]) for hole in holes]
+
+    for body, group in groups:
+        tool.apply(body, group[0], params, group[1:])
+
+
+def tool_uses_shapebinders(tool: HoleTool, params: dict) -> bool:
+    # The fast mode of the tools cuts through a shape-binder as well
+    return tool.uses_shapebinders or params.get("fast", False)
+
+
+def apply_hole_tool(doc, tool_name: str, holes: list, params: typing.Optional[dict] = None) -> list:
+    """
+    Apply a hole tool to all given holes in one transaction with a single
+    recompute.
+
+    Holes which are not suitable for the tool are skipped with a warning.
+    Returns the list of treated holes.
+    """
+    tool = HOLE_TOOLS[tool_name]
+    params = params or {}
+
+    suitable = []
+    for hole in holes:
+        try:
+            if tool.check is not None:
+                tool.check(hole)
+            suitable.append(hole)
+        except Utils.ffDesignError as e:
+            Utils.Log.warning(f"Skipping {hole.Label}: {e.message}")
+
+    if len(suitable) == 0:
+        return suitable
+
+    use_transaction = not tool_uses_shapebinders(tool, params) or Utils.undo_shapebinder_is_safe()
+    try:
+        if use_transaction:
+            doc.openTransaction(f"Add {tool.label.lower()} to {len(suitable)} holes")
+        with Utils.Log.command(f"Add {tool.label.lower()} to {len(suitable)} holes", doc):
+            with Utils.DeferredRecompute(doc):
+                apply_tool_to_holes(tool, suitable, params)
+        if use_transaction:
+            doc.commitTransaction()
+    except Exception as e:
+        if use_transaction:
+            doc.abortTransaction()
+        raise e from None
+
+    Utils.Log.info(f"Added {tool.label.lower()} to {len(suitable)} holes.")
+    return suitable
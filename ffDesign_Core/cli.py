@@ -0,0 +1,198 @@
+"""
+Apply hole tools to a whole directory of parts.
+
+Run through FreeCADCmd, e.g.:
+
+    FreeCADCmd ffDesign_Core/cli.py --pass parts/ rules.json --jobs 8
+
+The rules file is a JSON document listing which tool to apply to which holes:
+
+    {
+        "rules": [
+            {"tool": "teardrop", "query": {"orientation": "horizontal"}},
+            {"tool": "rib_threads", "query": {"thread_size": "M3"}},
+            {"tool": "rib_threads", "query": {"thread_size": "M4"}, "params": {"global_template": false}}
+        ]
+    }
+
+Queries take the fields of `HoleQuery`, tools are the keys of `HOLE_TOOLS`.
+One JSON line is reported per file with its timing and any failure.
+"""
+
+import argparse
+import concurrent.futures
+import dataclasses
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ADDON_DIR not in sys.path:
+    sys.path.insert(0, ADDON_DIR)
+
+import FreeCAD as App
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import batch, template_library
+
+
+def make_query(query: dict) -> batch.HoleQuery:
+    fields = {field.name for field in dataclasses.fields(batch.HoleQuery)}
+    unknown = set(query) - fields
+    if len(unknown) > 0:
+        raise Utils.ffDesignError(f"Unknown query fields {', '.join(sorted(unknown))}", dialog=False)
+
+    query = dict(query)
+    if "print_direction" in query:
+        query["print_direction"] = App.Vector(*query["print_direction"])
+    return batch.HoleQuery(**query)
+
+
+def load_rules(path: str) -> list:
+    with open(path) as f:
+        rules = json.load(f)["rules"]
+
+    for rule in rules:
+        if rule.get("tool") not in batch.HOLE_TOOLS:
+            raise Utils.ffDesignError(f"Unknown hole tool {rule.get('tool')!r} in {path}", dialog=False)
+        # Only for validation, workers build their own queries
+        make_query(rule.get("query", {}))
+    return rules
+
+
+def without_template_library(rules: list) -> list:
+    """
+    Let rib threads build their global templates in each part instead of
+    linking them from the template library.
+
+    Parallel workers would each create and save the library document at the
+    same time and lose each other's templates.
+    """
+    use_library = template_library.use_template_library()
+    adapted = []
+    for rule in rules:
+        params = rule.get("params", {})
+        if rule["tool"] == "rib_threads" and params.get("template_library", use_library):
+            rule = {**rule, "params": {**params, "template_library": False}}
+        adapted.append(rule)
+    if adapted != rules:
+        Utils.Log.warning("The template library is not used with several jobs, run with --jobs 1 to use it.")
+    return adapted
+
+
+def error_report(path: str, message: str) -> dict:
+    return {"file": path, "status": "error", "holes": {}, "error": message}
+
+
+def find_part_files(directory: str) -> list:
+    files = []
+    for root, _, names in os.walk(directory):
+        files += [os.path.join(root, name) for name in names if name.lower().endswith(".fcstd")]
+    return sorted(files)
+
+
+def process_file(path: str, rules: list, output_path) -> dict:
+    """Apply all rules to one part and save it.  Runs inside a worker process."""
+    start = time.perf_counter()
+    report = {"file": path, "status": "ok", "holes": {}}
+
+    try:
+        doc = App.openDocument(path, hidden=True)
+        try:
+            with Utils.Log.command(f"Treat {os.path.basename(path)}", doc):
+                for rule in rules:
+                    holes = batch.find_holes(doc, make_query(rule.get("query", {})))
+                    treated = batch.apply_hole_tool(doc, rule["tool"], holes, rule.get("params"))
+                    report["holes"][rule["tool"]] = report["holes"].get(rule["tool"], 0) + len(treated)
+
+            if output_path is None:
+                doc.save()
+            else:
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                doc.saveAs(output_path)
+        finally:
+            App.closeDocument(doc.Name)
+    except Utils.ffDesignError as e:
+        report.update(status="error", error=e.message)
+    except Exception as e:
+        report.update(status="error", error=f"{type(e).__name__}: {e}")
+
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def parse_args(argv: list):
+    parser = argparse.ArgumentParser(prog="ffDesign_Core/cli.py", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", help="directory searched recursively for .FCStd files")
+    parser.add_argument("rules", help="JSON file with the rules to apply")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--output-dir", help="save treated parts here instead of overwriting them")
+    parser.add_argument("--report", help="write the JSON lines to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: list) -> int:
+    args = parse_args(argv)
+    try:
+        rules = load_rules(args.rules)
+    except (OSError, KeyError, ValueError, Utils.ffDesignError) as e:
+        Utils.Log.error(f"Cannot load rules: {getattr(e, 'message', e)}")
+        return 2
+    files = find_part_files(args.directory)
+    jobs = max(1, args.jobs)
+    if jobs > 1:
+        rules = without_template_library(rules)
+
+    def output_path(path):
+        if args.output_dir is None:
+            return None
+        return os.path.join(args.output_dir, os.path.relpath(path, args.directory))
+
+    # Workers are forked so each one inherits an initialized FreeCAD instance.
+    # FreeCADCmd cannot be used as the interpreter of spawned workers.
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+
+    report_file = open(args.report, "w") if args.report else sys.stdout
+    failures = 0
+    start = time.perf_counter()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            futures = {pool.submit(process_file, path, rules, output_path(path)): path for path in files}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    report = future.result()
+                except Exception as e:
+                    # E.g. a worker crashed in FreeCAD, which breaks the pool
+                    # and fails all files not processed yet
+                    report = error_report(futures[future], f"{type(e).__name__}: {e}")
+                if report["status"] != "ok":
+                    failures += 1
+                report_file.write(json.dumps(report) + "\n")
+                report_file.flush()
+
+        summary = {
+            "summary": True,
+            "files": len(files),
+            "failures": failures,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        report_file.write(json.dumps(summary) + "\n")
+    finally:
+        if report_file is not sys.stdout:
+            report_file.close()
+
+    return 1 if failures > 0 else 0
+
+
+if __name__ == "__main__":
+    # FreeCADCmd hands arguments to scripts after `--pass`
+    if "--pass" in sys.argv:
+        argv = sys.argv[sys.argv.index("--pass") + 1 :]
+    else:
+        argv = sys.argv[1:]
+    sys.exit(main(argv))
@@ -0,0 +1,223 @@
+import math
+import typing
+
+import FreeCAD as App
+import Part
+import Sketcher
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import merge_keys, outline_math
+
+
+def make_parametric_square(batch: Utils.SketchBatch, x_expr: str, y_expr: str, half_size_expr: str):
+    new_geo = [
+        Part.LineSegment(App.Vector(-1, 1, 0), App.Vector(1, 1, 0)),
+        Part.LineSegment(App.Vector(1, 1, 0), App.Vector(1, -1, 0)),
+        Part.LineSegment(App.Vector(1, -1, 0), App.Vector(-1, -1, 0)),
+        Part.LineSegment(App.Vector(-1, -1, 0), App.Vector(-1, 1, 0)),
+    ]
+    last_geo_id = batch.add_geometry(new_geo)
+    new_constraints = [
+        Sketcher.Constraint("Coincident", last_geo_id + 0, 2, last_geo_id + 1, 1),
+        Sketcher.Constraint("Coincident", last_geo_id + 1, 2, last_geo_id + 2, 1),
+        Sketcher.Constraint("Coincident", last_geo_id + 2, 2, last_geo_id + 3, 1),
+        Sketcher.Constraint("Coincident", last_geo_id + 3, 2, last_geo_id + 0, 1),
+        Sketcher.Constraint("Horizontal", last_geo_id + 0),
+        Sketcher.Constraint("Horizontal", last_geo_id + 2),
+        Sketcher.Constraint("Vertical", last_geo_id + 1),
+        Sketcher.Constraint("Vertical", last_geo_id + 3),
+    ]
+    batch.add_constraints(new_constraints)
+    new_constraints = [
+        Sketcher.Constraint("DistanceX", last_geo_id + 0, 1, -1),
+        Sketcher.Constraint("DistanceY", last_geo_id + 0, 1, 1),
+        Sketcher.Constraint("DistanceX", last_geo_id + 2, 1, 1),
+        Sketcher.Constraint("DistanceY", last_geo_id + 2, 1, -1),
+    ]
+    last_c = batch.add_constraints(new_constraints)
+    batch.set_expression(last_c + 0, f"{x_expr} - {half_size_expr}")
+    batch.set_expression(last_c + 1, f"{y_expr} + {half_size_expr}")
+    batch.set_expression(last_c + 2, f"{x_expr} + {half_size_expr}")
+    batch.set_expression(last_c + 3, f"{y_expr} - {half_size_expr}")
+
+
+def make_parametric_y_cutout(
+    batch: Utils.SketchBatch, x_expr: str, y_expr: str, half_inner_expr: str, y_offset_expr: str
+):
+    new_geo = [
+        Part.ArcOfCircle(
+            Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), 1),
+            math.pi / 4 * 1,
+            math.pi / 4 * 3,
+        ),
+        Part.ArcOfCircle(
+            Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), 1),
+            math.pi / 4 * 5,
+            math.pi / 4 * 7,
+        ),
+        Part.LineSegment(App.Vector(-1, 1, 0), App.Vector(-1, -1, 0)),
+        Part.LineSegment(App.Vector(1, 1, 0), App.Vector(1, -1, 0)),
+    ]
+    last_geo_id = batch.add_geometry(new_geo)
+    new_constraints = [
+        Sketcher.Constraint("Coincident", last_geo_id + 0, 1, last_geo_id + 3, 1),
+        Sketcher.Constraint("Coincident", last_geo_id + 0, 2, last_geo_id + 2, 1),
+        Sketcher.Constraint("Coincident", last_geo_id + 1, 1, last_geo_id + 2, 2),
+        Sketcher.Constraint("Coincident", last_geo_id + 1, 2, last_geo_id + 3, 2),
+    ]
+    batch.add_constraints(new_constraints)
+    new_constraints = [
+        Sketcher.Constraint("DistanceX", last_geo_id + 0, 1, 1),
+        Sketcher.Constraint("DistanceX", last_geo_id + 1, 1, 1),
+        Sketcher.Constraint("DistanceX", last_geo_id + 0, 2, 1),
+        Sketcher.Constraint("DistanceX", last_geo_id + 1, 2, 1),
+        Sketcher.Constraint("DistanceY", last_geo_id + 0, 1, 1),
+        Sketcher.Constraint("DistanceY", last_geo_id + 0, 2, 1),
+        Sketcher.Constraint("DistanceY", last_geo_id + 1, 1, -1),
+        Sketcher.Constraint("DistanceY", last_geo_id + 1, 2, -1),
+        Sketcher.Constraint("DistanceY", last_geo_id + 0, 3, 0),
+        Sketcher.Constraint("DistanceY", last_geo_id + 1, 3, 0),
+    ]
+    last_c = batch.add_constraints(new_constraints)
+    batch.set_expression(last_c + 0, f"{x_expr} + {half_inner_expr}")
+    batch.set_expression(last_c + 1, f"{x_expr} - {half_inner_expr}")
+    batch.set_expression(last_c + 2, f"{x_expr} - {half_inner_expr}")
+    batch.set_expression(last_c + 3, f"{x_expr} + {half_inner_expr}")
+    batch.set_expression(last_c + 4, f"{y_expr} + {y_offset_expr}")
+    batch.set_expression(last_c + 5, f"{y_expr} + {y_offset_expr}")
+    batch.set_expression(last_c + 6, f"{y_expr} - {y_offset_expr}")
+    batch.set_expression(last_c + 7, f"{y_expr} - {y_offset_expr}")
+    batch.set_expression(last_c + 8, y_expr)
+    batch.set_expression(last_c + 9, y_expr)
+
+
+def add_y_cutout(batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int):
+    """Add the Y bridges cutout for circle `index` of the Hole's profile sketch."""
+    # Where the sides of the cutout meet the counterbore
+    y_offset_expr = digest.quantity(
+        "BridgeOffset", f"sqrt(({hole.Name}.HoleCutDiameter / 2)^2 - ({hole.Name}.Diameter / 2)^2)"
+    )
+    make_parametric_y_cutout(batch, digest.x(index), digest.y(index), digest.half_diameter(), y_offset_expr)
+
+
+def add_x_square(batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int):
+    """Add the X bridges cutout for circle `index` of the Hole's profile sketch."""
+    make_parametric_square(batch, digest.x(index), digest.y(index), digest.half_diameter())
+
+
+def add_y_cutout_closed_form(batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int):
+    """Closed-form variant of `add_y_cutout`, with every vertex placed by its own expression."""
+    y_offset_expr = digest.quantity(
+        "BridgeOffset", f"sqrt(({hole.Name}.HoleCutDiameter / 2)^2 - ({hole.Name}.Diameter / 2)^2)"
+    )
+    radius_expr = digest.quantity("HalfCutDiameter", f"{hole.Name}.HoleCutDiameter / 2")
+    half = digest.half_diameter()
+    x, y = digest.x(index), digest.y(index)
+
+    center = digest.geometry.center(index)
+    radius = hole.HoleCutDiameter.Value / 2
+    half_value = hole.Diameter.Value / 2
+    offset = outline_math.bridge_offset(radius, half_value)
+    circle = Part.Circle(center, App.Vector(0, 0, 1), radius)
+
+    def vertex(sx: int, sy: int) -> tuple:
+        point = center + App.Vector(sx * half_value, sy * offset, 0)
+        x_expr = f"{x} {'+' if sx > 0 else '-'} {half}"
+        y_expr = f"{y} {'+' if sy > 0 else '-'} {y_offset_expr}"
+        return (point, x_expr, y_expr)
+
+    left = Utils.add_fixed_lines(batch, [vertex(-1, 1), vertex(-1, -1)])
+    right = Utils.add_fixed_lines(batch, [vertex(1, -1), vertex(1, 1)])
+    top = Part.ArcOfCircle(circle, math.atan2(offset, half_value), math.atan2(offset, -half_value))
+    bottom = Part.ArcOfCircle(circle, math.atan2(-offset, -half_value), math.atan2(-offset, half_value))
+    Utils.add_hanging_arc(batch, top, (right, 2), (left, 1), radius_expr)
+    Utils.add_hanging_arc(batch, bottom, (left, 2), (right, 1), radius_expr)
+
+
+def add_x_square_closed_form(batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int):
+    """Closed-form variant of `add_x_square`, with every vertex placed by its own expression."""
+    half = digest.half_diameter()
+    x, y = digest.x(index), digest.y(index)
+    center = digest.geometry.center(index)
+    half_value = hole.Diameter.Value / 2
+    Utils.add_fixed_lines(
+        batch,
+        [
+            (center + App.Vector(sx * half_value, sy * half_value, 0), f"{x} {ox} {half}", f"{y} {oy} {half}")
+            for sx, sy, ox, oy in [(-1, 1, "-", "+"), (1, 1, "+", "+"), (1, -1, "+", "-"), (-1, -1, "-", "-")]
+        ],
+        closed=True,
+    )
+
+
+# Holes with the same key can share the generated sketches and pockets, see
+# `Utils.group_mergeable_holes`
+merge_key = merge_keys.counterbore_bridges_merge_key
+
+
+@Utils.Log.timed
+def make_upside_down_counterbores(
+    body, hole, *, closed_form: bool = False, merged_holes: typing.Sequence = (), confirm: bool = True
+):
+    """
+    Cut the cutouts for bridges inside the counterbores of a Hole, so it can
+    be printed upside down.
+
+    With `closed_form`, every vertex of the cutouts is placed by its own
+    expression, leaving the sketch solver next to nothing to solve.
+
+    The cutouts of `merged_holes` are cut by the same sketches and pockets.
+    These Holes must be compatible with `hole`, see `merge_key`.
+
+    Holes without a known counterbore type need a confirmation, unless
+    `confirm` is False because the caller already warned about them.
+    """
+    Utils.assert_body(body)
+    Utils.assert_hole(hole)
+
+    holes = [hole, *merged_holes]
+    for h in holes:
+        if confirm and not Utils.hole_has_counterbore_sure(h):
+            Utils.warning_confirm_proceed(f"{h.Label} does not seem to have a known counterbore type.")
+
+    profile_sketch = Utils.get_hole_profile_sketch(hole)
+
+    sketch_bridges_y = Utils.make_derived_sketch(body, profile_sketch, "_BridgesY")
+    sketch_bridges_x = Utils.make_derived_sketch(body, profile_sketch, "_BridgesX")
+    if closed_form:
+        blocks = [(sketch_bridges_y, add_y_cutout_closed_form), (sketch_bridges_x, add_x_square_closed_form)]
+    else:
+        blocks = [(sketch_bridges_y, add_y_cutout), (sketch_bridges_x, add_x_square)]
+    Utils.fill_derived_sketches(body, holes, blocks, closed_form=closed_form)
+
+    for h in holes:
+        Utils.hole_prepare_layer_height_property(h)
+
+    pocket_bridges_y = body.newObject("PartDesign::Pocket", f"{hole.Name}_BridgesY")
+    pocket_bridges_y.Profile = (sketch_bridges_y, "")
+    pocket_bridges_y.ReferenceAxis = (sketch_bridges_y, ["N_Axis"])
+    pocket_bridges_y.Reversed = hole.Reversed
+    sketch_bridges_y.Visibility = False
+    pocket_bridges_y.setExpression("Length", f"{hole.Name}.HoleCutDepth + {hole.Name}.LayerHeight")
+    pocket_bridges_y.Label = f"{hole.Label}_BridgesY"
+    Utils.recompute(pocket_bridges_y)
+
+    pocket_bridges_x = body.newObject("PartDesign::Pocket", f"{hole.Name}_BridgesX")
+    pocket_bridges_x.Profile = (sketch_bridges_x, "")
+    pocket_bridges_x.ReferenceAxis = (sketch_bridges_x, ["N_Axis"])
+    pocket_bridges_x.Reversed = hole.Reversed
+    sketch_bridges_x.Visibility = False
+    pocket_bridges_x.setExpression("Length", f"{hole.Name}.HoleCutDepth + {hole.Name}.LayerHeight * 2")
+    pocket_bridges_x.Label = f"{hole.Label}_BridgesX"
+    Utils.recompute(pocket_bridges_x)
+
+    Utils.record_treatments(
+        holes,
+        "counterbore_bridges",
+        [
+            (sketch_bridges_y, "_BridgesY"),
+            (pocket_bridges_y, "_BridgesY"),
+            (sketch_bridges_x, "_BridgesX"),
+            (pocket_bridges_x, "_BridgesX"),
+        ],
+    )
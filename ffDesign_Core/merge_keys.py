@@ -0,0 +1,39 @@
+"""
+Keys of Holes whose generated geometry can share one derived sketch and one
+pocket, see `Utils.group_mergeable_holes`.  The keys only read properties of
+the Holes and do not need FreeCAD.
+"""
+
+# Layer height of Holes without a `LayerHeight` property, in mm.  The
+# counterbore bridges give them this one, see
+# `Utils.hole_prepare_layer_height_property`.
+DEFAULT_LAYER_HEIGHT = 0.2
+
+
+def hole_depth_key(hole) -> tuple:
+    """Depth settings of a Hole."""
+    if hole.DepthType == "Dimension":
+        return (hole.DepthType, round(hole.Depth.Value, 6))
+    return (hole.DepthType,)
+
+
+def layer_height(hole) -> float:
+    """Layer height the counterbore bridges of a Hole are made for."""
+    if "LayerHeight" in hole.PropertiesList:
+        return hole.LayerHeight.Value
+    return DEFAULT_LAYER_HEIGHT
+
+
+def teardrop_merge_key(hole) -> tuple:
+    return hole_depth_key(hole)
+
+
+def roof_bridge_merge_key(hole) -> tuple:
+    # As `Utils.hole_has_counterbore_maybe`, the counterbore gets a pocket of its own depth
+    if hole.HoleCutType != "None":
+        return (*hole_depth_key(hole), round(hole.HoleCutDepth.Value, 6))
+    return hole_depth_key(hole)
+
+
+def counterbore_bridges_merge_key(hole) -> tuple:
+    return (round(hole.HoleCutDepth.Value, 6), round(layer_height(hole), 6))
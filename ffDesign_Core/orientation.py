@@ -0,0 +1,115 @@
+import dataclasses
+import typing
+
+import numpy as np
+
+import FreeCAD as App
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import orientation_math, resync
+
+# Hole properties holding the rotation of the generated shapes in the profile
+# sketch, by the tool adding them
+ROTATION_PROPERTIES = {
+    "teardrop": "TeardropRotation",
+    "roof_bridge": "RoofBridgeRotation",
+}
+
+# Rotation used for vertical Holes, which have no up direction in their
+# profile sketch
+DEFAULT_ROTATION = "90 deg"
+
+
+@dataclasses.dataclass
+class HoleOrientation:
+    hole: typing.Any
+    # Angle between the axis of the Hole and the print direction, 0° to 90°
+    tilt: float
+    # "vertical", "horizontal" or "oblique", as `Utils.get_hole_orientation`
+    orientation: str
+    # Direction in the profile sketch pointing up in the print, in degrees.
+    # `None` for vertical Holes.
+    rotation: typing.Optional[float]
+
+    @property
+    def tool_rotation(self) -> str:
+        """Rotation for the tip of teardrops and roof bridges to point up in the print."""
+        if self.rotation is None:
+            return DEFAULT_ROTATION
+        return f"{self.rotation} deg"
+
+
+def rotation_matrix(rotation: App.Rotation) -> list:
+    m = rotation.toMatrix()
+    return [[m.A11, m.A12, m.A13], [m.A21, m.A22, m.A23], [m.A31, m.A32, m.A33]]
+
+
+def classify_holes(holes: list, print_direction: typing.Optional[App.Vector] = None, tolerance: float = 1.0) -> list:
+    """
+    Classify Holes as `Utils.get_hole_orientation` does and find the rotation
+    pointing up in the print in their profile sketches, for all Holes at once.
+
+    The print direction defaults to `Utils.get_print_direction`.  The
+    tolerance is given in degrees.
+    """
+    if len(holes) == 0:
+        return []
+    if print_direction is None:
+        print_direction = Utils.get_print_direction()
+
+    rotations = np.array(
+        [rotation_matrix(Utils.get_hole_profile_sketch(hole).getGlobalPlacement().Rotation) for hole in holes]
+    )
+    direction = (print_direction.x, print_direction.y, print_direction.z)
+    tilts, orientations, angles = orientation_math.classify_axes(rotations, direction, tolerance)
+
+    return [
+        HoleOrientation(hole, float(tilt), str(orientation), None if orientation == "vertical" else float(angle))
+        for hole, tilt, orientation, angle in zip(holes, tilts, orientations, angles)
+    ]
+
+
+def hole_tool_rotation(hole, print_direction: typing.Optional[App.Vector] = None) -> str:
+    """Rotation for the teardrops or roof bridges of a single Hole, see `classify_holes`."""
+    return classify_holes([hole], print_direction)[0].tool_rotation
+
+
+@Utils.Log.timed
+def orient_holes(holes: list, print_direction: typing.Optional[App.Vector] = None, tolerance: float = 1.0) -> tuple:
+    """
+    Point the teardrops and roof bridges of all Holes up in the print, by
+    writing their `TeardropRotation` and `RoofBridgeRotation`.
+
+    The static profiles of Holes treated in fast mode do not follow these
+    properties and are rebuilt, see `resync.resync_static_profile`.  Vertical
+    Holes and Holes without these tools are left alone.  Returns the
+    classification of every Hole and the Holes whose rotation changed.
+    """
+    orientations = classify_holes(holes, print_direction, tolerance)
+    changed = []
+    rotated_tools = {}
+    for orientation in orientations:
+        if orientation.rotation is None:
+            continue
+        hole = orientation.hole
+        for tool, prop in ROTATION_PROPERTIES.items():
+            if prop not in hole.PropertiesList:
+                continue
+            # Compare as angles, 0° and 360° are the same
+            difference = (getattr(hole, prop).Value - orientation.rotation + 180) % 360 - 180
+            if abs(difference) > 1e-6:
+                setattr(hole, prop, orientation.tool_rotation)
+                rotated_tools.setdefault(hole.Name, set()).add(tool)
+                if hole not in changed:
+                    changed.append(hole)
+
+    # Holes merged into one pocket share their static profile
+    rebuilt = set()
+    for hole in changed:
+        body = hole.getParent()
+        by_name = "Treatments" not in hole.PropertiesList
+        for profile, suffix in resync.find_static_profiles(body, hole, by_name=by_name):
+            if resync.DERIVED_SKETCH_TOOLS[suffix] in rotated_tools[hole.Name] and profile.Name not in rebuilt:
+                resync.resync_static_profile(body, profile, suffix)
+                rebuilt.add(profile.Name)
+    return orientations, changed
@@ -0,0 +1,31 @@
+"""
+Vectorized classification of Hole axes, see `orientation.classify_holes`.
+Rotations are given as numpy matrices, this does not need FreeCAD.
+"""
+
+import numpy as np
+
+
+def classify_axes(rotations: np.ndarray, print_direction, tolerance: float = 1.0) -> tuple:
+    """
+    Tilt of the axis of each profile sketch against the print direction, in
+    degrees, its orientation and the direction in the sketch pointing up in
+    the print, in degrees from 0° to 360°.
+
+    `rotations` holds the rotation matrices of the profile sketches, shaped
+    `(n, 3, 3)`.  The tolerance is given in degrees.
+    """
+    rotations = np.asarray(rotations, dtype=float).reshape(-1, 3, 3)
+    direction = np.asarray(print_direction, dtype=float)
+    direction = direction / np.linalg.norm(direction)
+
+    # The axis of a Hole is the normal of its profile sketch
+    axes = rotations[:, :, 2]
+    tilts = np.degrees(np.arccos(np.clip(np.abs(axes @ direction), 0, 1)))
+    orientations = np.where(tilts <= tolerance, "vertical", np.where(tilts >= 90 - tolerance, "horizontal", "oblique"))
+
+    # The print direction in the coordinates of each profile sketch, its
+    # projection onto the sketch plane points up
+    local = np.einsum("nji,j->ni", rotations, direction)
+    angles = np.round(np.mod(np.degrees(np.arctan2(local[:, 1], local[:, 0])), 360), 6) % 360
+    return tilts, orientations, angles
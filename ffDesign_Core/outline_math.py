@@ -0,0 +1,64 @@
+"""
+Closed-form outlines of the teardrops, roof bridges and counterbore bridges.
+
+The vertices are given as offsets from the circle center, along (`u`) and
+across (`v`) the direction the tip points to, as `Utils.ProfileDigest.offset`
+places them.  Angles are given in radians.  This is plain math without
+FreeCAD, shared by the closed-form sketches and the fast mode.
+"""
+
+import math
+
+# Roof bridges whose roof is closer to the tip than this have no roof left
+TIP_TOLERANCE = 1e-7
+
+
+def rotate_offset(offset: tuple, rotation: float) -> tuple:
+    """X and Y of an offset `(u, v)` with `u` pointing in the direction `rotation`."""
+    u, v = offset
+    return (u * math.cos(rotation) - v * math.sin(rotation), u * math.sin(rotation) + v * math.cos(rotation))
+
+
+def teardrop_offsets(radius: float, angle: float) -> dict:
+    """
+    Vertices of a teardrop with the full opening `angle` at its tip.  The
+    flanks touch the circle where they are perpendicular to its radius.
+    """
+    half_angle = angle / 2
+    return {
+        "Start": (radius * math.sin(half_angle), radius * math.cos(half_angle)),
+        "End": (radius * math.sin(half_angle), -radius * math.cos(half_angle)),
+        "Tip": (radius / math.sin(half_angle), 0.0),
+    }
+
+
+def roof_bridge_tip_distance(radius: float, angle: float) -> float:
+    """Distance of the tip the flanks would meet in, for the overhang `angle`."""
+    return radius / math.sin(angle)
+
+
+def roof_reaches_tip(radius: float, angle: float, clearance: float) -> bool:
+    """Whether the roof is at or beyond the tip, leaving no roof line between the flanks."""
+    return radius + clearance >= roof_bridge_tip_distance(radius, angle) - TIP_TOLERANCE
+
+
+def roof_bridge_offsets(radius: float, angle: float, clearance: float) -> dict:
+    """
+    Vertices of a roof bridge with the overhang `angle`.  The flat roof cuts
+    off the tip at `clearance` above the circle, its corners sit on the
+    flanks.  A clearance beyond the tip leaves the tip, both roof corners are
+    then the same point.
+    """
+    roof = min(radius + clearance, roof_bridge_tip_distance(radius, angle))
+    corner = (radius - roof * math.sin(angle)) / math.cos(angle)
+    return {
+        "Start": (radius * math.sin(angle), radius * math.cos(angle)),
+        "End": (radius * math.sin(angle), -radius * math.cos(angle)),
+        "RoofStart": (roof, -corner),
+        "RoofEnd": (roof, corner),
+    }
+
+
+def bridge_offset(cut_radius: float, radius: float) -> float:
+    """Distance from the center at which the sides of a counterbore bridge cutout meet the counterbore."""
+    return math.sqrt(max(cut_radius**2 - radius**2, 0))
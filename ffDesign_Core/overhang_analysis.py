@@ -0,0 +1,217 @@
+import dataclasses
+import math
+import typing
+
+import numpy as np
+
+import FreeCAD as App
+import Part
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import orientation, overhang_math, pipeline
+from ffDesign_Core.overhang_math import Tessellation
+
+# Tessellations by `shape_key`.  Only a few are kept, while editing the
+# analysis is repeated on the same few shapes.
+CACHE_SIZE = 4
+tessellation_cache = {}
+
+# Parameters of the tools applied by `apply_suggestions`
+SUGGESTION_PARAMS = {
+    "teardrop": {"angle": "120 deg", "merge": True},
+    "roof_bridge": {"angle": "45 deg", "bridge_clearance": "0.2 mm", "do_counterbore": True, "merge": True},
+    "counterbore_bridges": {"merge": True},
+}
+
+
+@dataclasses.dataclass
+class HoleOverhang:
+    hole: typing.Any
+    # Overhanging area of the bores of the Hole, in mm²
+    area: float
+    # Hole tool suggested to get rid of the overhang, `None` if no tool helps
+    tool: typing.Optional[str]
+
+
+@dataclasses.dataclass
+class OverhangAnalysis:
+    # Holes with overhangs, largest overhanging area first
+    holes: list
+    # Overhanging area of the whole shape and of faces not belonging to a Hole, in mm²
+    total_area: float
+    other_area: float
+
+
+def shape_key(shape, faces: list, deflection: float) -> tuple:
+    """
+    Key of a shape in the tessellation cache.  The hash changes whenever the
+    shape is recomputed, the bounding box and face count guard against a hash
+    being reused for a different shape.
+    """
+    box = shape.BoundBox
+    return (shape.hashCode(), len(faces), box.XMin, box.YMin, box.ZMin, box.XMax, box.YMax, box.ZMax, deflection)
+
+
+def tessellate_faces(faces: list, deflection: float) -> Tessellation:
+    points = []
+    triangles = []
+    face_indices = []
+    n_points = 0
+    for index, face in enumerate(faces):
+        face_points, face_triangles = face.tessellate(deflection)
+        if len(face_triangles) == 0:
+            continue
+        points.append(np.array([(p.x, p.y, p.z) for p in face_points], dtype=float))
+        triangles.append(np.array(face_triangles, dtype=np.int64) + n_points)
+        face_indices.append(np.full(len(face_triangles), index, dtype=np.int64))
+        n_points += len(face_points)
+
+    if len(triangles) == 0:
+        return overhang_math.empty_tessellation()
+
+    tessellation = overhang_math.facets(np.concatenate(points), np.concatenate(triangles), np.concatenate(face_indices))
+    Utils.Log.count("tessellated facets", len(tessellation.areas))
+    return tessellation
+
+
+def get_tessellation(shape, faces: list, deflection: float) -> Tessellation:
+    """
+    Tessellation of a shape, cached by `shape_key`.  `faces` are the faces of
+    the shape, `shape.Faces` builds a new list on every access.
+    """
+    key = shape_key(shape, faces, deflection)
+    tessellation = tessellation_cache.pop(key, None)
+    if tessellation is None:
+        with Utils.Log.span("tessellate", f"{len(faces)} faces"):
+            tessellation = tessellate_faces(faces, deflection)
+        while len(tessellation_cache) >= CACHE_SIZE:
+            # Evict the least recently used one
+            del tessellation_cache[next(iter(tessellation_cache))]
+    tessellation_cache[key] = tessellation
+    return tessellation
+
+
+def hole_bore_axes(holes: list) -> tuple:
+    """
+    Axis of every bore of the Holes in global coordinates, as arrays of their
+    origins and directions, plus the index of the Hole of each bore.
+    """
+    origins = []
+    directions = []
+    hole_indices = []
+    for k, hole in enumerate(holes):
+        profile_sketch = Utils.get_hole_profile_sketch(hole)
+        placement = profile_sketch.getGlobalPlacement()
+        axis = placement.Rotation.multVec(App.Vector(0, 0, 1))
+        geometry = Utils.SketchGeometry(profile_sketch)
+        for index in geometry.circles:
+            origin = placement.multVec(geometry.center(index))
+            origins.append((origin.x, origin.y, origin.z))
+            directions.append((axis.x, axis.y, axis.z))
+            hole_indices.append(k)
+    return (
+        np.array(origins, dtype=float).reshape(-1, 3),
+        np.array(directions, dtype=float).reshape(-1, 3),
+        np.array(hole_indices, dtype=np.int64),
+    )
+
+
+def match_face_to_bore(face, origins: np.ndarray, directions: np.ndarray, tolerance: float = 0.01):
+    """Index of the bore whose axis is the axis of a cylindrical or conical face, or `None`."""
+    surface = face.Surface
+    if not isinstance(surface, (Part.Cylinder, Part.Cone)):
+        return None
+    center = (surface.Center.x, surface.Center.y, surface.Center.z)
+    axis = (surface.Axis.x, surface.Axis.y, surface.Axis.z)
+    return overhang_math.nearest_bore(center, axis, origins, directions, tolerance)
+
+
+def suggested_tool(hole, orientation: str) -> typing.Optional[str]:
+    """
+    Teardrops and roof bridges only help bores printed on their side, counterbore
+    bridges only counterbores printed along their axis.  There is nothing to
+    suggest for the drill point of a vertical Hole or for oblique Holes.
+    """
+    if orientation == "horizontal":
+        # Only roof bridges also treat the counterbore
+        return "roof_bridge" if Utils.hole_has_counterbore_maybe(hole) else "teardrop"
+    if orientation == "vertical" and Utils.hole_has_counterbore_sure(hole):
+        return "counterbore_bridges"
+    return None
+
+
+@Utils.Log.timed
+def analyze_overhangs(
+    body,
+    *,
+    print_direction: App.Vector = App.Vector(0, 0, 1),
+    angle: App.Units.Quantity = "45 deg",
+    deflection: float = 0.05,
+) -> OverhangAnalysis:
+    """
+    Find the Holes of a body whose bores overhang by more than `angle` when
+    printed along `print_direction`.
+
+    The shape of the body is tessellated once and cached, so repeated analyses
+    of an unchanged body only redo the vectorized overhang test.  The
+    suggested tool depends on the orientation of each Hole, see
+    `suggested_tool`.  Holes already treated by one of these tools are left
+    out.
+    """
+    Utils.assert_body(body)
+    angle = App.Units.Quantity(angle)
+    assert angle.Unit.Type == "Angle"
+
+    shape = body.Shape
+    if shape.isNull():
+        raise Utils.ffDesignError(f"{body.Label} has no shape to analyze.")
+
+    faces = shape.Faces
+    tessellation = get_tessellation(shape, faces, deflection)
+    with Utils.Log.span("overhang test", f"{len(tessellation.areas)} facets"):
+        direction = (print_direction.x, print_direction.y, print_direction.z)
+        overhanging = overhang_math.overhanging_facets(tessellation, direction, math.radians(angle.Value))
+        face_areas = overhang_math.face_areas(tessellation, overhanging, len(faces))
+
+    holes = [
+        obj
+        for obj in body.Group
+        if obj.TypeId == "PartDesign::Hole"
+        and not any(len(Utils.get_treatments(obj, tool)) > 0 for tool in SUGGESTION_PARAMS)
+    ]
+    origins, directions, hole_indices = hole_bore_axes(holes)
+    hole_areas = np.zeros(len(holes))
+    with Utils.Log.span("map to holes"):
+        for face_index in np.nonzero(face_areas > 0)[0]:
+            bore = match_face_to_bore(faces[face_index], origins, directions)
+            if bore is not None:
+                hole_areas[hole_indices[bore]] += face_areas[face_index]
+
+    orientations = orientation.classify_holes(holes, print_direction)
+    overhangs = [
+        HoleOverhang(hole, float(area), suggested_tool(hole, o.orientation))
+        for hole, area, o in zip(holes, hole_areas, orientations)
+        if area > 0
+    ]
+    overhangs.sort(key=lambda overhang: overhang.area, reverse=True)
+    total_area = float(face_areas.sum())
+    return OverhangAnalysis(overhangs, total_area, total_area - float(hole_areas.sum()))
+
+
+def apply_suggestions(doc, overhangs: list, *, print_direction: App.Vector = App.Vector(0, 0, 1)):
+    """
+    Apply the suggested tool to each Hole in one transaction, see
+    `pipeline.run_pipeline`.  Holes without a suggestion are skipped.  The
+    teardrops and roof bridges are rotated to point up along
+    `print_direction`.
+    """
+    steps = []
+    for name in pipeline.PIPELINE_ORDER:
+        holes = [overhang.hole for overhang in overhangs if overhang.tool == name]
+        if len(holes) > 0:
+            steps.append((name, holes))
+    direction = [print_direction.x, print_direction.y, print_direction.z]
+    params = {name: dict(params) for name, params in SUGGESTION_PARAMS.items()}
+    for name in pipeline.OVERHANG_TOOLS:
+        params[name]["print_direction"] = direction
+    pipeline.run_pipeline(doc, pipeline.PipelinePlan(steps, []), params)
@@ -0,0 +1,82 @@
+"""
+Vectorized overhang test on tessellated faces, see
+`overhang_analysis.analyze_overhangs`.  Points and directions are numpy
+arrays, this does not need FreeCAD.
+"""
+
+import dataclasses
+import math
+
+import numpy as np
+
+
+@dataclasses.dataclass
+class Tessellation:
+    # Per facet: centroid, unit outward normal, area and the index of its face
+    centroids: np.ndarray
+    normals: np.ndarray
+    areas: np.ndarray
+    faces: np.ndarray
+
+
+def empty_tessellation() -> Tessellation:
+    return Tessellation(np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0), np.zeros(0, dtype=np.int64))
+
+
+def facets(points: np.ndarray, triangles: np.ndarray, faces: np.ndarray) -> Tessellation:
+    """
+    Tessellation of the `triangles`, given as indices into `points`, with the
+    index of the face of each triangle.  Degenerate facets have no normal and
+    are left out.
+    """
+    v0, v1, v2 = points[triangles[:, 0]], points[triangles[:, 1]], points[triangles[:, 2]]
+    cross = np.cross(v1 - v0, v2 - v0)
+    doubled_area = np.linalg.norm(cross, axis=1)
+    valid = doubled_area > 1e-12
+    return Tessellation(
+        centroids=((v0 + v1 + v2) / 3)[valid],
+        normals=cross[valid] / doubled_area[valid, np.newaxis],
+        areas=doubled_area[valid] / 2,
+        faces=faces[valid],
+    )
+
+
+def overhanging_facets(tessellation: Tessellation, print_direction, angle: float) -> np.ndarray:
+    """
+    Mask of the facets overhanging by more than `angle` (in radians, from the
+    vertical).  Facets at the very bottom lie on the print bed and do not count.
+    """
+    if len(tessellation.areas) == 0:
+        return np.zeros(0, dtype=bool)
+    direction = np.asarray(print_direction, dtype=float)
+    direction = direction / np.linalg.norm(direction)
+    # Cosine of the angle between each normal and straight down
+    downward = -(tessellation.normals @ direction)
+    heights = tessellation.centroids @ direction
+    on_bed = heights <= heights.min() + 1e-3
+    return (downward > math.sin(angle)) & ~on_bed
+
+
+def face_areas(tessellation: Tessellation, mask: np.ndarray, n_faces: int) -> np.ndarray:
+    """Area of the facets in `mask`, summed up per face."""
+    return np.bincount(tessellation.faces[mask], weights=tessellation.areas[mask], minlength=n_faces)
+
+
+def nearest_bore(center, axis, origins: np.ndarray, directions: np.ndarray, tolerance: float = 0.01):
+    """
+    Index of the bore whose axis, given by `origins` and `directions`, is the
+    axis through `center` along `axis`, or `None`.
+    """
+    if len(origins) == 0:
+        return None
+    center = np.asarray(center, dtype=float)
+    axis = np.asarray(axis, dtype=float)
+
+    parallel = np.abs(directions @ axis) > math.cos(math.radians(1))
+    offset = center - origins
+    # Distance of the axis from each bore axis
+    distance = np.linalg.norm(offset - (offset * directions).sum(axis=1)[:, np.newaxis] * directions, axis=1)
+    candidates = np.nonzero(parallel & (distance < tolerance))[0]
+    if len(candidates) == 0:
+        return None
+    return int(candidates[np.argmin(distance[candidates])])
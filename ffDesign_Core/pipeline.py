@@ -0,0 +1,125 @@
+import dataclasses
+
+import FreeCAD as App
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core.batch import HOLE_TOOLS, apply_tool_to_holes, tool_uses_shapebinders
+
+# Order in which the tools of a pipeline run
+PIPELINE_ORDER = ["counterbore_bridges", "teardrop", "roof_bridge", "rib_threads"]
+
+# Tools shaping the top of a bore printed on its side
+OVERHANG_TOOLS = ["teardrop", "roof_bridge"]
+
+
+@dataclasses.dataclass
+class PipelinePlan:
+    # `(tool_name, holes)` in pipeline order
+    steps: list
+    # Decisions taken while planning, one line each
+    notes: list
+
+    @property
+    def holes(self) -> list:
+        holes = []
+        for _, step_holes in self.steps:
+            holes += [hole for hole in step_holes if hole not in holes]
+        return holes
+
+
+def resolve_conflicts(hole, tool_names: list, print_direction: App.Vector) -> tuple:
+    """
+    Drop the tools which must not be applied to the same Hole together.
+
+    Returns the remaining tool names and a note for each dropped tool.
+    """
+    kept = list(tool_names)
+    notes = []
+
+    if "teardrop" in kept and "roof_bridge" in kept:
+        # A roof bridge is a teardrop with its tip cut off
+        kept.remove("teardrop")
+        notes.append(f"{hole.Label}: Using the roof bridge instead of the teardrop shape.")
+
+    overhang_tools = [name for name in kept if name in OVERHANG_TOOLS]
+    if "counterbore_bridges" in kept and len(overhang_tools) > 0:
+        # Counterbore bridges are for printing along the axis of the Hole,
+        # teardrops and roof bridges for printing it on its side
+        orientation = Utils.get_hole_orientation(hole, print_direction)
+        if orientation == "vertical":
+            for name in overhang_tools:
+                kept.remove(name)
+                notes.append(
+                    f"{hole.Label}: Hole is printed vertically, skipping the {HOLE_TOOLS[name].label.lower()}."
+                )
+        elif orientation == "horizontal":
+            kept.remove("counterbore_bridges")
+            notes.append(f"{hole.Label}: Hole is printed horizontally, skipping the counterbore bridges.")
+        else:
+            raise Utils.ffDesignError(
+                f"{hole.Label} is oblique to the print direction.  "
+                f"Choose between counterbore bridges and {HOLE_TOOLS[overhang_tools[0]].label.lower()}."
+            )
+
+    return kept, notes
+
+
+def plan_pipeline(holes: list, tool_names: list, *, print_direction: App.Vector = App.Vector(0, 0, 1)) -> PipelinePlan:
+    """
+    Validate all Holes once and decide up front which tool runs on which Hole.
+
+    Conflicting tools are resolved per Hole (see `resolve_conflicts`) and Holes
+    which are not suitable for a tool are skipped for it.
+    """
+    for name in tool_names:
+        if name not in HOLE_TOOLS:
+            raise Utils.ffDesignError(f"Unknown hole tool {name!r}.")
+    ordered = [name for name in PIPELINE_ORDER if name in tool_names]
+
+    step_holes = {name: [] for name in ordered}
+    notes = []
+    for hole in holes:
+        Utils.assert_hole(hole)
+        kept, hole_notes = resolve_conflicts(hole, ordered, print_direction)
+        notes += hole_notes
+        for name in kept:
+            tool = HOLE_TOOLS[name]
+            try:
+                if tool.check is not None:
+                    tool.check(hole)
+            except Utils.ffDesignError as e:
+                notes.append(f"{hole.Label}: Skipping the {tool.label.lower()}, {e.message}")
+                continue
+            step_holes[name].append(hole)
+
+    return PipelinePlan([(name, step_holes[name]) for name in ordered if len(step_holes[name]) > 0], notes)
+
+
+def run_pipeline(doc, plan: PipelinePlan, params: dict):
+    """
+    Run all steps of a plan in one transaction with a single recompute at the
+    end.  `params` holds the parameters of each tool by its name, as for
+    `batch.apply_hole_tool`.
+    """
+    if len(plan.steps) == 0:
+        raise Utils.ffDesignError("Nothing to do, no tool is suitable for the selected Holes.")
+
+    uses_shapebinders = any(tool_uses_shapebinders(HOLE_TOOLS[name], params.get(name, {})) for name, _ in plan.steps)
+    use_transaction = not uses_shapebinders or Utils.undo_shapebinder_is_safe()
+    label = ", ".join(HOLE_TOOLS[name].label.lower() for name, _ in plan.steps)
+    try:
+        if use_transaction:
+            doc.openTransaction(f"Add {label}")
+        with Utils.Log.command(f"Add {label}", doc):
+            with Utils.DeferredRecompute(doc):
+                for name, holes in plan.steps:
+                    with Utils.Log.span("pipeline step", name):
+                        apply_tool_to_holes(HOLE_TOOLS[name], holes, params.get(name, {}))
+        if use_transaction:
+            doc.commitTransaction()
+    except Exception as e:
+        if use_transaction:
+            doc.abortTransaction()
+        raise e from None
+
+    Utils.Log.info(f"Added {label} to {len(plan.holes)} holes.")
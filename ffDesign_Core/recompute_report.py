@@ -0,0 +1,183 @@
+import csv
+import dataclasses
+import re
+import time
+import typing
+
+import FreeCAD as App
+import Sketcher
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import sketch_dof
+
+# Names of the objects generated by the tools.  FreeCAD appends a number when
+# a name is already taken.  Only needed for zip tie channels and for Holes
+# treated before they recorded their treatments.
+GENERATED_NAME = re.compile(
+    r"("
+    r"_Teardrops|_RoofBridge|_RoofBridgeCb|_BridgesX|_BridgesY"
+    r"|_Teardrops_Profile|_Teardrops_Binder|_RoofBridge_Profile|_RoofBridge_Binder"
+    r"|_RoofBridgeCb_Profile|_RoofBridgeCb_Binder|_ProfileDigest"
+    r"|_ThreadRibs|_ThreadEntrance|_RibThread\d{3}|_RibThreads|_RibThreads_Array"
+    r"|_RibThread_Settings|_RibThread_Template"
+    r"|_ZipTieChannel\d{3}|_ZipTieChannel\d{3}_Binder|_ZipTieChannels|_ZipTieChannels_Binder"
+    r"|_ZipTieChannels_Binder_Array|_ZipTieChannel_Settings|_ZipTieChannel_Template"
+    r")\d*$"
+    r"|^RibThread_.+_Template\d*$"
+)
+
+
+@dataclasses.dataclass
+class RecomputeCost:
+    name: str
+    label: str
+    type_id: str
+    # Wall time of recomputing only this object, in seconds
+    recompute: float
+    # Sketches: time of solving a copy of the sketch and its degrees of freedom
+    solver: typing.Optional[float] = None
+    dof: typing.Optional[int] = None
+    # Pockets: time of cutting the tool shape from the base feature
+    boolean: typing.Optional[float] = None
+
+
+COLUMNS = [
+    ("name", "Name"),
+    ("label", "Label"),
+    ("type_id", "Type"),
+    ("recompute", "Recompute [s]"),
+    ("solver", "Solver [s]"),
+    ("dof", "DoF"),
+    ("boolean", "Boolean [s]"),
+]
+
+
+def find_generated_objects(doc) -> list:
+    recorded = set()
+    for obj in doc.Objects:
+        if obj.TypeId == "PartDesign::Hole":
+            recorded.update(treatment.obj.Name for treatment in Utils.get_treatments(obj))
+    return [obj for obj in doc.Objects if obj.Name in recorded or GENERATED_NAME.search(obj.Name)]
+
+
+def solve_sketch_copy(sketch, scratch_doc) -> tuple:
+    """
+    Time solving a copy of a sketch in `scratch_doc`, so neither the sketch
+    nor its document are changed.  External geometry cannot be linked across
+    documents, the copy holds it as blocked construction geometry instead.
+
+    Returns the solver time and the degrees of freedom, see
+    `sketch_dof.degrees_of_freedom`.  Both are `None` if the copy fails to
+    solve.
+    """
+    geometry = list(sketch.Geometry)
+    # The first two are the axes, which every sketch has
+    external = list(sketch.ExternalGeo)[2:]
+    constraints = list(sketch.Constraints)
+    for constraint in constraints:
+        constraint.First = sketch_dof.external_to_internal(constraint.First, len(geometry))
+        constraint.Second = sketch_dof.external_to_internal(constraint.Second, len(geometry))
+        constraint.Third = sketch_dof.external_to_internal(constraint.Third, len(geometry))
+    blocks = [Sketcher.Constraint("Block", len(geometry) + i) for i in range(len(external))]
+
+    copy = scratch_doc.addObject("Sketcher::SketchObject", "SolveCopy")
+    try:
+        copy.addGeometry(geometry, False)
+        copy.addGeometry(external, True)
+        copy.addConstraint(constraints + blocks)
+        start = time.perf_counter()
+        result = copy.solve()
+        elapsed = time.perf_counter() - start
+        if result != 0:
+            Utils.Log.debug(f"Cannot solve a copy of {sketch.Name}, solver returned {result}")
+            return None, None
+        return elapsed, sketch_dof.degrees_of_freedom(geometry, list(sketch.Constraints))
+    finally:
+        scratch_doc.removeObject(copy.Name)
+
+
+def time_pocket_boolean(pocket):
+    base = pocket.BaseFeature
+    if base is None or base.Shape.isNull() or pocket.AddSubShape.isNull():
+        return None
+    start = time.perf_counter()
+    base.Shape.cut(pocket.AddSubShape)
+    return time.perf_counter() - start
+
+
+def profile_recompute(doc, objects: typing.Optional[list] = None) -> list:
+    """
+    Measure the recompute cost of each generated object.
+
+    The document is recomputed first, so each object can then be recomputed on
+    its own against up-to-date inputs.  By default, all objects generated by
+    the tools are measured.
+
+    Recomputing an object touches its dependents, although their inputs did
+    not change.  Afterwards, only the objects which were touched before stay
+    touched, so the next recompute of the document does not redo them.
+    """
+    if objects is None:
+        objects = find_generated_objects(doc)
+
+    with Utils.Log.span("document recompute"):
+        doc.recompute()
+    touched = {obj.Name for obj in doc.Objects if obj.isTouched()}
+
+    # Sketches are solved in a hidden document of their own, see `solve_sketch_copy`
+    scratch_doc = App.newDocument("RecomputeReportScratch", hidden=True, temp=True)
+    App.setActiveDocument(doc.Name)
+
+    costs = []
+    try:
+        for obj in objects:
+            obj.touch()
+            start = time.perf_counter()
+            obj.recompute()
+            cost = RecomputeCost(obj.Name, obj.Label, obj.TypeId, time.perf_counter() - start)
+
+            if obj.TypeId == "Sketcher::SketchObject":
+                cost.solver, cost.dof = solve_sketch_copy(obj, scratch_doc)
+            elif obj.TypeId == "PartDesign::Pocket":
+                cost.boolean = time_pocket_boolean(obj)
+            costs.append(cost)
+    finally:
+        App.closeDocument(scratch_doc.Name)
+        App.setActiveDocument(doc.Name)
+        for obj in doc.Objects:
+            if obj.isTouched() and obj.Name not in touched:
+                obj.purgeTouched()
+
+    return costs
+
+
+def sort_costs(costs: list, key: str = "recompute") -> list:
+    """Sort by one of the `COLUMNS`.  Costs are sorted most expensive first."""
+    if key in ["name", "label", "type_id"]:
+        return sorted(costs, key=lambda cost: getattr(cost, key))
+    # Objects without a value for this column go last
+    return sorted(costs, key=lambda cost: (getattr(cost, key) is not None, getattr(cost, key) or 0), reverse=True)
+
+
+def write_csv(costs: list, path: str):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([title for _, title in COLUMNS])
+        for cost in costs:
+            writer.writerow(["" if getattr(cost, field) is None else getattr(cost, field) for field, _ in COLUMNS])
+
+
+def format_cell(value, width: int, fmt: str = "") -> str:
+    if value is None:
+        return f"{'-':>{width}}"
+    return f"{value:>{width}{fmt}}"
+
+
+def format_table(costs: list) -> str:
+    lines = [f"{'Name':<40} {'Recompute [s]':>13} {'Solver [s]':>10} {'DoF':>5} {'Boolean [s]':>11}"]
+    for cost in costs:
+        lines.append(
+            f"{cost.name:<40} {cost.recompute:>13.3f} {format_cell(cost.solver, 10, '.3f')} "
+            f"{format_cell(cost.dof, 5)} {format_cell(cost.boolean, 11, '.3f')}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,455 @@
+import dataclasses
+import re
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import counterbore_bridges, rib_threads, roof_bridge, teardrop
+
+# Derived sketches with a block of geometry per circle of the profile sketch,
+# by name suffix, and the function adding the block for one circle
+DERIVED_SKETCHES = {
+    "_Teardrops": teardrop.add_teardrop,
+    "_RoofBridge": roof_bridge.add_roof_bridge,
+    "_RoofBridgeCb": roof_bridge.add_counterbore_roof_bridge,
+    "_BridgesY": counterbore_bridges.add_y_cutout,
+    "_BridgesX": counterbore_bridges.add_x_square,
+    "_ThreadEntrance": rib_threads.add_entrance_circle,
+}
+
+# The same for sketches generated in closed-form mode
+CLOSED_FORM_SKETCHES = {
+    "_Teardrops": teardrop.add_teardrop_closed_form,
+    "_RoofBridge": roof_bridge.add_roof_bridge_closed_form,
+    "_RoofBridgeCb": roof_bridge.add_counterbore_roof_bridge_closed_form,
+    "_BridgesY": counterbore_bridges.add_y_cutout_closed_form,
+    "_BridgesX": counterbore_bridges.add_x_square_closed_form,
+}
+
+# Tool generating each kind of derived sketch
+DERIVED_SKETCH_TOOLS = {
+    "_Teardrops": "teardrop",
+    "_RoofBridge": "roof_bridge",
+    "_RoofBridgeCb": "roof_bridge",
+    "_BridgesY": "counterbore_bridges",
+    "_BridgesX": "counterbore_bridges",
+    "_ThreadEntrance": "rib_threads",
+}
+
+# Static profiles of the fast mode by name suffix, with the function building
+# their faces for a list of Holes
+STATIC_PROFILES = {
+    "_Teardrops": teardrop.teardrop_faces,
+    "_RoofBridge": lambda holes: roof_bridge.roof_bridge_faces(holes, False),
+    "_RoofBridgeCb": lambda holes: roof_bridge.roof_bridge_faces(holes, True),
+}
+
+# Static profiles not cut as deep as the Hole
+STATIC_PROFILE_LENGTHS = {
+    "_RoofBridgeCb": lambda hole: hole.HoleCutDepth,
+}
+
+CONSTRAINT_PATH = re.compile(r"^\.?Constraints\[(\d+)\]$")
+
+
+@dataclasses.dataclass
+class ResyncResult:
+    name: str
+    added: int = 0
+    removed: int = 0
+    renumbered: int = 0
+    # Static profiles are rebuilt as a whole
+    regenerated: bool = False
+
+    @property
+    def changed(self) -> bool:
+        return self.added + self.removed + self.renumbered > 0 or self.regenerated
+
+    def __str__(self) -> str:
+        if self.regenerated:
+            return f"{self.name}: regenerated"
+        return f"{self.name}: {self.added} added, {self.removed} removed, {self.renumbered} renumbered"
+
+
+def geometry_reference(profile_sketch) -> re.Pattern:
+    return re.compile(rf"\b{re.escape(profile_sketch.Name)}\.Geometry\[(\d+)\]")
+
+
+def profile_circle_tags(obj, profile_sketch, geometry: Utils.SketchGeometry, expressions: list) -> list:
+    """
+    The fingerprint of a generated object.
+
+    Objects generated before fingerprints were recorded are adopted by reading
+    the circle each of their `expressions` refers to, in order.  This only
+    works as long as these circles still exist.
+    """
+    if "ProfileCircleTags" in obj.PropertiesList:
+        return list(obj.ProfileCircleTags)
+
+    reference = geometry_reference(profile_sketch)
+    indices = []
+    for expr in expressions:
+        for match in reference.finditer(expr):
+            # Consecutive references to the same circle belong to one block
+            if len(indices) == 0 or indices[-1] != int(match[1]):
+                indices.append(int(match[1]))
+    if any(index not in geometry.circles for index in indices):
+        raise Utils.ffDesignError(
+            f"{obj.Label} was generated by an older version of this addon and the circles of "
+            f"{profile_sketch.Label} changed since.  Please recreate it."
+        )
+    return [geometry.tag(index) for index in indices]
+
+
+def find_derived_sketches(body, hole, profile_sketch, *, by_name: bool = False) -> list:
+    """
+    Derived sketches of a Hole with their name suffix, from the treatments
+    recorded on the Hole.  With `by_name`, for Holes treated by older versions
+    of this addon, they are searched by object names instead and recorded.
+    """
+    if not by_name:
+        return [
+            (treatment.obj, treatment.role)
+            for treatment in Utils.get_treatments(hole)
+            if treatment.obj.TypeId == "Sketcher::SketchObject" and treatment.role in DERIVED_SKETCHES
+        ]
+
+    suffixes = "|".join(re.escape(suffix) for suffix in DERIVED_SKETCHES)
+    pattern = re.compile(rf"^{re.escape(profile_sketch.Name)}({suffixes})\d*$")
+    found = []
+    for obj in body.Group:
+        match = pattern.match(obj.Name)
+        if match is not None and obj.TypeId == "Sketcher::SketchObject":
+            found.append((obj, match[1]))
+    for sketch, suffix in found:
+        Utils.record_treatments([hole], DERIVED_SKETCH_TOOLS[suffix], [(sketch, suffix)])
+    return found
+
+
+def find_rib_object(body, hole, role: str, *, by_name: bool = False):
+    """An object of the thread forming ribs of a Hole, see `find_derived_sketches`."""
+    if not by_name:
+        return Utils.find_treatment(hole, "rib_threads", role)
+    obj = body.Document.getObject(f"{hole.Name}{role}")
+    if obj is not None:
+        Utils.record_treatments([hole], "rib_threads", [(obj, role)])
+    return obj
+
+
+def find_static_profiles(body, hole, *, by_name: bool = False) -> list:
+    """
+    Static profiles of a Hole treated in fast mode with their name suffix, see
+    `find_derived_sketches`.
+    """
+    if not by_name:
+        return [
+            (treatment.obj, treatment.role[: -len("_Profile")])
+            for treatment in Utils.get_treatments(hole)
+            if treatment.role.endswith("_Profile") and treatment.role[: -len("_Profile")] in STATIC_PROFILES
+        ]
+
+    found = []
+    for suffix in STATIC_PROFILES:
+        profile = body.Document.getObject(f"{hole.Name}{suffix}_Profile")
+        if profile is not None and profile.TypeId == "Part::Feature":
+            Utils.record_treatments([hole], DERIVED_SKETCH_TOOLS[suffix], [(profile, f"{suffix}_Profile")])
+            found.append((profile, suffix))
+    return found
+
+
+def resync_static_profile(body, profile, suffix: str) -> ResyncResult:
+    """
+    Rebuild a static profile of the fast mode from the current circles and
+    properties of its Holes.  It cannot follow the changes on its own.
+    """
+    result = ResyncResult(profile.Label)
+    binders = [obj for obj in profile.InList if obj.TypeId == "PartDesign::SubShapeBinder"]
+    pockets = [obj for binder in binders for obj in binder.InList if obj.TypeId == "PartDesign::Pocket"]
+    if len(binders) != 1 or len(pockets) != 1:
+        raise Utils.ffDesignError(f"{profile.Label} was modified by hand, cannot resynchronize it.")
+
+    # All Holes cut by the same pocket, the one it was made for first
+    holes = [
+        obj
+        for obj in body.Group
+        if obj.TypeId == "PartDesign::Hole" and "Treatments" in obj.PropertiesList and profile.Name in obj.Treatments
+    ]
+    holes.sort(key=lambda h: not profile.Name.startswith(f"{h.Name}{suffix}_Profile"))
+    length = STATIC_PROFILE_LENGTHS[suffix](holes[0]) if suffix in STATIC_PROFILE_LENGTHS else None
+
+    result.regenerated = Utils.update_static_profile_pocket(
+        holes[0], profile, binders[0], pockets[0], STATIC_PROFILES[suffix](holes), length=length
+    )
+    if result.regenerated:
+        Utils.recompute(pockets[0])
+    return result
+
+
+def resync_derived_sketch(sketch, suffix: str, hole, digest: Utils.ProfileDigest) -> ResyncResult:
+    """
+    Bring the per-circle blocks of a derived sketch in line with the circles of
+    the profile sketch.
+
+    Only the blocks of removed circles are deleted and only the blocks of new
+    circles are added.  Blocks refer to their circle through the profile
+    digest, which already follows circles to their new index.  Only sketches
+    generated before the digest existed refer to the profile sketch directly
+    and have the expressions of moved blocks rewritten.
+    """
+    if "MergedHoles" in sketch.PropertiesList and len(sketch.MergedHoles) > 0:
+        raise Utils.ffDesignError(
+            f"{sketch.Label} was generated for several Holes at once and cannot be resynchronized.  "
+            "Please recreate it."
+        )
+
+    profile_sketch = digest.profile_sketch
+    geometry = digest.geometry
+    result = ResyncResult(sketch.Label)
+    constraint_expressions = []
+    for path, expr in sketch.ExpressionEngine:
+        match = CONSTRAINT_PATH.match(path)
+        if match is not None:
+            constraint_expressions.append((int(match[1]), path, expr))
+    constraint_expressions.sort()
+    stored = profile_circle_tags(sketch, profile_sketch, geometry, [expr for _, _, expr in constraint_expressions])
+
+    n_blocks = len(stored)
+    n_geometry = len(sketch.Geometry)
+    n_constraints = len(sketch.Constraints)
+    if n_blocks == 0 or n_constraints < n_blocks or n_geometry % n_blocks != 0 or n_constraints % n_blocks != 0:
+        raise Utils.ffDesignError(f"{sketch.Label} was modified by hand, cannot resynchronize it.")
+    block_geometry = n_geometry // n_blocks
+    block_constraints = n_constraints // n_blocks
+
+    current = {geometry.tag(index): index for index in geometry.circles}
+
+    # Rewrite the references of blocks whose circle moved to a different index
+    reference = geometry_reference(profile_sketch)
+    renumbered = set()
+    for constraint, path, expr in constraint_expressions:
+        block = constraint // block_constraints
+        index = current.get(stored[block])
+        if index is None:
+            continue
+        new_expr = reference.sub(f"{profile_sketch.Name}.Geometry[{index}]", expr)
+        if new_expr != expr:
+            sketch.setExpression(path, new_expr)
+            renumbered.add(block)
+    result.renumbered = len(renumbered)
+
+    # New blocks go to the end
+    stored_tags = set(stored)
+    added = [index for index in geometry.circles if geometry.tag(index) not in stored_tags]
+    if len(added) > 0:
+        closed_form = "ClosedForm" in sketch.PropertiesList and sketch.ClosedForm
+        add_block = CLOSED_FORM_SKETCHES[suffix] if closed_form else DERIVED_SKETCHES[suffix]
+        batch = Utils.SketchBatch(sketch)
+        for index in added:
+            add_block(batch, hole, digest, index)
+        batch.commit()
+    result.added = len(added)
+
+    # Deleting geometry also deletes its constraints and FreeCAD renumbers the
+    # expressions of the remaining constraints
+    removed = [block for block, tag in enumerate(stored) if tag not in current]
+    if len(removed) > 0:
+        sketch.delGeometries([block * block_geometry + offset for block in removed for offset in range(block_geometry)])
+    result.removed = len(removed)
+
+    Utils.set_profile_fingerprint(
+        sketch, [tag for tag in stored if tag in current] + [geometry.tag(index) for index in added]
+    )
+    if result.changed and len(added) == 0:
+        Utils.recompute(sketch)
+    return result
+
+
+def refers_to_geometry(expressions: list, profile_sketch) -> bool:
+    """Whether expressions still read circles of the profile sketch by index, as before the profile digest."""
+    reference = geometry_reference(profile_sketch)
+    return any(reference.search(expr) is not None for expr in expressions)
+
+
+def resync_rib_array(link_array, hole, settings, digest: Utils.ProfileDigest) -> ResyncResult:
+    """
+    Place the compound rib profile on the current circles of the profile
+    sketch.  The placements follow their circles through the profile digest,
+    only added and removed circles need a new placement list.
+    """
+    profile_sketch = digest.profile_sketch
+    geometry = digest.geometry
+    result = ResyncResult(link_array.Label)
+    expressions = [expr for path, expr in link_array.ExpressionEngine if path.lstrip(".") == "PlacementList"]
+    stored = profile_circle_tags(link_array, profile_sketch, geometry, expressions)
+    tags = [geometry.tag(index) for index in geometry.circles]
+    legacy = refers_to_geometry(expressions, profile_sketch)
+    if set(stored) == set(tags) and not legacy:
+        return result
+
+    result.added = len(set(tags) - set(stored))
+    result.removed = len(set(stored) - set(tags))
+    if legacy:
+        result.renumbered = len(tags) - result.added
+
+    # The array is a single object, so all placements are rewritten at once
+    placements = "; ".join(rib_threads.rib_placement_expr(settings, digest, index) for index in geometry.circles)
+    link_array.ElementCount = len(geometry.circles)
+    link_array.setExpression("PlacementList", f"list({placements})")
+    Utils.set_profile_fingerprint(link_array, tags)
+    Utils.recompute(link_array)
+    return result
+
+
+def resync_rib_binders(body, hole, settings, digest: Utils.ProfileDigest, *, by_name: bool = False) -> list:
+    """
+    Add and remove the shape-binders of the per-circle rib profile.  The
+    remaining ones follow their circles through the profile digest, only
+    binders from before the digest are bound to it.
+    """
+    profile_sketch = digest.profile_sketch
+    geometry = digest.geometry
+    if not by_name:
+        binders = [treatment.obj for treatment in Utils.get_treatments(hole, "rib_threads", "_RibThread")]
+    else:
+        pattern = re.compile(rf"^{re.escape(profile_sketch.Name)}_RibThread\d{{3}}\d*$")
+        binders = [obj for obj in body.Group if obj.TypeId == "PartDesign::SubShapeBinder" and pattern.match(obj.Name)]
+        Utils.record_treatments([hole], "rib_threads", [(binder, "_RibThread") for binder in binders])
+    if len(binders) == 0:
+        return []
+
+    merged_binder = find_rib_object(body, hole, "_RibThreads", by_name=by_name)
+    if merged_binder is None:
+        # A single circle, its binder is the profile of the pocket itself
+        if len(binders) != 1 or len(geometry.circles) != 1:
+            raise Utils.ffDesignError(
+                f"Thread forming ribs of {hole.Label} were made for a single circle.  Please recreate them."
+            )
+        binder = binders[0]
+        index = geometry.circles[0]
+        expressions = [expr for path, expr in binder.ExpressionEngine if path.lstrip(".") == "Placement"]
+        (tag,) = profile_circle_tags(binder, profile_sketch, geometry, expressions)
+        if tag == geometry.tag(index) and not refers_to_geometry(expressions, profile_sketch):
+            return []
+        Utils.set_profile_fingerprint(binder, [geometry.tag(index)])
+        binder.setExpression("Placement", rib_threads.rib_placement_expr(settings, digest, index, in_body=True))
+        Utils.recompute(binder)
+        return [ResyncResult(binder.Label, renumbered=1)]
+
+    current = {geometry.tag(index): index for index in geometry.circles}
+    template = binders[0].Support[0][0]
+    results = []
+    kept = set()
+    for binder in binders:
+        expressions = [expr for path, expr in binder.ExpressionEngine if path.lstrip(".") == "Placement"]
+        (tag,) = profile_circle_tags(binder, profile_sketch, geometry, expressions)
+        if tag not in current:
+            merged_binder.Support = [(obj, sub) for obj, sub in merged_binder.Support if obj != binder]
+            results.append(ResyncResult(binder.Label, removed=1))
+            Utils.forget_treatments(hole, [binder])
+            body.Document.removeObject(binder.Name)
+            continue
+
+        kept.add(current[tag])
+        if refers_to_geometry(expressions, profile_sketch):
+            placement_expr = rib_threads.rib_placement_expr(settings, digest, current[tag], in_body=True)
+            binder.setExpression("Placement", placement_expr)
+            results.append(ResyncResult(binder.Label, renumbered=1))
+        Utils.set_profile_fingerprint(binder, [geometry.tag(current[tag])])
+
+    for index in geometry.circles:
+        if index in kept:
+            continue
+        binder = Utils.make_sketch_offset_shape_binder(
+            body=body,
+            template=template,
+            sketch=profile_sketch,
+            suffix=f"_RibThread{index + 1:03}",
+            center_expr=digest.center(index),
+            rotation_expr=f"rotation({settings.Name}.Rotation; 0; 0)",
+        )
+        Utils.set_profile_fingerprint(binder, [geometry.tag(index)])
+        Utils.record_treatments([hole], "rib_threads", [(binder, "_RibThread")])
+        merged_binder.Support = merged_binder.Support + [(binder, "")]
+        results.append(ResyncResult(binder.Label, added=1))
+
+    if len(results) > 0:
+        Utils.recompute(merged_binder)
+    return results
+
+
+def resync_rib_template(body, hole, settings, digest: Utils.ProfileDigest) -> list:
+    """Move a local rib template, used directly as profile of a single circle, to the current circle."""
+    profile_sketch = digest.profile_sketch
+    geometry = digest.geometry
+    template = rib_threads.find_rib_template(body, hole, False)
+    if template is None or not any(path.lstrip(".") == "Placement" for path, _ in template.ExpressionEngine):
+        return []
+
+    expressions = [expr for path, expr in template.ExpressionEngine if path.lstrip(".") == "Placement"]
+    (tag,) = profile_circle_tags(template, profile_sketch, geometry, expressions)
+    if len(geometry.circles) != 1:
+        raise Utils.ffDesignError(
+            f"Thread forming ribs of {hole.Label} were made for a single circle.  Please recreate them."
+        )
+
+    index = geometry.circles[0]
+    if tag == geometry.tag(index) and not refers_to_geometry(expressions, profile_sketch):
+        return []
+    template.setExpression("Placement", rib_threads.rib_placement_expr(settings, digest, index, in_body=True))
+    Utils.set_profile_fingerprint(template, [geometry.tag(index)])
+    Utils.recompute(template)
+    return [ResyncResult(template.Label, renumbered=1)]
+
+
+@Utils.Log.timed
+def resync_hole(body, hole) -> list:
+    """
+    Resynchronize everything generated for a Hole with the circles of its
+    profile sketch, after circles were added, removed or reordered.
+
+    Each generated object remembers the circles it was generated for (see
+    `Utils.set_profile_fingerprint`).  Only the parts belonging to changed
+    circles are touched, so the cost grows with the number of changed circles
+    and not with the size of the Hole.  Static profiles of the fast mode are
+    rebuilt as a whole.  Returns a `ResyncResult` for every object that
+    changed.
+    """
+    Utils.assert_body(body)
+    Utils.assert_hole(hole)
+
+    profile_sketch = Utils.get_hole_profile_sketch(hole)
+    geometry = Utils.SketchGeometry(profile_sketch)
+    if len(geometry.circles) == 0:
+        raise Utils.ffDesignError(f"{profile_sketch.Label} does not have any circles left.")
+
+    # Holes treated before they recorded their treatments are searched by
+    # object names once
+    by_name = "Treatments" not in hole.PropertiesList
+    results = []
+    derived_sketches = find_derived_sketches(body, hole, profile_sketch, by_name=by_name)
+    digest = None
+    if len(derived_sketches) > 0 or Utils.ProfileDigest.find(body, hole) is not None:
+        digest = Utils.ProfileDigest(body, hole, geometry)
+        digest_result = ResyncResult(digest.varset.Label, added=digest.added, renumbered=digest.moved)
+        results.append(digest_result)
+    for sketch, suffix in derived_sketches:
+        results.append(resync_derived_sketch(sketch, suffix, hole, digest))
+    for profile, suffix in find_static_profiles(body, hole, by_name=by_name):
+        results.append(resync_static_profile(body, profile, suffix))
+
+    settings = rib_threads.find_rib_settings(body, hole)
+    if settings is not None:
+        # Rib placements from before the profile digest are bound to it now
+        if digest is None:
+            digest = Utils.ProfileDigest(body, hole, geometry)
+            digest_result = ResyncResult(digest.varset.Label, added=digest.added, renumbered=digest.moved)
+            results.append(digest_result)
+        link_array = find_rib_object(body, hole, "_RibThreads_Array", by_name=by_name)
+        if link_array is not None and link_array.TypeId == "App::Link":
+            results.append(resync_rib_array(link_array, hole, settings, digest))
+        results += resync_rib_binders(body, hole, settings, digest, by_name=by_name)
+        results += resync_rib_template(body, hole, settings, digest)
+
+    # Only now that the blocks of removed circles are gone
+    if digest is not None:
+        digest_result.removed = digest.prune()
+
+    return [result for result in results if result.changed]
@@ -0,0 +1,109 @@
+import dataclasses
+import json
+import os
+import typing
+
+import FreeCAD as App
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core.thread_sizes import THREAD_SIZE, canonical_thread_size
+
+
+def thread_normative_diameter(thread_size: str) -> float:
+    match = THREAD_SIZE.match(canonical_thread_size(thread_size).upper())
+    if match is None:
+        raise Utils.ffDesignError(f"Cannot determine the diameter of thread size {thread_size!r}!")
+    return float(match["diameter"])
+
+
+@dataclasses.dataclass
+class RibParameters:
+    # Thread General
+    name: str
+    normative: float
+    core_diameter: float
+    core_bore: float
+
+    # Rib Specific
+    entrance_depth: float
+    outer_diameter: float
+    rib_engagement: float
+    rib_diameter: float
+
+
+class RibParameterDatabase:
+    """
+    Known-okay rib parameters by canonical thread size.
+
+    The parameters are loaded on first use from up to three layers, each
+    overriding individual values of the one before:
+
+    1. `Resources/rib_parameters.json` shipped with the addon,
+    2. a site-wide file, configured with the `SiteRibParameters` preference or
+       the `FFDESIGN_SITE_RIB_PARAMETERS` environment variable,
+    3. `FusedFilamentDesign/rib_parameters.json` in the user data directory.
+
+    Lookups accept any spelling of a thread size.
+    """
+
+    builtin_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Resources", "rib_parameters.json")
+
+    def __init__(self):
+        self.parameters = None
+
+    @staticmethod
+    def layer_paths() -> list:
+        site_path = os.environ.get("FFDESIGN_SITE_RIB_PARAMETERS") or Utils.get_preferences().GetString(
+            "SiteRibParameters"
+        )
+        user_path = os.path.join(App.getUserAppDataDir(), "FusedFilamentDesign", "rib_parameters.json")
+        return [RibParameterDatabase.builtin_path, site_path, user_path]
+
+    def load(self) -> dict:
+        if self.parameters is not None:
+            return self.parameters
+
+        merged = {}
+        for path in self.layer_paths():
+            if path == "" or not os.path.exists(path):
+                continue
+            try:
+                with open(path) as f:
+                    layer = json.load(f)
+            except (OSError, ValueError) as e:
+                Utils.Log.warning(f"Ignoring rib parameters from {path}: {e}")
+                continue
+            for size, values in layer.items():
+                size = canonical_thread_size(size)
+                merged[size] = {**merged.get(size, {}), **values}
+
+        fields = {field.name for field in dataclasses.fields(RibParameters)} - {"name"}
+        self.parameters = {}
+        for size, values in merged.items():
+            try:
+                self.parameters[size] = RibParameters(name=size, **{k: v for k, v in values.items() if k in fields})
+            except TypeError as e:
+                Utils.Log.warning(f"Incomplete rib parameters for {size}: {e}")
+        return self.parameters
+
+    def reload(self):
+        self.parameters = None
+        self.load()
+
+    def get(self, thread_size: str) -> typing.Optional[RibParameters]:
+        return self.load().get(canonical_thread_size(thread_size))
+
+    def __getitem__(self, thread_size: str) -> RibParameters:
+        rib_param = self.get(thread_size)
+        if rib_param is None:
+            raise KeyError(thread_size)
+        return rib_param
+
+    def __contains__(self, thread_size: str) -> bool:
+        return self.get(thread_size) is not None
+
+    def sizes(self) -> list:
+        return list(self.load())
+
+
+RIB_PARAMETERS = RibParameterDatabase()
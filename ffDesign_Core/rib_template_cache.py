@@ -0,0 +1,159 @@
+import base64
+import dataclasses
+import json
+import os
+import tempfile
+import typing
+
+import FreeCAD as App
+import Part
+import Sketcher
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core.rib_parameters import RibParameters
+
+# Bump whenever `make_rib_template` generates a different sketch, so templates
+# cached on disk by an older version are not reused.
+TEMPLATE_REVISION = 1
+
+
+@dataclasses.dataclass
+class CachedTemplate:
+    # Solved geometry and whether each element is construction geometry
+    geometry: list
+    construction: list
+    # Constraints, including their names
+    constraints: list
+
+
+def cache_key(rib_param: RibParameters) -> str:
+    """
+    Key of the parameters which affect the template sketch.  The entrance
+    depth and core bore only end up in the properties and are not part of it.
+    """
+    values = [rib_param.normative, rib_param.core_diameter, rib_param.outer_diameter]
+    values += [rib_param.rib_engagement, rib_param.rib_diameter]
+    return f"r{TEMPLATE_REVISION}:" + ",".join(f"{value:.6g}" for value in values)
+
+
+def encode_element(element) -> str:
+    return base64.b64encode(bytes(element.dumpContent())).decode("ascii")
+
+
+def decode_element(factory, content: str):
+    element = factory()
+    element.restoreContent(base64.b64decode(content))
+    return element
+
+
+class RibTemplateCache:
+    """
+    Solved rib templates by parameter set.
+
+    Building a rib template from scratch means computing its geometry, adding
+    about 30 constraints and solving them.  Once a template is solved, its
+    geometry and constraints are kept here and further templates with the same
+    parameters are copies of it.  The copy is already solved, so the solver
+    converges right away.
+
+    With the `CacheRibTemplatesOnDisk` preference, the cache is also kept in
+    `FusedFilamentDesign/rib_template_cache.json` in the user data directory,
+    so it survives FreeCAD restarts.
+    """
+
+    def __init__(self):
+        self.templates = {}
+        self.disk_loaded = False
+
+    @staticmethod
+    def disk_path() -> str:
+        return os.path.join(App.getUserAppDataDir(), "FusedFilamentDesign", "rib_template_cache.json")
+
+    @staticmethod
+    def use_disk() -> bool:
+        return Utils.get_preferences().GetBool("CacheRibTemplatesOnDisk", False)
+
+    def load_disk(self):
+        self.disk_loaded = True
+        path = self.disk_path()
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+            for key, entry in entries.items():
+                if key in self.templates or not key.startswith(f"r{TEMPLATE_REVISION}:"):
+                    continue
+                self.templates[key] = CachedTemplate(
+                    geometry=[decode_element(getattr(Part, kind), content) for kind, content in entry["geometry"]],
+                    construction=entry["construction"],
+                    constraints=[decode_element(Sketcher.Constraint, content) for content in entry["constraints"]],
+                )
+        except Exception as e:
+            Utils.Log.warning(f"Ignoring rib template cache {path}: {e}")
+
+    def save_disk(self):
+        entries = {
+            key: {
+                "geometry": [[type(geo).__name__, encode_element(geo)] for geo in cached.geometry],
+                "construction": cached.construction,
+                "constraints": [encode_element(constraint) for constraint in cached.constraints],
+            }
+            for key, cached in self.templates.items()
+        }
+        path = self.disk_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Other FreeCAD instances or workers of the command line tool may
+            # write the cache at the same time.  Readers must never see a
+            # partially written file, the last writer wins.
+            fd, tmp_path = tempfile.mkstemp(prefix=".rib_template_cache", dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            Utils.Log.warning(f"Cannot write rib template cache {path}: {e}")
+
+    def get(self, rib_param: RibParameters) -> typing.Optional[CachedTemplate]:
+        if not self.disk_loaded and self.use_disk():
+            self.load_disk()
+        return self.templates.get(cache_key(rib_param))
+
+    def store(self, sketch, rib_param: RibParameters):
+        """Remember the solved template `sketch` for its parameters."""
+        self.templates[cache_key(rib_param)] = CachedTemplate(
+            geometry=sketch.Geometry,
+            construction=[sketch.getConstruction(geo_id) for geo_id in range(len(sketch.Geometry))],
+            constraints=sketch.Constraints,
+        )
+        if self.use_disk():
+            self.save_disk()
+
+    def instantiate(self, sketch, rib_param: RibParameters) -> bool:
+        """
+        Fill the empty `sketch` with a copy of the cached template for these
+        parameters.  Returns `False` if no such template is cached.
+        """
+        cached = self.get(rib_param)
+        # The cached constraints refer to the geometry by index
+        if cached is None or len(sketch.Geometry) != 0:
+            return False
+
+        # The sketch copies the geometry and constraints when adding them
+        batch = Utils.SketchBatch(sketch)
+        for geo, construction in zip(cached.geometry, cached.construction):
+            batch.add_geometry([geo], construction=construction)
+        batch.add_constraints(cached.constraints)
+        batch.commit()
+        Utils.Log.count("cached templates")
+        return True
+
+    def clear(self):
+        self.templates = {}
+
+
+RIB_TEMPLATE_CACHE = RibTemplateCache()
@@ -0,0 +1,477 @@
+import math
+import typing
+
+import FreeCAD as App
+import Part
+import Sketcher
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import template_library
+from ffDesign_Core.rib_parameters import RibParameters, canonical_thread_size
+from ffDesign_Core.rib_template_cache import RIB_TEMPLATE_CACHE
+
+
+def make_parametric_circle(batch: Utils.SketchBatch, x_expr: str, y_expr: str, size_expr: str):
+    new_geo = [
+        Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), 2),
+    ]
+    last_geo_id = batch.add_geometry(new_geo)
+    new_constraints = [
+        Sketcher.Constraint("DistanceX", last_geo_id + 0, 3, 0),
+        Sketcher.Constraint("DistanceY", last_geo_id + 0, 3, 0),
+        Sketcher.Constraint("Diameter", last_geo_id + 0, 2),
+    ]
+    last_c = batch.add_constraints(new_constraints)
+    batch.set_expression(last_c + 0, x_expr)
+    batch.set_expression(last_c + 1, y_expr)
+    batch.set_expression(last_c + 2, f"{size_expr}")
+
+
+@Utils.Log.timed
+def make_rib_template(sketch, rib_param: RibParameters, *, use_cache: bool = True):
+    """
+    Generate the rib outline of one hole in an empty sketch.
+
+    With `use_cache`, a template solved before with the same parameters is
+    copied instead of being built from scratch, see `RibTemplateCache`.
+    """
+    Utils.assert_sketch(sketch)
+
+    if len(sketch.Geometry) != 0:
+        Utils.Log.warning("Sketch for the rib thread template is not empty before generation?!")
+        # The cache only holds complete templates
+        use_cache = False
+    elif use_cache and RIB_TEMPLATE_CACHE.instantiate(sketch, rib_param):
+        return
+
+    batch = Utils.SketchBatch(sketch)
+
+    center_circle = Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), rib_param.outer_diameter / 2)
+    rib_center_radius = (rib_param.normative - rib_param.rib_engagement * 2 + rib_param.rib_diameter) / 2
+    rib_center_circle = Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), rib_center_radius)
+
+    rib_center_circle_id = batch.add_geometry([rib_center_circle], construction=True)
+    normative_circle_id = batch.add_geometry(
+        [Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), rib_param.normative / 2)],
+        construction=True,
+    )
+    core_circle_id = batch.add_geometry(
+        [Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), rib_param.core_diameter / 2)],
+        construction=True,
+    )
+
+    rib_arcs = []
+    rib_centers = []
+    center_angles = []
+    for i in range(3):
+        a = i * math.pi * 2 / 3
+        rib_center = App.Vector(math.cos(a) * rib_center_radius, math.sin(a) * rib_center_radius, 0)
+        rib_centers.append(rib_center)
+        rib_circle = Part.Circle(
+            rib_center,
+            App.Vector(0, 0, 1),
+            rib_param.rib_diameter / 2,
+        )
+        intersections = center_circle.intersect(rib_circle)
+        if len(intersections) != 2:
+            raise Utils.ffDesignError("ribs do not intersect outer diameter, cannot proceed!")
+
+        center_angles += [math.atan2(p.Y, p.X) for p in intersections]
+
+        rib_intersections = [App.Vector(p.X, p.Y, 0) - rib_center for p in intersections]
+        rib_angles = [math.atan2(p.y, p.x) for p in rib_intersections]
+
+        rib_arcs.append(Part.ArcOfCircle(rib_circle, rib_angles[0], rib_angles[1]))
+
+    rib_arc_ids = batch.add_geometry(rib_arcs)
+
+    assert len(center_angles) == 6
+    center_angles.sort()
+
+    new_geo = [
+        Part.ArcOfCircle(center_circle, center_angles[1], center_angles[2]),
+        Part.ArcOfCircle(center_circle, center_angles[3], center_angles[4]),
+        Part.ArcOfCircle(center_circle, center_angles[5], center_angles[0]),
+    ]
+    center_arc_ids = batch.add_geometry(new_geo)
+
+    new_constraints = [
+        # Arc End Coincidences
+        Sketcher.Constraint("Coincident", center_arc_ids + 0, 2, rib_arc_ids + 0, 2),
+        Sketcher.Constraint("Coincident", center_arc_ids + 1, 1, rib_arc_ids + 0, 1),
+        Sketcher.Constraint("Coincident", center_arc_ids + 1, 2, rib_arc_ids + 1, 2),
+        Sketcher.Constraint("Coincident", center_arc_ids + 2, 1, rib_arc_ids + 1, 1),
+        Sketcher.Constraint("Coincident", center_arc_ids + 2, 2, rib_arc_ids + 2, 2),
+        Sketcher.Constraint("Coincident", center_arc_ids + 0, 1, rib_arc_ids + 2, 1),
+        # Arc Centers
+        Sketcher.Constraint("Coincident", rib_center_circle_id, 3, -1, 1),
+        Sketcher.Constraint("Coincident", normative_circle_id, 3, -1, 1),
+        Sketcher.Constraint("Coincident", core_circle_id, 3, -1, 1),
+        Sketcher.Constraint("Coincident", center_arc_ids + 0, 3, -1, 1),
+        Sketcher.Constraint("Coincident", center_arc_ids + 1, 3, -1, 1),
+        Sketcher.Constraint("Coincident", center_arc_ids + 2, 3, -1, 1),
+        Sketcher.Constraint("PointOnObject", rib_arc_ids + 0, 3, rib_center_circle_id),
+        Sketcher.Constraint("PointOnObject", rib_arc_ids + 1, 3, rib_center_circle_id),
+        Sketcher.Constraint("PointOnObject", rib_arc_ids + 2, 3, rib_center_circle_id),
+        # Arc Equalities
+        Sketcher.Constraint("Equal", center_arc_ids + 0, center_arc_ids + 1),
+        Sketcher.Constraint("Equal", center_arc_ids + 0, center_arc_ids + 2),
+        Sketcher.Constraint("Equal", rib_arc_ids + 0, rib_arc_ids + 1),
+        Sketcher.Constraint("Equal", rib_arc_ids + 0, rib_arc_ids + 2),
+    ]
+    batch.add_constraints(new_constraints)
+
+    new_constraints = [
+        # Diameters
+        Sketcher.Constraint("Diameter", rib_center_circle_id, rib_center_radius * 2),
+        Sketcher.Constraint("Diameter", center_arc_ids + 0, rib_param.outer_diameter),
+        Sketcher.Constraint("Diameter", rib_arc_ids + 0, rib_param.rib_diameter),
+        Sketcher.Constraint("Diameter", normative_circle_id, rib_param.normative),
+        Sketcher.Constraint("Diameter", core_circle_id, rib_param.core_diameter),
+    ]
+    dia_constraint_ids = batch.add_constraints(new_constraints)
+    batch.rename_constraint(dia_constraint_ids + 0, "rib_center_diameter")
+    batch.rename_constraint(dia_constraint_ids + 1, "outer_diameter")
+    batch.rename_constraint(dia_constraint_ids + 2, "rib_diameter")
+    batch.rename_constraint(dia_constraint_ids + 3, "normative_diameter")
+    batch.rename_constraint(dia_constraint_ids + 4, "core_diameter")
+
+    # Lines for distance between ribs
+    new_geo = [Part.LineSegment(rib_centers[i], rib_centers[(i + 1) % 3]) for i in range(3)]
+    line_ids = batch.add_geometry(new_geo, construction=True)
+    for i in range(3):
+        new_constraints = [
+            Sketcher.Constraint("Coincident", line_ids + i, 1, rib_arc_ids + i, 3),
+            Sketcher.Constraint("Coincident", line_ids + i, 2, rib_arc_ids + ((i + 1) % 3), 3),
+        ]
+        batch.add_constraints(new_constraints)
+
+    # Constrain distance between ribs to be equal
+    new_constraints = [
+        Sketcher.Constraint("Equal", line_ids + 0, line_ids + 1),
+        Sketcher.Constraint("Equal", line_ids + 0, line_ids + 2),
+    ]
+    batch.add_constraints(new_constraints)
+
+    # Finally, constrain rotation of the ribs around the center
+    new_constraints = [
+        Sketcher.Constraint("PointOnObject", rib_arc_ids + 0, 3, -1),
+    ]
+    batch.add_constraints(new_constraints)
+    batch.commit()
+
+    # Inside a DeferredRecompute, the sketch is not solved yet, but only
+    # solved geometry may go into the cache
+    if use_cache and sketch.solve() == 0:
+        RIB_TEMPLATE_CACHE.store(sketch, rib_param)
+
+
+def write_rib_param_properties(template, rib_param: RibParameters):
+    Utils.assert_sketch(template)
+
+    if "EntranceDepth" not in template.PropertiesList:
+        template.addProperty("App::PropertyLength", "EntranceDepth", group="RibParameters")
+    if "OuterDiameter" not in template.PropertiesList:
+        template.addProperty("App::PropertyLength", "OuterDiameter", group="RibParameters")
+    if "RibEngagement" not in template.PropertiesList:
+        template.addProperty("App::PropertyLength", "RibEngagement", group="RibParameters")
+    if "RibDiameter" not in template.PropertiesList:
+        template.addProperty("App::PropertyLength", "RibDiameter", group="RibParameters")
+
+    template.EntranceDepth = rib_param.entrance_depth
+    template.OuterDiameter = rib_param.outer_diameter
+    template.RibEngagement = rib_param.rib_engagement
+    template.RibDiameter = rib_param.rib_diameter
+
+    # Make properties read-only
+    template.setEditorMode("EntranceDepth", 1)
+    template.setEditorMode("OuterDiameter", 1)
+    template.setEditorMode("RibEngagement", 1)
+    template.setEditorMode("RibDiameter", 1)
+
+
+def rib_template_name(hole, global_template: bool):
+    if global_template:
+        # Object names cannot contain dots
+        thread_size = canonical_thread_size(hole.ThreadSize).replace(".", "_")
+        return f"RibThread_{thread_size}_Template"
+    else:
+        return f"{hole.Name}_RibThread_Template"
+
+
+def find_rib_template(body, hole, global_template: bool):
+    name = rib_template_name(hole, global_template)
+    if global_template:
+        template = body.Document.getObject(name)
+        if template is None:
+            # Documents from before global templates were keyed by the
+            # canonical thread size
+            template = body.Document.getObject(f"RibThread_{hole.ThreadSize}_Template".replace(".", "_"))
+        return template
+    else:
+        template = Utils.find_treatment(hole, "rib_threads", "_RibThread_Template")
+        if template is None:
+            # Templates from before the Hole recorded its treatments
+            template = body.getObject(name)
+        return template
+
+
+def find_rib_settings(body, hole):
+    varset = Utils.find_treatment(hole, "rib_threads", "_RibThread_Settings")
+    if varset is None:
+        # Settings from before the Hole recorded its treatments
+        varset = body.getObject(rib_settings_name(hole))
+    return varset
+
+
+def has_rib_template(body, hole, global_template: bool) -> bool:
+    return find_rib_template(body, hole, global_template) is not None
+
+
+def build_rib_template(template, label: str, rib_param: RibParameters):
+    template.Label = label
+    template.Visibility = False
+
+    make_rib_template(template, rib_param)
+    write_rib_param_properties(template, rib_param)
+    return template
+
+
+def rib_param_differs(template, rib_param: RibParameters) -> bool:
+    values = {
+        "EntranceDepth": rib_param.entrance_depth,
+        "OuterDiameter": rib_param.outer_diameter,
+        "RibEngagement": rib_param.rib_engagement,
+        "RibDiameter": rib_param.rib_diameter,
+    }
+    return any(
+        prop in template.PropertiesList and not math.isclose(getattr(template, prop).Value, value)
+        for prop, value in values.items()
+    )
+
+
+def link_library_rib_template(body, hole, rib_param: RibParameters):
+    name = rib_template_name(hole, True)
+    label = f"RibThread_{canonical_thread_size(hole.ThreadSize)}_Template"
+
+    target = template_library.get_or_create_library_object(
+        name, lambda library: build_rib_template(library.addObject("Sketcher::SketchObject", name), label, rib_param)
+    )
+    if rib_param_differs(target, rib_param):
+        Utils.Log.warning(
+            f"{label} of the template library has different rib parameters, "
+            "using the ones of the library.  Edit the library to change them."
+        )
+
+    return template_library.link_library_object(body.Document, name, target, label)
+
+
+def get_or_create_rib_template(
+    body, hole, global_template: bool, rib_param: RibParameters, *, use_library: bool = False
+):
+    """
+    Find the rib template for a Hole or create it.
+
+    With `use_library`, a missing global template is not built in the document
+    but linked from the template library, where it is created once per thread
+    size.
+    """
+    template = find_rib_template(body, hole, global_template)
+    if template is not None:
+        return template
+
+    name = rib_template_name(hole, global_template)
+    if global_template and use_library:
+        return link_library_rib_template(body, hole, rib_param)
+    elif global_template:
+        label = f"RibThread_{canonical_thread_size(hole.ThreadSize)}_Template"
+        template = body.Document.addObject("Sketcher::SketchObject", name)
+        return build_rib_template(template, label, rib_param)
+    else:
+        template = body.newObject("Sketcher::SketchObject", name)
+        return build_rib_template(template, f"{hole.Label}_RibThread_Template", rib_param)
+
+
+@Utils.Log.timed
+def make_rib_threads(
+    body,
+    hole,
+    global_template: bool,
+    rib_param: RibParameters,
+    *,
+    compound_profile: bool = True,
+    use_library: typing.Optional[bool] = None,
+):
+    """
+    Generate thread forming ribs for all circles of a Hole.
+
+    With `compound_profile`, the rib outlines of a Hole with multiple circles
+    are placed by a single link array and cut from one compound shape-binder.
+    Otherwise, one shape-binder is generated per circle and merged afterwards.
+
+    With `use_library`, a global template is linked from the template library
+    instead of being built in the document.  It defaults to the
+    `UseTemplateLibrary` preference.
+    """
+    if use_library is None:
+        use_library = template_library.use_template_library()
+
+    Utils.assert_body(body)
+    Utils.assert_hole(hole)
+
+    profile_sketch = Utils.get_hole_profile_sketch(hole)
+
+    template = get_or_create_rib_template(body, hole, global_template, rib_param, use_library=use_library)
+
+    # Only generate the varset if it does not exist yet
+    varset = find_rib_settings(body, hole)
+    if varset is None:
+        varset = body.newObject("App::VarSet", rib_settings_name(hole))
+        varset.Label = f"{hole.Label}_RibThread"
+        varset.addProperty("App::PropertyLength", "EntranceDepth", "Base")
+        varset.addProperty("App::PropertyLength", "EntranceDiameter", "Base")
+        varset.addProperty("App::PropertyAngle", "Rotation", "Base")
+        varset.EntranceDepth = f"{rib_param.entrance_depth} mm"
+        varset.EntranceDiameter = f"{rib_param.outer_diameter} mm"
+        varset.Rotation = "0 deg"
+        Utils.recompute(varset)
+    # Right away, `add_entrance_circle` looks it up
+    Utils.record_treatments([hole], "rib_threads", [(varset, "_RibThread_Settings")])
+
+    generated = [(template, "_RibThread_Template")]
+    sketch_entrance = Utils.make_derived_sketch(body, profile_sketch, "_ThreadEntrance")
+    generated.append((sketch_entrance, "_ThreadEntrance"))
+    batch_entrance = Utils.SketchBatch(sketch_entrance)
+
+    digest = Utils.ProfileDigest(body, hole)
+    geometry = digest.geometry
+    circles = geometry.circles
+    for index in circles:
+        add_entrance_circle(batch_entrance, hole, digest, index)
+
+    if len(circles) == 1 and not global_template:
+        # In the special case of the Hole only having one circle and we have
+        # generated a local template, we can just move this local template in
+        # place and use it for the pocket directly.
+        template.setExpression("Placement", rib_placement_expr(varset, digest, circles[0], in_body=True))
+        Utils.set_profile_fingerprint(template, [geometry.tag(circles[0])])
+        Utils.recompute(template)
+
+        rib_threads_profile_obj = template
+    elif compound_profile and len(circles) > 1:
+        rib_threads_profile_obj = Utils.make_sketch_offset_compound_binder(
+            body,
+            template,
+            profile_sketch,
+            name=f"{hole.Name}_RibThreads",
+            label=f"{hole.Label}_RibThreads",
+            center_exprs=[digest.center(index) for index in circles],
+            rotation_expr=f"rotation({varset.Name}.Rotation; 0; 0)",
+        )
+        link_array = rib_threads_profile_obj.Support[0][0]
+        Utils.set_profile_fingerprint(link_array, [geometry.tag(index) for index in circles])
+        generated += [(link_array, "_RibThreads_Array"), (rib_threads_profile_obj, "_RibThreads")]
+    else:
+        shape_binders = []
+        for index in circles:
+            binder = Utils.make_sketch_offset_shape_binder(
+                body=body,
+                template=template,
+                sketch=profile_sketch,
+                suffix=f"_RibThread{index + 1:03}",
+                center_expr=digest.center(index),
+                rotation_expr=f"rotation({varset.Name}.Rotation; 0; 0)",
+            )
+            Utils.set_profile_fingerprint(binder, [geometry.tag(index)])
+            shape_binders.append(binder)
+            generated.append((binder, "_RibThread"))
+
+        if len(shape_binders) == 1:
+            rib_threads_profile_obj = shape_binders[0]
+        else:
+            # When we have more than one shape binder, we first have to merge them
+            # all before we can make a pocket from them.
+            merged_binder = body.newObject("PartDesign::SubShapeBinder", f"{hole.Name}_RibThreads")
+            merged_binder.Support = [(b, "") for b in shape_binders]
+            merged_binder.Relative = True
+            Utils.set_shape_binder_styles(merged_binder)
+            Utils.recompute(merged_binder)
+            rib_threads_profile_obj = merged_binder
+            generated.append((merged_binder, "_RibThreads"))
+
+    batch_entrance.commit()
+    Utils.set_profile_fingerprint(sketch_entrance, [geometry.tag(index) for index in circles])
+
+    pocket_ribs = body.newObject("PartDesign::Pocket", f"{hole.Name}_ThreadRibs")
+    pocket_ribs.Profile = (rib_threads_profile_obj, "")
+    pocket_ribs.Reversed = hole.Reversed
+    rib_threads_profile_obj.Visibility = False
+    pocket_ribs.setExpression("Type", f"{hole.Name}.DepthType")
+    pocket_ribs.setExpression("Length", f"{hole.Name}.Depth")
+    pocket_ribs.Label = f"{hole.Label}_ThreadRibs"
+    Utils.recompute(pocket_ribs)
+
+    if hole.Reversed:
+        sketch_entrance.setExpression(".AttachmentOffset.Base.z", f"{varset.Name}.EntranceDepth")
+    else:
+        sketch_entrance.setExpression(".AttachmentOffset.Base.z", f"-{varset.Name}.EntranceDepth")
+    Utils.recompute(sketch_entrance)
+
+    pocket_entrance = body.newObject("PartDesign::Pocket", f"{hole.Name}_ThreadEntrance")
+    pocket_entrance.Profile = (sketch_entrance, "")
+    pocket_entrance.ReferenceAxis = (sketch_entrance, ["N_Axis"])
+    pocket_entrance.Reversed = hole.Reversed
+    pocket_entrance.Type = "TwoLengths"
+    pocket_entrance.TaperAngle = "-20 deg"
+    sketch_entrance.Visibility = False
+    # 2.8 is roughly the tan(90 - 20 deg), so the taper will be complete
+    pocket_entrance.setExpression("Length", f"({varset.Name}.EntranceDiameter - {hole.Name}.Diameter) * 2.8")
+    pocket_entrance.setExpression("Length2", f"{varset.Name}.EntranceDepth")
+    pocket_entrance.Label = f"{hole.Label}_ThreadEntrance"
+    Utils.recompute(pocket_entrance)
+
+    generated += [(pocket_ribs, "_ThreadRibs"), (pocket_entrance, "_ThreadEntrance")]
+    Utils.record_treatments([hole], "rib_threads", generated)
+
+
+def rib_settings_name(hole) -> str:
+    return f"{hole.Name}_RibThread_Settings"
+
+
+def rib_placement_expr(settings, digest: Utils.ProfileDigest, index: int, *, in_body: bool = False) -> str:
+    """
+    Placement of the ribs on circle `index` of the Hole's profile sketch,
+    bound to the slot of the circle in the profile digest so it follows the
+    circle to a new index.  Relative to the profile sketch or, with
+    `in_body`, in body coordinates.  `settings` is the rib settings VarSet.
+    """
+    placement = f"placement({digest.center(index)}; rotation({settings.Name}.Rotation; 0; 0))"
+    if in_body:
+        return f"{digest.profile_sketch.Name}.Placement * {placement}"
+    return placement
+
+
+def add_entrance_circle(batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int):
+    """Add the thread entrance for circle `index` of the Hole's profile sketch."""
+    if "EntranceDiameter" not in digest.varset.PropertiesList:
+        settings = find_rib_settings(hole.getParent(), hole)
+        digest.quantity("EntranceDiameter", f"{settings.Name}.EntranceDiameter")
+    make_parametric_circle(batch, digest.x(index), digest.y(index), f"{digest.varset.Name}.EntranceDiameter")
+
+
+def verify_rib_thread_suitability(hole):
+    Utils.assert_hole(hole)
+
+    if Utils.hole_has_counterbore_maybe(hole):
+        Utils.Log.warning(
+            "Making thread forming ribs on a hole with counterbore.  The result will probably be unexpected..."
+        )
+
+    if not hole.Threaded:
+        raise Utils.ffDesignError("Cannot make thread forming ribs on a hole that is not threaded!")
+
+    if hole.ModelThread:
+        raise Utils.ffDesignError("Cannot make thread forming ribs on a hole with modelled threads!")
+
+    if hole.Tapered:
+        raise Utils.ffDesignError("Cannot make thread forming ribs on a tapered hole!")
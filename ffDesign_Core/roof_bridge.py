@@ -0,0 +1,326 @@
+import math
+import typing
+
+import FreeCAD as App
+import Part
+import Sketcher
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import merge_keys, outline_math
+
+
+def make_parametric_roof_bridge(
+    batch: Utils.SketchBatch,
+    *,
+    x_expr: str,
+    y_expr: str,
+    diameter_expr: str,
+    angle_expr: str,
+    rotation_expr: str,
+    clearance_expr: str,
+):
+    new_geo = [
+        Part.ArcOfCircle(
+            Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), 1),
+            math.pi / 4 * 3,
+            math.pi / 4 * 1,
+        ),
+        Part.LineSegment(App.Vector(-1, 1, 0), App.Vector(-0.5, 2, 0)),
+        Part.LineSegment(App.Vector(1, 1, 0), App.Vector(0.5, 2, 0)),
+        Part.LineSegment(App.Vector(0, 0, 0), App.Vector(0, 2, 0)),
+        Part.LineSegment(App.Vector(-0.5, 2, 0), App.Vector(0.5, 2, 0)),
+    ]
+    last_geo_id = batch.add_geometry(new_geo)
+    batch.toggle_construction(last_geo_id + 3)
+
+    new_constraints = [
+        Sketcher.Constraint("Coincident", last_geo_id + 1, 2, last_geo_id + 4, 1),
+        Sketcher.Constraint("Coincident", last_geo_id + 2, 2, last_geo_id + 4, 2),
+        Sketcher.Constraint("Coincident", last_geo_id + 0, 3, last_geo_id + 3, 1),
+        Sketcher.Constraint("Tangent", last_geo_id + 0, 1, last_geo_id + 1, 1),
+        Sketcher.Constraint("Tangent", last_geo_id + 0, 2, last_geo_id + 2, 1),
+        Sketcher.Constraint("Symmetric", last_geo_id + 4, 1, last_geo_id + 4, 2, last_geo_id + 3, 2),
+        Sketcher.Constraint("Perpendicular", last_geo_id + 4, last_geo_id + 3),
+    ]
+    batch.add_constraints(new_constraints)
+
+    new_constraints = [
+        Sketcher.Constraint("DistanceX", last_geo_id + 0, 3, 0),
+        Sketcher.Constraint("DistanceY", last_geo_id + 0, 3, 0),
+        Sketcher.Constraint("Diameter", last_geo_id + 0, 2),
+        Sketcher.Constraint("Angle", last_geo_id + 1, 2, last_geo_id + 2, 2, math.pi / 2),
+        Sketcher.Constraint("Angle", last_geo_id + 3, math.pi / 2),
+        Sketcher.Constraint("Distance", last_geo_id + 3, 1, last_geo_id + 3, 2, 2),
+    ]
+    last_c = batch.add_constraints(new_constraints)
+    batch.set_expression(last_c + 0, x_expr)
+    batch.set_expression(last_c + 1, y_expr)
+    batch.set_expression(last_c + 2, f"{diameter_expr}")
+    batch.set_expression(last_c + 3, f"{angle_expr} * 2")
+    batch.set_expression(last_c + 4, f"{rotation_expr}")
+    batch.set_expression(last_c + 5, f"{diameter_expr} / 2 + {clearance_expr}")
+
+
+def add_roof_bridge(batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int):
+    """Add the roof bridge for circle `index` of the Hole's profile sketch."""
+    make_parametric_roof_bridge(
+        batch,
+        x_expr=digest.x(index),
+        y_expr=digest.y(index),
+        diameter_expr=f"{hole.Name}.Diameter",
+        angle_expr=f"{hole.Name}.RoofBridgeOverhangAngle",
+        rotation_expr=f"{hole.Name}.RoofBridgeRotation",
+        clearance_expr=f"{hole.Name}.RoofBridgeClearance",
+    )
+
+
+def add_counterbore_roof_bridge(batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int):
+    """Add the roof bridge for the counterbore of circle `index` of the Hole's profile sketch."""
+    make_parametric_roof_bridge(
+        batch,
+        x_expr=digest.x(index),
+        y_expr=digest.y(index),
+        diameter_expr=f"{hole.Name}.HoleCutDiameter",
+        angle_expr=f"{hole.Name}.RoofBridgeOverhangAngle",
+        rotation_expr=f"{hole.Name}.RoofBridgeRotation",
+        clearance_expr=f"{hole.Name}.RoofBridgeClearance",
+    )
+
+
+def add_closed_form_roof_bridge(
+    batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int, *, diameter: str, prefix: str
+):
+    """
+    Add a roof bridge around circle `index` of the Hole's profile sketch, with
+    every vertex placed by a closed-form expression instead of being solved.
+    The offsets of the vertices are kept in the digest under `prefix`.
+
+    A roof at or beyond the tip of the flanks would leave a roof line of zero
+    length, which cannot be added to the sketch, see `check_closed_form_clearance`.
+    """
+    check_closed_form_clearance(hole, diameter)
+    radius = f"{hole.Name}.{diameter} / 2"
+    angle = f"{hole.Name}.RoofBridgeOverhangAngle"
+    rotation = f"{hole.Name}.RoofBridgeRotation"
+    # The roof sits at the bridge distance from the center, its corners on
+    # the flanks touching the circle, see `outline_math.roof_bridge_offsets`
+    roof = f"min({radius} + {hole.Name}.RoofBridgeClearance; {radius} / sin({angle}))"
+    corner = f"({radius} - {roof} * sin({angle})) / cos({angle})"
+    offsets = {
+        "Start": (f"{radius} * sin({angle})", f"{radius} * cos({angle})"),
+        "End": (f"{radius} * sin({angle})", f"-{radius} * cos({angle})"),
+        "RoofStart": (roof, f"-{corner}"),
+        "RoofEnd": (roof, corner),
+    }
+    offsets = {name: digest.offset(f"{prefix}{name}", u, v, rotation) for name, (u, v) in offsets.items()}
+
+    arc, roof_start, roof_end = roof_bridge_outline(
+        digest.geometry.center(index),
+        getattr(hole, diameter).Value / 2,
+        math.radians(hole.RoofBridgeOverhangAngle.Value),
+        math.radians(hole.RoofBridgeRotation.Value),
+        hole.RoofBridgeClearance.Value,
+    )
+    points = {"Start": arc.StartPoint, "End": arc.EndPoint, "RoofStart": roof_start, "RoofEnd": roof_end}
+    x, y = digest.x(index), digest.y(index)
+    first_line = Utils.add_fixed_lines(
+        batch,
+        [
+            (points[name], f"{x} + {offsets[name][0]}", f"{y} + {offsets[name][1]}")
+            for name in ["End", "RoofStart", "RoofEnd", "Start"]
+        ],
+    )
+    Utils.add_hanging_arc(batch, arc, (first_line + 2, 2), (first_line, 1), radius)
+
+
+def check_closed_form_clearance(hole, diameter: str):
+    """
+    Refuse a roof bridge clearance reaching the tip of the flanks in a
+    closed-form sketch.  Its blocks of geometry have a fixed size, so the roof
+    line cannot be left out.
+    """
+    if outline_math.roof_reaches_tip(
+        getattr(hole, diameter).Value / 2,
+        math.radians(hole.RoofBridgeOverhangAngle.Value),
+        hole.RoofBridgeClearance.Value,
+    ):
+        raise Utils.ffDesignPreconditionError(
+            f"The bridge clearance of {hole.Label} reaches the tip of the roof bridge, so there is no roof left.  "
+            "Use a smaller bridge clearance, a teardrop shape or the fast mode."
+        )
+
+
+def add_roof_bridge_closed_form(batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int):
+    """Closed-form variant of `add_roof_bridge`."""
+    add_closed_form_roof_bridge(batch, hole, digest, index, diameter="Diameter", prefix="RoofBridge")
+
+
+def add_counterbore_roof_bridge_closed_form(batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int):
+    """Closed-form variant of `add_counterbore_roof_bridge`."""
+    add_closed_form_roof_bridge(batch, hole, digest, index, diameter="HoleCutDiameter", prefix="RoofBridgeCb")
+
+
+def roof_bridge_outline(center: App.Vector, radius: float, angle: float, rotation: float, clearance: float) -> tuple:
+    """
+    Closed-form arc and roof corners of the roof bridge outline in the XY
+    plane, the same as the one solved by `make_parametric_roof_bridge`, see
+    `outline_math.roof_bridge_offsets`.  Angles are given in radians.
+    """
+    offsets = outline_math.roof_bridge_offsets(radius, angle, clearance)
+    # The flanks touch the circle where they are perpendicular to its radius
+    tangent = math.pi / 2 - angle
+    circle = Part.Circle(center, App.Vector(0, 0, 1), radius)
+    arc = Part.ArcOfCircle(circle, rotation + tangent, rotation - tangent + 2 * math.pi)
+    roof_start = center + App.Vector(*outline_math.rotate_offset(offsets["RoofStart"], rotation), 0)
+    roof_end = center + App.Vector(*outline_math.rotate_offset(offsets["RoofEnd"], rotation), 0)
+    return arc, roof_start, roof_end
+
+
+def roof_bridge_face(center: App.Vector, radius: float, angle: float, rotation: float, clearance: float):
+    """Closed-form roof bridge outline as a face, see `roof_bridge_outline`."""
+    arc, roof_start, roof_end = roof_bridge_outline(center, radius, angle, rotation, clearance)
+    edges = [
+        arc.toShape(),
+        Part.LineSegment(arc.EndPoint, roof_start).toShape(),
+    ]
+    if not roof_start.isEqual(roof_end, 1e-7):
+        edges.append(Part.LineSegment(roof_start, roof_end).toShape())
+    edges.append(Part.LineSegment(roof_end, arc.StartPoint).toShape())
+    return Part.Face(Part.Wire(edges))
+
+
+def roof_bridge_faces(holes: list, counterbore: bool) -> list:
+    """
+    Roof bridge faces around every circle of the Holes, or around their
+    counterbores, from their `RoofBridge*` properties.
+    """
+    faces = []
+    for hole in holes:
+        geometry = Utils.SketchGeometry(Utils.get_hole_profile_sketch(hole))
+        diameter = hole.HoleCutDiameter.Value if counterbore else hole.Diameter.Value
+        faces += [
+            roof_bridge_face(
+                geometry.center(index),
+                diameter / 2,
+                math.radians(hole.RoofBridgeOverhangAngle.Value),
+                math.radians(hole.RoofBridgeRotation.Value),
+                hole.RoofBridgeClearance.Value,
+            )
+            for index in geometry.circles
+        ]
+    return faces
+
+
+def make_static_roof_bridges(body, holes: list, counterbore: bool, suffix: str, *, length=None):
+    faces = roof_bridge_faces(holes, counterbore)
+    profile, shape_binder, pocket = Utils.make_static_profile_pocket(body, holes[0], faces, suffix, length=length)
+    Utils.record_treatments(
+        holes,
+        "roof_bridge",
+        [(profile, f"{suffix}_Profile"), (shape_binder, f"{suffix}_Binder"), (pocket, suffix)],
+    )
+
+
+# Holes with the same key can share the generated sketches and pockets, see
+# `Utils.group_mergeable_holes`
+merge_key = merge_keys.roof_bridge_merge_key
+
+
+@Utils.Log.timed
+def make_roof_bridges(
+    body,
+    hole,
+    *,
+    angle: App.Units.Quantity,
+    rotation: App.Units.Quantity,
+    do_counterbore: bool,
+    bridge_clearance: App.Units.Quantity,
+    fast: bool = False,
+    closed_form: bool = False,
+    merged_holes: typing.Sequence = (),
+):
+    """
+    Cut a roof bridge shape around each circle of a Hole and, with
+    `do_counterbore`, around its counterbores.
+
+    With `fast`, the roof bridges are computed directly instead of being solved
+    in a sketch and cut by a single pocket each.  This is much faster for
+    Holes with many circles, but the result does not follow later changes of
+    the Hole.
+
+    With `closed_form`, the sketches stay parametric but every vertex is placed
+    by its own expression, leaving the sketch solver next to nothing to solve.
+
+    The roof bridges of `merged_holes` are cut by the same sketches and
+    pockets.  These Holes must be compatible with `hole`, see `merge_key`.
+    """
+    Utils.assert_body(body)
+    Utils.assert_hole(hole)
+
+    angle = App.Units.Quantity(angle)
+    assert angle.Unit.Type == "Angle"
+    rotation = App.Units.Quantity(rotation)
+    assert rotation.Unit.Type == "Angle"
+    bridge_clearance = App.Units.Quantity(bridge_clearance)
+    assert bridge_clearance.Unit.Type == "Length"
+
+    holes = [hole, *merged_holes]
+    for h in holes:
+        if "RoofBridgeOverhangAngle" not in h.PropertiesList:
+            h.addProperty("App::PropertyAngle", "RoofBridgeOverhangAngle", group="FusedFilamentDesign")
+        h.RoofBridgeOverhangAngle = angle
+
+        if "RoofBridgeRotation" not in h.PropertiesList:
+            h.addProperty("App::PropertyAngle", "RoofBridgeRotation", group="FusedFilamentDesign")
+        h.RoofBridgeRotation = rotation
+
+        if "RoofBridgeClearance" not in h.PropertiesList:
+            h.addProperty("App::PropertyLength", "RoofBridgeClearance", group="FusedFilamentDesign")
+        h.RoofBridgeClearance = bridge_clearance
+
+    if closed_form:
+        # Before anything is generated
+        for h in holes:
+            check_closed_form_clearance(h, "Diameter")
+            if do_counterbore and Utils.hole_has_counterbore_maybe(h):
+                check_closed_form_clearance(h, "HoleCutDiameter")
+
+    profile_sketch = Utils.get_hole_profile_sketch(hole)
+
+    if fast:
+        make_static_roof_bridges(body, holes, False, "_RoofBridge")
+        if do_counterbore and Utils.hole_has_counterbore_maybe(hole):
+            make_static_roof_bridges(body, holes, True, "_RoofBridgeCb", length=hole.HoleCutDepth)
+        return
+
+    roofbridge_sketch = Utils.make_derived_sketch(body, profile_sketch, "_RoofBridge")
+    add_block = add_roof_bridge_closed_form if closed_form else add_roof_bridge
+    Utils.fill_derived_sketches(body, holes, [(roofbridge_sketch, add_block)], closed_form=closed_form)
+
+    pocket = body.newObject("PartDesign::Pocket", f"{hole.Name}_RoofBridge")
+    pocket.Profile = (roofbridge_sketch, "")
+    pocket.ReferenceAxis = (roofbridge_sketch, ["N_Axis"])
+    pocket.Reversed = hole.Reversed
+    roofbridge_sketch.Visibility = False
+    pocket.setExpression("Type", f"{hole.Name}.DepthType")
+    pocket.setExpression("Length", f"{hole.Name}.Depth")
+    pocket.Label = f"{hole.Label}_RoofBridge"
+    Utils.recompute(pocket)
+    Utils.record_treatments(holes, "roof_bridge", [(roofbridge_sketch, "_RoofBridge"), (pocket, "_RoofBridge")])
+
+    if not do_counterbore or not Utils.hole_has_counterbore_maybe(hole):
+        return
+
+    roofbridge_cb_sketch = Utils.make_derived_sketch(body, profile_sketch, "_RoofBridgeCb")
+    add_block = add_counterbore_roof_bridge_closed_form if closed_form else add_counterbore_roof_bridge
+    Utils.fill_derived_sketches(body, holes, [(roofbridge_cb_sketch, add_block)], closed_form=closed_form)
+
+    pocket = body.newObject("PartDesign::Pocket", f"{hole.Name}_RoofBridgeCb")
+    pocket.Profile = (roofbridge_cb_sketch, "")
+    pocket.ReferenceAxis = (roofbridge_cb_sketch, ["N_Axis"])
+    pocket.Reversed = hole.Reversed
+    roofbridge_cb_sketch.Visibility = False
+    pocket.setExpression("Length", f"{hole.Name}.HoleCutDepth")
+    pocket.Label = f"{hole.Label}_RoofBridgeCb"
+    Utils.recompute(pocket)
+    Utils.record_treatments(holes, "roof_bridge", [(roofbridge_cb_sketch, "_RoofBridgeCb"), (pocket, "_RoofBridgeCb")])
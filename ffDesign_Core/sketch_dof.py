@@ -0,0 +1,98 @@
+"""
+Degrees of freedom of a sketch, counted from its geometry and constraints as
+the sketch solver sets up its equations, see `recompute_report`.  Only reads
+the `TypeId` of geometry and the fields of constraints, so this does not need
+FreeCAD.
+"""
+
+import typing
+
+# GeoId of an unused constraint field
+GEO_UNDEF = -2000
+
+# The horizontal and vertical axis of a sketch are GeoIds -1 and -2, external
+# geometry starts below them
+FIRST_EXTERNAL_GEO_ID = -3
+
+# Solver parameters per geometry type
+GEOMETRY_PARAMETERS = {
+    "Part::GeomPoint": 2,
+    "Part::GeomLineSegment": 4,
+    "Part::GeomCircle": 3,
+    "Part::GeomArcOfCircle": 5,
+    "Part::GeomEllipse": 5,
+    "Part::GeomArcOfEllipse": 7,
+}
+
+# Equations per constraint type, for constraints between whole edges.  The
+# solver adds point-on-object or coincidence equations when tangency,
+# perpendicularity and angles are taken at a vertex.
+CONSTRAINT_EQUATIONS = {
+    "Coincident": 2,
+    "Horizontal": 1,
+    "Vertical": 1,
+    "Parallel": 1,
+    "Perpendicular": 1,
+    "Tangent": 1,
+    "Distance": 1,
+    "DistanceX": 1,
+    "DistanceY": 1,
+    "Radius": 1,
+    "Diameter": 1,
+    "Angle": 1,
+    "Equal": 1,
+    "PointOnObject": 1,
+    "Symmetric": 2,
+    "Weight": 1,
+}
+
+
+def geometry_parameters(geometry) -> typing.Optional[int]:
+    return GEOMETRY_PARAMETERS.get(geometry.TypeId)
+
+
+def constraint_equations(constraint, geometry: list) -> typing.Optional[int]:
+    """
+    Equations a constraint adds to the solver, `None` for constraint types
+    this does not know.  Reference and inactive constraints add none.
+    """
+    if not constraint.Driving or not getattr(constraint, "IsActive", True):
+        return 0
+    if constraint.Type == "Block":
+        return geometry_parameters(geometry[constraint.First])
+    equations = CONSTRAINT_EQUATIONS.get(constraint.Type)
+    if equations is None:
+        return None
+    if constraint.Type in ["Tangent", "Perpendicular", "Angle"]:
+        if constraint.Third != GEO_UNDEF:
+            # Via a point, which lies on both edges
+            return equations + 2
+        # An endpoint on the other edge adds one equation, endpoint to
+        # endpoint makes them coincident with two
+        return equations + int(constraint.FirstPos != 0) + int(constraint.SecondPos != 0)
+    return equations
+
+
+def degrees_of_freedom(geometry: list, constraints: list) -> typing.Optional[int]:
+    """
+    Parameters of the `geometry` not fixed by the `constraints`, for a sketch
+    that solves without redundant or conflicting constraints.  External
+    geometry is fixed and does not count.  `None` if the sketch holds geometry
+    or constraints of unknown types.
+    """
+    parameters = [geometry_parameters(geo) for geo in geometry]
+    equations = [constraint_equations(constraint, geometry) for constraint in constraints]
+    if None in parameters or None in equations:
+        return None
+    return max(sum(parameters) - sum(equations), 0)
+
+
+def external_to_internal(geo_id: int, geometry_count: int) -> int:
+    """
+    GeoId of external geometry once it is appended to the `geometry_count`
+    elements of a sketch, in the order of `ExternalGeo` without the axes.
+    Other GeoIds are kept.
+    """
+    if geo_id == GEO_UNDEF or geo_id > FIRST_EXTERNAL_GEO_ID:
+        return geo_id
+    return geometry_count + FIRST_EXTERNAL_GEO_ID - geo_id
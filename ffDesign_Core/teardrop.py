@@ -0,0 +1,215 @@
+import math
+import typing
+
+import FreeCAD as App
+import Part
+import Sketcher
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import merge_keys, outline_math
+
+
+def make_parametric_teardrop(
+    batch: Utils.SketchBatch, *, x_expr: str, y_expr: str, diameter_expr: str, angle_expr: str, rotation_expr: str
+):
+    new_geo = [
+        Part.ArcOfCircle(
+            Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), 1),
+            math.pi / 4 * 3,
+            math.pi / 4 * 1,
+        ),
+        Part.LineSegment(App.Vector(-1, 1, 0), App.Vector(0, 2, 0)),
+        Part.LineSegment(App.Vector(1, 1, 0), App.Vector(0, 2, 0)),
+        Part.LineSegment(App.Vector(0, 0, 0), App.Vector(0, 2, 0)),
+    ]
+    last_geo_id = batch.add_geometry(new_geo)
+    batch.toggle_construction(last_geo_id + 3)
+
+    new_constraints = [
+        Sketcher.Constraint("Coincident", last_geo_id + 1, 2, last_geo_id + 2, 2),
+        Sketcher.Constraint("Coincident", last_geo_id + 1, 2, last_geo_id + 3, 2),
+        Sketcher.Constraint("Coincident", last_geo_id + 0, 3, last_geo_id + 3, 1),
+        Sketcher.Constraint("Tangent", last_geo_id + 0, 1, last_geo_id + 1, 1),
+        Sketcher.Constraint("Tangent", last_geo_id + 0, 2, last_geo_id + 2, 1),
+    ]
+    batch.add_constraints(new_constraints)
+
+    new_constraints = [
+        Sketcher.Constraint("DistanceX", last_geo_id + 0, 3, 0),
+        Sketcher.Constraint("DistanceY", last_geo_id + 0, 3, 0),
+        Sketcher.Constraint("Diameter", last_geo_id + 0, 2),
+        Sketcher.Constraint("Angle", last_geo_id + 1, 2, last_geo_id + 2, 2, math.pi / 2),
+        Sketcher.Constraint("Angle", last_geo_id + 3, math.pi / 2),
+    ]
+    last_c = batch.add_constraints(new_constraints)
+    batch.set_expression(last_c + 0, x_expr)
+    batch.set_expression(last_c + 1, y_expr)
+    batch.set_expression(last_c + 2, f"{diameter_expr}")
+    batch.set_expression(last_c + 3, f"{angle_expr}")
+    batch.set_expression(last_c + 4, f"{rotation_expr}")
+
+
+def add_teardrop(batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int):
+    """Add the teardrop for circle `index` of the Hole's profile sketch."""
+    make_parametric_teardrop(
+        batch,
+        x_expr=digest.x(index),
+        y_expr=digest.y(index),
+        diameter_expr=f"{hole.Name}.Diameter",
+        angle_expr=f"{hole.Name}.TeardropAngle",
+        rotation_expr=f"{hole.Name}.TeardropRotation",
+    )
+
+
+def add_teardrop_closed_form(batch: Utils.SketchBatch, hole, digest: Utils.ProfileDigest, index: int):
+    """
+    Add the teardrop for circle `index` of the Hole's profile sketch, with
+    every vertex placed by a closed-form expression instead of being solved.
+    """
+    radius = f"{hole.Name}.Diameter / 2"
+    half_angle = f"{hole.Name}.TeardropAngle / 2"
+    rotation = f"{hole.Name}.TeardropRotation"
+    start_x, start_y = digest.offset(
+        "TeardropStart", f"{radius} * sin({half_angle})", f"{radius} * cos({half_angle})", rotation
+    )
+    end_x, end_y = digest.offset(
+        "TeardropEnd", f"{radius} * sin({half_angle})", f"-{radius} * cos({half_angle})", rotation
+    )
+    tip_x, tip_y = digest.offset("TeardropTip", f"{radius} / sin({half_angle})", "0 mm", rotation)
+
+    arc, tip = teardrop_outline(
+        digest.geometry.center(index),
+        hole.Diameter.Value / 2,
+        math.radians(hole.TeardropAngle.Value),
+        math.radians(hole.TeardropRotation.Value),
+    )
+    x, y = digest.x(index), digest.y(index)
+    first_line = Utils.add_fixed_lines(
+        batch,
+        [
+            (arc.EndPoint, f"{x} + {end_x}", f"{y} + {end_y}"),
+            (tip, f"{x} + {tip_x}", f"{y} + {tip_y}"),
+            (arc.StartPoint, f"{x} + {start_x}", f"{y} + {start_y}"),
+        ],
+    )
+    Utils.add_hanging_arc(batch, arc, (first_line + 1, 2), (first_line, 1), radius)
+
+
+# Holes with the same key can share the generated sketches and pockets, see
+# `Utils.group_mergeable_holes`
+merge_key = merge_keys.teardrop_merge_key
+
+
+def teardrop_outline(center: App.Vector, radius: float, angle: float, rotation: float) -> tuple:
+    """
+    Closed-form arc and tip of the teardrop outline in the XY plane, the same
+    as the one solved by `make_parametric_teardrop`, see
+    `outline_math.teardrop_offsets`.  Angles are given in radians.
+    """
+    offsets = outline_math.teardrop_offsets(radius, angle)
+    tip = center + App.Vector(*outline_math.rotate_offset(offsets["Tip"], rotation), 0)
+    # The flanks touch the circle where they are perpendicular to its radius
+    tangent = math.pi / 2 - angle / 2
+    circle = Part.Circle(center, App.Vector(0, 0, 1), radius)
+    arc = Part.ArcOfCircle(circle, rotation + tangent, rotation - tangent + 2 * math.pi)
+    return arc, tip
+
+
+def teardrop_face(center: App.Vector, radius: float, angle: float, rotation: float):
+    """Closed-form teardrop outline as a face, see `teardrop_outline`."""
+    arc, tip = teardrop_outline(center, radius, angle, rotation)
+    edges = [
+        arc.toShape(),
+        Part.LineSegment(arc.EndPoint, tip).toShape(),
+        Part.LineSegment(tip, arc.StartPoint).toShape(),
+    ]
+    return Part.Face(Part.Wire(edges))
+
+
+def teardrop_faces(holes: list) -> list:
+    """Teardrop faces around every circle of the Holes, from their `TeardropAngle` and `TeardropRotation`."""
+    faces = []
+    for hole in holes:
+        geometry = Utils.SketchGeometry(Utils.get_hole_profile_sketch(hole))
+        faces += [
+            teardrop_face(
+                geometry.center(index),
+                hole.Diameter.Value / 2,
+                math.radians(hole.TeardropAngle.Value),
+                math.radians(hole.TeardropRotation.Value),
+            )
+            for index in geometry.circles
+        ]
+    return faces
+
+
+@Utils.Log.timed
+def make_teardrops(
+    body,
+    hole,
+    angle: App.Units.Quantity,
+    rotation: App.Units.Quantity,
+    *,
+    fast: bool = False,
+    closed_form: bool = False,
+    merged_holes: typing.Sequence = (),
+):
+    """
+    Cut a teardrop shape around each circle of a Hole.
+
+    With `fast`, the teardrops are computed directly instead of being solved in
+    a sketch and cut by a single pocket.  This is much faster for Holes with
+    many circles, but the result does not follow later changes of the Hole.
+
+    With `closed_form`, the teardrop sketch stays parametric but every vertex
+    is placed by its own expression, leaving the sketch solver next to nothing
+    to solve.
+
+    The teardrops of `merged_holes` are cut by the same sketch and pocket.
+    These Holes must be compatible with `hole`, see `merge_key`.
+    """
+    Utils.assert_body(body)
+    Utils.assert_hole(hole)
+
+    angle = App.Units.Quantity(angle)
+    assert angle.Unit.Type == "Angle"
+    rotation = App.Units.Quantity(rotation)
+    assert rotation.Unit.Type == "Angle"
+
+    holes = [hole, *merged_holes]
+    for h in holes:
+        if "TeardropAngle" not in h.PropertiesList:
+            h.addProperty("App::PropertyAngle", "TeardropAngle", group="FusedFilamentDesign")
+        h.TeardropAngle = angle
+
+        if "TeardropRotation" not in h.PropertiesList:
+            h.addProperty("App::PropertyAngle", "TeardropRotation", group="FusedFilamentDesign")
+        h.TeardropRotation = rotation
+
+    profile_sketch = Utils.get_hole_profile_sketch(hole)
+
+    if fast:
+        profile, shape_binder, pocket = Utils.make_static_profile_pocket(
+            body, hole, teardrop_faces(holes), "_Teardrops"
+        )
+        Utils.record_treatments(
+            holes,
+            "teardrop",
+            [(profile, "_Teardrops_Profile"), (shape_binder, "_Teardrops_Binder"), (pocket, "_Teardrops")],
+        )
+        return
+
+    teardrop_sketch = Utils.make_derived_sketch(body, profile_sketch, "_Teardrops")
+    add_block = add_teardrop_closed_form if closed_form else add_teardrop
+    Utils.fill_derived_sketches(body, holes, [(teardrop_sketch, add_block)], closed_form=closed_form)
+
+    pocket = body.newObject("PartDesign::Pocket", f"{hole.Name}_Teardrops")
+    pocket.Profile = (teardrop_sketch, "")
+    pocket.ReferenceAxis = (teardrop_sketch, ["N_Axis"])
+    pocket.Reversed = hole.Reversed
+    teardrop_sketch.Visibility = False
+    pocket.setExpression("Type", f"{hole.Name}.DepthType")
+    pocket.setExpression("Length", f"{hole.Name}.Depth")
+    pocket.Label = f"{hole.Label}_Teardrops"
+    Utils.recompute(pocket)
+    Utils.record_treatments(holes, "teardrop", [(teardrop_sketch, "_Teardrops"), (pocket, "_Teardrops")])
@@ -0,0 +1,99 @@
+import os
+import typing
+
+import FreeCAD as App
+
+import ffDesign_Core.utils as Utils
+
+
+def library_path() -> str:
+    """
+    Path of the template library document.
+
+    Configured with the `TemplateLibrary` preference or the
+    `FFDESIGN_TEMPLATE_LIBRARY` environment variable and defaults to
+    `FusedFilamentDesign/TemplateLibrary.FCStd` in the user data directory.
+    """
+    path = os.environ.get("FFDESIGN_TEMPLATE_LIBRARY") or Utils.get_preferences().GetString("TemplateLibrary")
+    if path == "":
+        path = os.path.join(App.getUserAppDataDir(), "FusedFilamentDesign", "TemplateLibrary.FCStd")
+    return os.path.abspath(path)
+
+
+def use_template_library() -> bool:
+    return Utils.get_preferences().GetBool("UseTemplateLibrary", False)
+
+
+def set_use_template_library(enabled: bool):
+    Utils.get_preferences().SetBool("UseTemplateLibrary", enabled)
+
+
+def open_library(*, create: bool = True):
+    """
+    Return the template library document, opening it if necessary.
+
+    A missing library is created and saved when `create` is set, otherwise
+    `None` is returned.
+    """
+    path = library_path()
+    for doc in App.listDocuments().values():
+        if doc.FileName != "" and os.path.normcase(os.path.abspath(doc.FileName)) == os.path.normcase(path):
+            return doc
+
+    if os.path.exists(path):
+        return App.openDocument(path, hidden=True)
+    if not create:
+        return None
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    library = App.newDocument("TemplateLibrary", hidden=True)
+    library.saveAs(path)
+    Utils.Log.info(f"Created template library {path}")
+    return library
+
+
+def find_library_object(name: str):
+    """Look up an object of the template library without creating the library."""
+    library = open_library(create=False)
+    if library is None:
+        return None
+    return library.getObject(name)
+
+
+def get_or_create_library_object(name: str, build: typing.Callable):
+    """
+    Return the object `name` of the template library.
+
+    If it does not exist yet, `build(library)` must create it with exactly
+    this name.  The library is recomputed and saved afterwards, so that other
+    documents can link to the solved object right away.
+    """
+    library = open_library()
+    obj = library.getObject(name)
+    if obj is not None:
+        return obj
+
+    obj = build(library)
+    library.recompute()
+    library.save()
+    Utils.Log.info(f"Added {obj.Label} to the template library {library.FileName}")
+    return obj
+
+
+def link_library_object(doc, name: str, target, label: str):
+    """
+    Reference an object of the template library from `doc` through an
+    `App::Link`.
+
+    The linked object is solved once in the library.  Documents linking it
+    only store the link and FreeCAD opens the library along with them.
+    """
+    link = doc.addObject("App::Link", name)
+    link.LinkedObject = target
+    link.Label = label
+    link.Visibility = False
+    return link
+
+
+def is_library_link(obj) -> bool:
+    return obj.TypeId == "App::Link" and obj.getLinkedObject(True).Document != obj.Document
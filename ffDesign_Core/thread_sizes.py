@@ -0,0 +1,54 @@
+"""
+Spellings of thread sizes.  Plain string handling without FreeCAD, used to
+look up rib parameters and templates by thread size.
+"""
+
+import re
+
+# Coarse pitch of ISO metric threads.  A thread size with its coarse pitch
+# spelled out (e.g. "M3x0.5", as used by newer FreeCAD versions) is the same
+# as the plain size ("M3").
+ISO_COARSE_PITCH = {
+    1.6: 0.35,
+    2.0: 0.4,
+    2.5: 0.45,
+    3.0: 0.5,
+    3.5: 0.6,
+    4.0: 0.7,
+    5.0: 0.8,
+    6.0: 1.0,
+    8.0: 1.25,
+    10.0: 1.5,
+    12.0: 1.75,
+    14.0: 2.0,
+    16.0: 2.0,
+    20.0: 2.5,
+}
+
+THREAD_SIZE = re.compile(r"^M(?P<diameter>\d+(?:\.\d+)?)(?:\s*[xX]\s*(?P<pitch>\d+(?:\.\d+)?))?$")
+
+
+def format_number(value: float) -> str:
+    return f"{value:g}"
+
+
+def canonical_thread_size(thread_size: str) -> str:
+    """
+    Normalize a thread size so all spellings of the same thread compare equal.
+
+    Coarse pitches are dropped ("M3x0.5" and "M3" become "M3"), fine pitches
+    are kept in a normalized form ("M8x1.0" becomes "M8x1").  Sizes which are
+    not ISO metric are returned stripped but otherwise unchanged.
+    """
+    thread_size = thread_size.strip()
+    match = THREAD_SIZE.match(thread_size.upper())
+    if match is None:
+        return thread_size
+
+    diameter = float(match["diameter"])
+    canonical = f"M{format_number(diameter)}"
+    if match["pitch"] is not None:
+        pitch = float(match["pitch"])
+        if ISO_COARSE_PITCH.get(diameter) != pitch:
+            canonical += f"x{format_number(pitch)}"
+    return canonical
@@ -0,0 +1,1085 @@
+import contextlib
+import dataclasses
+import functools
+import json
+import math
+import os
+import re
+import time
+import typing
+
+import FreeCAD as App
+import Part
+import Sketcher
+
+from ffDesign_Core import merge_keys
+
+
+class Log:
+    addon = "FusedFilamentDesign"
+
+    # Spans and counters of the running command, see `Log.command()`
+    spans = None
+    counters = None
+    depth = 0
+
+    @classmethod
+    def error(cls, msg: str) -> None:
+        App.Console.PrintError(f"[{cls.addon}] {msg}\n")
+
+    @classmethod
+    def warning(cls, msg: str) -> None:
+        App.Console.PrintWarning(f"[{cls.addon}] {msg}\n")
+
+    @classmethod
+    def info(cls, msg: str) -> None:
+        App.Console.PrintMessage(f"[{cls.addon}] {msg}\n")
+
+    @classmethod
+    def debug(cls, msg: str) -> None:
+        App.Console.PrintLog(f"[{cls.addon}] {msg}\n")
+
+    @classmethod
+    @contextlib.contextmanager
+    def span(cls, name: str, detail: typing.Optional[str] = None):
+        """
+        Time the enclosed block.  Spans nest and are only recorded while a
+        command is running.
+        """
+        if cls.spans is None:
+            yield
+            return
+
+        cls.depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            cls.depth -= 1
+            cls.spans.append(Span(name, detail, cls.depth, start, end))
+
+    @classmethod
+    def timed(cls, func):
+        """Decorator recording each call of `func` as a span."""
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with cls.span(func.__name__):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    @classmethod
+    def count(cls, counter: str, n: int = 1) -> None:
+        if cls.counters is not None:
+            cls.counters[counter] = cls.counters.get(counter, 0) + n
+
+    @classmethod
+    @contextlib.contextmanager
+    def command(cls, name: str, document=None):
+        """
+        Instrument a command.  When it is done, a summary of where the time
+        went is printed and, if enabled, all spans are appended to the trace
+        file.
+
+        The number of created objects and set expressions is taken from the
+        difference of the `document` before and after the command.
+        """
+        if cls.spans is not None:
+            # Already inside another command, e.g. the batch command
+            with cls.span(name):
+                yield
+            return
+
+        cls.spans = []
+        cls.counters = {}
+        before = document_totals(document)
+        try:
+            with cls.span(name):
+                yield
+        finally:
+            spans, counters = cls.spans, cls.counters
+            cls.spans = None
+            cls.counters = None
+
+            after = document_totals(document)
+            for counter in before:
+                counters[counter] = after.get(counter, 0) - before[counter]
+
+            cls.info(format_summary(spans, counters))
+            trace_path = os.environ.get("FFDESIGN_TRACE") or get_preferences().GetString("TraceFile")
+            if trace_path != "":
+                write_trace(trace_path, spans, counters)
+
+
+@dataclasses.dataclass
+class Span:
+    name: str
+    detail: typing.Optional[str]
+    depth: int
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def document_totals(document) -> dict:
+    if document is None:
+        return {}
+    try:
+        objects = document.Objects
+    except Exception:
+        # The document was closed in the meantime
+        return {}
+    return {
+        "objects": len(objects),
+        "expressions": sum(len(obj.ExpressionEngine) for obj in objects),
+    }
+
+
+def format_summary(spans: list, counters: dict) -> str:
+    """
+    One line with the total time of the command, the time of the most
+    expensive kinds of spans below it and all counters.
+    """
+    command = spans[-1]
+    totals = {}
+    for span in spans[:-1]:
+        total, calls = totals.get(span.name, (0.0, 0))
+        totals[span.name] = (total + span.duration, calls + 1)
+
+    parts = []
+    for name, (total, calls) in sorted(totals.items(), key=lambda item: -item[1][0])[:5]:
+        parts.append(f"{name} {total:.2f} s" + (f" ({calls}x)" if calls > 1 else ""))
+
+    summary = f"{command.name}: {command.duration:.2f} s"
+    if len(parts) > 0:
+        summary += " | " + ", ".join(parts)
+    if len(counters) > 0:
+        summary += " | " + ", ".join(f"{n} {counter}" for counter, n in sorted(counters.items()))
+    return summary
+
+
+def write_trace(path: str, spans: list, counters: dict):
+    """
+    Append spans to a trace in the Chrome trace event format, one event per
+    line.  The closing bracket of the event array is optional in this format,
+    so the file can be appended to by every command and loaded as is into
+    chrome://tracing, Perfetto or speedscope.
+    """
+    pid = os.getpid()
+    try:
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a") as f:
+            if new_file:
+                f.write("[\n")
+            for span in spans:
+                event = {
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": round(span.start * 1e6),
+                    "dur": round(span.duration * 1e6),
+                    "pid": pid,
+                    "tid": 0,
+                }
+                args = {}
+                if span.detail is not None:
+                    args["detail"] = span.detail
+                if span.depth == 0:
+                    args.update(counters)
+                if len(args) > 0:
+                    event["args"] = args
+                f.write(json.dumps(event) + ",\n")
+    except OSError as e:
+        Log.warning(f"Cannot write trace to {path}: {e}")
+
+
+def get_preferences():
+    return App.ParamGet("User parameter:BaseApp/Preferences/Mod/FusedFilamentDesign")
+
+
+def get_print_direction() -> App.Vector:
+    """
+    Direction parts are printed in, i.e. the Z axis of the printer in global
+    coordinates.  Set by the `PrintDirection` preference as three numbers, e.g.
+    "0 -1 0", defaults to global Z.
+    """
+    value = get_preferences().GetString("PrintDirection", "").replace(",", " ").split()
+    if len(value) == 0:
+        return App.Vector(0, 0, 1)
+    try:
+        direction = App.Vector(*[float(v) for v in value]) if len(value) == 3 else None
+    except ValueError:
+        direction = None
+    if direction is not None and direction.Length > 1e-9:
+        return direction.normalize()
+    Log.warning(f"Invalid PrintDirection preference {' '.join(value)!r}, printing along global Z.")
+    return App.Vector(0, 0, 1)
+
+
+class ffDesignError(Exception):
+    def __init__(self, message: str, *, dialog: bool = True):
+        self.message = message
+        self.dialog = dialog
+        super().__init__(message)
+
+    def emit_to_user(self):
+        Log.error(self.message)
+        if self.dialog:
+            # Also show as a modal dialog, if there is someone to see it
+            interaction.show_error(self.message)
+
+
+class ffDesignPreconditionError(ffDesignError):
+    """A precondition for using a command was not met."""
+
+    pass
+
+
+class Interaction:
+    """
+    How the core reports to and asks the user.
+
+    Without a GUI, e.g. under FreeCADCmd or in worker processes, errors are
+    only logged and warnings do not stop the generation.  The GUI layer
+    installs dialogs instead using `set_interaction()`.
+    """
+
+    def show_error(self, message: str) -> None:
+        pass
+
+    def confirm(self, message: str, question: str) -> bool:
+        Log.info("No user to ask, proceeding anyway.")
+        return True
+
+
+interaction = Interaction()
+
+
+def set_interaction(new_interaction: Interaction):
+    global interaction
+    interaction = new_interaction
+
+
+def warning_confirm_proceed(message: str, question: str = "Proceed anyway?"):
+    Log.warning(message)
+    if not interaction.confirm(message, question):
+        raise ffDesignError("Aborted on user request due to previous warning", dialog=False)
+
+
+def assert_body(obj):
+    assert obj.TypeId == "PartDesign::Body"
+
+
+def assert_hole(obj):
+    assert obj.TypeId == "PartDesign::Hole"
+
+
+def assert_sketch(obj):
+    assert obj.TypeId == "Sketcher::SketchObject"
+
+
+def assert_varset(obj):
+    assert obj.TypeId == "App::VarSet"
+
+
+def hole_has_counterbore_maybe(hole) -> bool:
+    """
+    Check if a Hole feature has a counterbore.
+
+    This check is True if it maybe has a counterbore, but it could also be a
+    countersink or counterdrill.
+
+    If this check is False, the hole definitely does not have any counterbore.
+    """
+    assert_hole(hole)
+
+    return hole.HoleCutType != "None"
+
+
+def hole_has_counterbore_sure(hole) -> bool:
+    """
+    Check if a Hole feature has a counterbore.
+
+    This check is True the hole for sure has some type of counterbore.
+
+    If this check is False, the hole may still have a counterbore, but it could
+    also be a countersink, counterdrill or none at all.
+    """
+    assert_hole(hole)
+
+    return hole.HoleCutType in [
+        "Counterbore",
+        "ISO 4762",
+        "ISO 14583 (partial)",
+        "DIN 7984",
+        "ISO 4762 + 7089",
+        "ISO 14583",
+        "ISO 12474",
+    ]
+
+
+def hole_prepare_layer_height_property(hole):
+    assert_hole(hole)
+
+    if "LayerHeight" not in hole.PropertiesList:
+        hole.addProperty("App::PropertyLength", "LayerHeight", group="FusedFilamentDesign")
+        # TODO: Add some configuration setting for the default layer height
+        hole.LayerHeight = f"{merge_keys.DEFAULT_LAYER_HEIGHT} mm"
+
+
+def get_hole_axis(hole):
+    """Direction of the hole axis in global coordinates."""
+    profile_sketch = get_hole_profile_sketch(hole)
+    return profile_sketch.getGlobalPlacement().Rotation.multVec(App.Vector(0, 0, 1))
+
+
+def get_hole_orientation(hole, print_direction=App.Vector(0, 0, 1), tolerance: float = 1.0) -> str:
+    """
+    Classify a hole as "vertical", "horizontal" or "oblique" with respect to
+    the print direction.  The tolerance is given in degrees.
+    """
+    angle = math.degrees(get_hole_axis(hole).getAngle(print_direction))
+    angle = min(angle, 180 - angle)
+    if angle <= tolerance:
+        return "vertical"
+    if angle >= 90 - tolerance:
+        return "horizontal"
+    return "oblique"
+
+
+def get_hole_profile_sketch(hole):
+    assert_hole(hole)
+
+    if len(hole.Profile) < 1:
+        raise ffDesignError("Hole does not have a profile!")
+
+    # TODO: Check for list of profiles
+
+    profile_sketch = hole.Profile[0]
+    if profile_sketch.TypeId != "Sketcher::SketchObject":
+        raise ffDesignError("Hole profile must be a Sketch!")
+
+    return profile_sketch
+
+
+@Log.timed
+def make_derived_sketch(body, original, suffix: str):
+    assert_body(body)
+    assert_sketch(original)
+
+    sketch = body.newObject("Sketcher::SketchObject", original.Name + suffix)
+    sketch.AttachmentSupport = [(original, "")]
+    sketch.MapMode = "ObjectXY"
+    sketch.Label = original.Label + suffix
+    # The attachment needs to be evaluated to place the sketch
+    recompute(sketch, early=True)
+    return sketch
+
+
+class SketchGeometry:
+    """
+    Snapshot of the geometry of a sketch.
+
+    Each access to `sketch.Geometry` copies the entire geometry list and each
+    `sketch.getConstruction()` call is another round trip.  This snapshot reads
+    the geometry and the construction flags in one go and classifies all
+    elements in a single pass.
+    """
+
+    def __init__(self, sketch):
+        assert_sketch(sketch)
+
+        facades = sketch.GeometryFacadeList
+        self.geometry = [facade.Geometry for facade in facades]
+        self.construction = [facade.Construction for facade in facades]
+
+        # Indices of all non-construction circles and points
+        self.circles = []
+        self.points = []
+        for index, geo in enumerate(self.geometry):
+            if self.construction[index]:
+                continue
+            if geo.TypeId == "Part::GeomCircle":
+                self.circles.append(index)
+            elif geo.TypeId == "Part::GeomPoint":
+                self.points.append(index)
+
+    def __len__(self) -> int:
+        return len(self.geometry)
+
+    def __getitem__(self, index: int):
+        return self.geometry[index]
+
+    def center(self, index: int):
+        """Center of a circle or location of a point."""
+        geo = self.geometry[index]
+        if geo.TypeId == "Part::GeomPoint":
+            return App.Vector(geo.X, geo.Y, geo.Z)
+        return geo.Center
+
+    def tag(self, index: int) -> str:
+        """Identifier of an element which stays the same when other elements are added or removed."""
+        return self.geometry[index].Tag
+
+
+def get_sketch_circle_indices(sketch):
+    return SketchGeometry(sketch).circles
+
+
+def set_profile_fingerprint(obj, tags: list):
+    """
+    Remember which circles of a Hole's profile sketch an object was generated
+    for, by their geometry tags and in the order of generation.
+
+    The geometry indices hard-coded in the expressions change when circles are
+    added to or removed from the profile sketch.  The fingerprint allows
+    resynchronizing the generated objects with the profile sketch later on.
+    """
+    if "ProfileCircleTags" not in obj.PropertiesList:
+        obj.addProperty("App::PropertyStringList", "ProfileCircleTags", group="FusedFilamentDesign")
+        obj.setEditorMode("ProfileCircleTags", 1)
+    obj.ProfileCircleTags = tags
+
+
+@dataclasses.dataclass
+class Treatment:
+    """An object generated from a Hole, as recorded by `record_treatments`."""
+
+    obj: typing.Any
+    # Name of the hole tool, e.g. "teardrop"
+    tool: str
+    # Name suffix the tool gives this kind of object, e.g. "_Teardrops"
+    role: str
+
+
+def record_treatments(holes: list, tool: str, objects: list):
+    """
+    Record the objects a tool generated from Holes in their `Treatments`
+    property, with `objects` a list of `(obj, role)`.
+
+    `Treatments` maps object names to `"<tool>:<role>"`.  It holds names
+    instead of links, since the generated objects depend on the Hole and links
+    back to them would form a dependency cycle.  Object names stay the same
+    when users rename (relabel) the objects.
+    """
+    for hole in holes:
+        if "Treatments" not in hole.PropertiesList:
+            hole.addProperty("App::PropertyMap", "Treatments", group="FusedFilamentDesign")
+            hole.setEditorMode("Treatments", 1)
+            # Bookkeeping only, changing it must not recompute the Hole
+            hole.setPropertyStatus("Treatments", "Output")
+        treatments = dict(hole.Treatments)
+        for obj, role in objects:
+            treatments[obj.Name] = f"{tool}:{role}"
+        hole.Treatments = treatments
+
+
+def forget_treatments(hole, objects: list):
+    """Remove objects, e.g. before deleting them, from the `Treatments` of a Hole."""
+    if "Treatments" not in hole.PropertiesList:
+        return
+    names = {obj.Name for obj in objects}
+    hole.Treatments = {name: value for name, value in hole.Treatments.items() if name not in names}
+
+
+def get_treatments(hole, tool: typing.Optional[str] = None, role: typing.Optional[str] = None) -> list:
+    """
+    Objects generated from a Hole, optionally only those of `tool` and
+    `role`.  Objects deleted in the meantime are skipped.  Holes treated by
+    older versions of this addon have no record.
+    """
+    if "Treatments" not in hole.PropertiesList:
+        return []
+    treatments = []
+    for name, value in hole.Treatments.items():
+        obj_tool, _, obj_role = value.partition(":")
+        if (tool is not None and obj_tool != tool) or (role is not None and obj_role != role):
+            continue
+        obj = hole.Document.getObject(name)
+        if obj is not None:
+            treatments.append(Treatment(obj, obj_tool, obj_role))
+    return treatments
+
+
+def find_treatment(hole, tool: str, role: str):
+    """The first object of `tool` and `role` generated from a Hole, or `None`."""
+    treatments = get_treatments(hole, tool, role)
+    return treatments[0].obj if len(treatments) > 0 else None
+
+
+class ProfileDigest:
+    """
+    Circle centers of a Hole's profile sketch and quantities derived from the
+    Hole, evaluated once per recompute in a VarSet next to the Hole.
+
+    Reading `Geometry[i].Center` in an expression is costly and every tool
+    used to read it several times per circle.  The generated constraints now
+    refer to the properties of the digest instead.  Each circle gets a slot
+    with an `X<slot>` and a `Y<slot>` property, kept by its geometry tag, so
+    only the digest needs to be updated when circles change their index.
+    """
+
+    GEOMETRY_INDEX = re.compile(r"\.Geometry\[(\d+)\]")
+
+    def __init__(self, body, hole, geometry: typing.Optional[SketchGeometry] = None):
+        assert_body(body)
+        assert_hole(hole)
+
+        self.hole = hole
+        self.profile_sketch = get_hole_profile_sketch(hole)
+        self.geometry = geometry if geometry is not None else SketchGeometry(self.profile_sketch)
+
+        self.varset = self.find(body, hole)
+        if self.varset is None:
+            self.varset = body.newObject("App::VarSet", self.name(hole))
+            self.varset.Label = f"{hole.Label}_ProfileDigest"
+            set_profile_fingerprint(self.varset, [])
+            record_treatments([hole], "digest", [(self.varset, "_ProfileDigest")])
+        assert_varset(self.varset)
+
+        # Slot of each circle by its tag, freed slots have an empty tag
+        self.tags = list(self.varset.ProfileCircleTags)
+        self.slots = {tag: slot for slot, tag in enumerate(self.tags) if tag != ""}
+        self.added, self.moved = self.sync()
+
+    @staticmethod
+    def name(hole) -> str:
+        return f"{hole.Name}_ProfileDigest"
+
+    @classmethod
+    def find(cls, body, hole):
+        """The digest of a Hole, or `None` if it has none yet."""
+        varset = find_treatment(hole, "digest", "_ProfileDigest")
+        if varset is None:
+            # Digests from before the Hole recorded its treatments
+            varset = body.getObject(cls.name(hole))
+            if varset is not None:
+                record_treatments([hole], "digest", [(varset, "_ProfileDigest")])
+        return varset
+
+    def sync(self) -> tuple:
+        """
+        Give every circle of the profile sketch a slot and point the slots of
+        circles which moved to a different index to their new index.
+
+        Slots of removed circles keep their last value until `prune` removes
+        them.  Returns the number of added and of moved slots.
+        """
+        # FreeCAD rewrites expressions in its own formatting, only the index
+        # they refer to can be compared
+        expressions = {}
+        for path, expr in self.varset.ExpressionEngine:
+            match = self.GEOMETRY_INDEX.search(expr)
+            expressions[path.lstrip(".")] = int(match[1]) if match is not None else None
+        current = {self.geometry.tag(index): index for index in self.geometry.circles}
+
+        for slot, tag in enumerate(self.tags):
+            if tag != "" and tag not in current and f"X{slot}" in expressions:
+                self.varset.setExpression(f"X{slot}", None)
+                self.varset.setExpression(f"Y{slot}", None)
+
+        added = 0
+        moved = 0
+        for tag, index in current.items():
+            slot = self.slots.get(tag)
+            if slot is None:
+                slot = len(self.tags)
+                self.tags.append(tag)
+                self.slots[tag] = slot
+                self.varset.addProperty("App::PropertyDistance", f"X{slot}", "Circles")
+                self.varset.addProperty("App::PropertyDistance", f"Y{slot}", "Circles")
+                added += 1
+            elif expressions.get(f"X{slot}") != index or expressions.get(f"Y{slot}") != index:
+                moved += 1
+            else:
+                continue
+            self.varset.setExpression(f"X{slot}", self.center_expr(index, "x"))
+            self.varset.setExpression(f"Y{slot}", self.center_expr(index, "y"))
+
+        if added > 0:
+            self.varset.ProfileCircleTags = self.tags
+        if added + moved > 0:
+            recompute(self.varset)
+        return added, moved
+
+    def prune(self) -> int:
+        """Remove the slots of circles which are no longer in the profile sketch."""
+        current = {self.geometry.tag(index) for index in self.geometry.circles}
+        removed = 0
+        for slot, tag in enumerate(self.tags):
+            if tag == "" or tag in current:
+                continue
+            self.varset.removeProperty(f"X{slot}")
+            self.varset.removeProperty(f"Y{slot}")
+            self.tags[slot] = ""
+            del self.slots[tag]
+            removed += 1
+        if removed > 0:
+            self.varset.ProfileCircleTags = self.tags
+        return removed
+
+    def center_expr(self, index: int, axis: str) -> str:
+        return f"{self.profile_sketch.Name}.Geometry[{index}].Center.{axis} * 1mm"
+
+    def x(self, index: int) -> str:
+        """Expression for the X coordinate of circle `index` of the profile sketch."""
+        return f"{self.varset.Name}.X{self.slots[self.geometry.tag(index)]}"
+
+    def y(self, index: int) -> str:
+        """Expression for the Y coordinate of circle `index` of the profile sketch."""
+        return f"{self.varset.Name}.Y{self.slots[self.geometry.tag(index)]}"
+
+    def center(self, index: int) -> str:
+        """Expression for the center of circle `index` of the profile sketch, as a vector."""
+        return f"vector({self.x(index)} / 1mm; {self.y(index)} / 1mm; 0)"
+
+    def quantity(self, name: str, expr: str, property_type: str = "App::PropertyLength") -> str:
+        """
+        Expression for a length derived from the Hole, evaluated once in the
+        digest instead of in every constraint using it.
+        """
+        if name not in self.varset.PropertiesList:
+            self.varset.addProperty(property_type, name, "Hole")
+            self.varset.setExpression(name, expr)
+            recompute(self.varset)
+        return f"{self.varset.Name}.{name}"
+
+    def offset(self, name: str, u_expr: str, v_expr: str, rotation_expr: str) -> tuple:
+        """
+        Expressions for the X and Y offset of a vertex from the circle center,
+        given along (`u_expr`) and across (`v_expr`) a direction rotated by
+        `rotation_expr`.  The same for all circles of the Hole, so evaluated
+        once in the digest.
+        """
+        x_expr = f"({u_expr}) * cos({rotation_expr}) - ({v_expr}) * sin({rotation_expr})"
+        y_expr = f"({u_expr}) * sin({rotation_expr}) + ({v_expr}) * cos({rotation_expr})"
+        return (
+            self.quantity(f"{name}X", x_expr, "App::PropertyDistance"),
+            self.quantity(f"{name}Y", y_expr, "App::PropertyDistance"),
+        )
+
+    def half_diameter(self) -> str:
+        return self.quantity("HalfDiameter", f"{self.hole.Name}.Diameter / 2")
+
+
+def add_fixed_lines(batch, vertices: list, *, closed: bool = False) -> int:
+    """
+    Add line segments between consecutive `vertices` for a closed-form sketch.
+
+    Each vertex is a tuple `(point, x_expr, y_expr)` of its current position
+    and the expressions placing it.  Every end point gets its own DistanceX
+    and DistanceY constraint and the lines are not connected by constraints,
+    so each coordinate follows its expression directly instead of being
+    solved for.  Returns the geometry index of the first line.
+    """
+    pairs = list(zip(vertices, vertices[1:]))
+    if closed:
+        pairs.append((vertices[-1], vertices[0]))
+
+    first_geo_id = batch.add_geometry([Part.LineSegment(start[0], end[0]) for start, end in pairs])
+    constraints = []
+    expressions = []
+    for i, (start, end) in enumerate(pairs):
+        for pos, (point, x_expr, y_expr) in [(1, start), (2, end)]:
+            constraints.append(Sketcher.Constraint("DistanceX", first_geo_id + i, pos, point.x))
+            constraints.append(Sketcher.Constraint("DistanceY", first_geo_id + i, pos, point.y))
+            expressions += [x_expr, y_expr]
+
+    first_c = batch.add_constraints(constraints)
+    for i, expr in enumerate(expressions):
+        batch.set_expression(first_c + i, expr)
+    return first_geo_id
+
+
+def add_hanging_arc(batch, arc, start: tuple, end: tuple, radius_expr: str) -> int:
+    """
+    Add an arc whose end points coincide with the fixed line end points
+    `start` and `end`, given as `(geo_id, pos)`.  With its radius set, the arc
+    is fully determined by these points and does not couple anything else.
+    """
+    geo_id = batch.add_geometry([arc])
+    first_c = batch.add_constraints(
+        [
+            Sketcher.Constraint("Coincident", geo_id, 1, start[0], start[1]),
+            Sketcher.Constraint("Coincident", geo_id, 2, end[0], end[1]),
+            Sketcher.Constraint("Radius", geo_id, arc.Radius),
+        ]
+    )
+    batch.set_expression(first_c + 2, radius_expr)
+    return geo_id
+
+
+def group_mergeable_holes(holes: list, key: typing.Callable) -> list:
+    """
+    Split Holes into groups whose generated geometry can share one derived
+    sketch and one pocket.
+
+    Holes of a group are in the same body, their profile sketches have the
+    same placement, they cut in the same direction and `key(hole)` is equal
+    for all of them, e.g. their depth settings.  Returns a list of
+    `(body, holes)` in the order of the given Holes.
+    """
+    groups = []
+    for hole in holes:
+        assert_hole(hole)
+        body = hole.getParent()
+        placement = get_hole_profile_sketch(hole).Placement
+        group_key = (hole.Reversed, key(hole))
+        for other_body, other_placement, other_key, members in groups:
+            if other_body == body and other_key == group_key and other_placement.isSame(placement, 1e-7):
+                members.append(hole)
+                break
+        else:
+            groups.append((body, placement, group_key, [hole]))
+    return [(body, members) for body, _, _, members in groups]
+
+
+def fill_derived_sketches(body, holes: list, blocks: list, *, closed_form: bool = False):
+    """
+    Add a block of geometry per circle of each Hole to derived sketches.
+
+    `blocks` is a list of `(sketch, add_block)`, with `add_block(batch, hole,
+    digest, index)` adding the block for one circle.  Each sketch remembers
+    the circles it was generated for and, when generated for more than one
+    Hole, the other Holes in `MergedHoles`.  Sketches filled by closed-form
+    blocks are marked with `ClosedForm`, so they are extended the same way.
+    """
+    batches = [(SketchBatch(sketch), add_block) for sketch, add_block in blocks]
+    tags = []
+    for hole in holes:
+        digest = ProfileDigest(body, hole)
+        for index in digest.geometry.circles:
+            for batch, add_block in batches:
+                add_block(batch, hole, digest, index)
+            tags.append(digest.geometry.tag(index))
+
+    for (sketch, _), (batch, _) in zip(blocks, batches):
+        batch.commit()
+        set_profile_fingerprint(sketch, tags)
+        if len(holes) > 1:
+            sketch.addProperty("App::PropertyLinkList", "MergedHoles", group="FusedFilamentDesign")
+            sketch.setEditorMode("MergedHoles", 1)
+            sketch.MergedHoles = holes[1:]
+        if closed_form:
+            sketch.addProperty("App::PropertyBool", "ClosedForm", group="FusedFilamentDesign")
+            sketch.setEditorMode("ClosedForm", 1)
+            sketch.ClosedForm = True
+
+
+class DeferredRecompute:
+    """
+    Context manager deferring the recomputes of generated objects.
+
+    Recomputing each new sketch, binder and pocket on its own means a full
+    boolean against the body for every intermediate pocket.  Inside this
+    context, `recompute()` only records the objects as touched and the
+    document is recomputed exactly once when the outermost context exits.
+    Nothing is recomputed when the context is left through an exception.
+    """
+
+    active = None
+
+    def __init__(self, document):
+        self.document = document
+        self.touched = {}
+        self.outermost = False
+
+    def __enter__(self):
+        if DeferredRecompute.active is None:
+            DeferredRecompute.active = self
+            self.outermost = True
+        return DeferredRecompute.active
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.outermost:
+            return False
+
+        DeferredRecompute.active = None
+        if exc_type is None:
+            for obj in self.touched.values():
+                obj.touch()
+            with Log.span("document recompute"):
+                self.document.recompute()
+        return False
+
+
+RECOMPUTE_SPANS = {
+    "Sketcher::SketchObject": "sketch solve",
+    "PartDesign::Pocket": "pocket recompute",
+}
+
+
+def recompute(obj, *, early: bool = False):
+    """
+    Recompute a generated object, or defer it while a `DeferredRecompute`
+    context is active.
+
+    Use `early=True` for objects whose properties must be evaluated right away,
+    e.g. to compute their placement from an attachment.  Objects of other
+    documents than the deferred one are always recomputed right away.
+    """
+    active = DeferredRecompute.active
+    if active is not None and not early and obj.Document == active.document:
+        DeferredRecompute.active.touched[obj.Name] = obj
+    else:
+        with Log.span(RECOMPUTE_SPANS.get(obj.TypeId, "recompute"), obj.Name):
+            obj.recompute()
+
+
+class SketchBatch:
+    """
+    Builder collecting geometry, constraints, constraint names and expressions
+    for a sketch and committing them all at once.
+
+    Adding geometry or constraints to a sketch one by one makes the solver run
+    on each call.  The batch hands out the indices the new elements will have
+    and only touches the sketch in `commit()`, which adds everything in bulk
+    and recomputes the sketch a single time.
+    """
+
+    def __init__(self, sketch):
+        assert_sketch(sketch)
+
+        self.sketch = sketch
+        self.geometry_base = len(sketch.Geometry)
+        self.constraint_base = len(sketch.Constraints)
+        self.geometry = []
+        self.construction = []
+        self.constraints = []
+        self.names = []
+        self.expressions = []
+
+    def add_geometry(self, geometry: list, construction: bool = False) -> int:
+        """Queue new geometry and return the index of the first element."""
+        first_id = self.geometry_base + len(self.geometry)
+        self.geometry += geometry
+        if construction:
+            self.construction += range(first_id, first_id + len(geometry))
+        return first_id
+
+    def toggle_construction(self, geo_id: int):
+        self.construction.append(geo_id)
+
+    def add_constraints(self, constraints: list) -> int:
+        """Queue new constraints and return the index of the first one."""
+        first_c = self.constraint_base + len(self.constraints)
+        self.constraints += constraints
+        return first_c
+
+    def rename_constraint(self, index: int, name: str):
+        self.names.append((index, name))
+
+    def set_expression(self, index: int, expr: str):
+        self.expressions.append((index, expr))
+
+    def commit(self):
+        sketch = self.sketch
+
+        with Log.span("sketch commit", sketch.Name):
+            if len(self.geometry) > 0:
+                sketch.addGeometry(self.geometry, False)
+            for geo_id in self.construction:
+                sketch.toggleConstruction(geo_id)
+            if len(self.constraints) > 0:
+                sketch.addConstraint(self.constraints)
+            for index, name in self.names:
+                sketch.renameConstraint(index, name)
+            for index, expr in self.expressions:
+                sketch.setExpression(f"Constraints[{index}]", expr)
+        Log.count("geometry", len(self.geometry))
+        Log.count("constraints", len(self.constraints))
+        recompute(sketch)
+
+        # The batch can be reused for further elements afterwards
+        self.geometry_base += len(self.geometry)
+        self.constraint_base += len(self.constraints)
+        self.geometry = []
+        self.construction = []
+        self.constraints = []
+        self.names = []
+        self.expressions = []
+
+
+def set_shape_binder_styles(binder):
+    if binder.ViewObject is None:
+        # No view provider without a GUI
+        return
+
+    binder.ViewObject.LineColor = (1.0, 0.84, 0.0, 0.60)
+    binder.ViewObject.PointColor = (1.0, 0.84, 0.0, 0.60)
+    m = binder.ViewObject.ShapeAppearance[0]
+    m.DiffuseColor = (1.0, 0.84, 0.0, 0.60)
+    binder.ViewObject.ShapeAppearance = (m,)
+    binder.ViewObject.Transparency = 60
+
+
+@Log.timed
+def make_sketch_offset_shape_binder(body, template, sketch, suffix: str, center_expr: str, rotation_expr: str):
+    assert_body(body)
+    # The template may also be an App::Link to a sketch, e.g. of the template library
+    assert_sketch(template.getLinkedObject(True))
+    assert_sketch(sketch)
+
+    shape_binder = body.newObject("PartDesign::SubShapeBinder", sketch.Name + suffix)
+    shape_binder.Support = (template, "")
+    shape_binder.Relative = False
+    shape_binder.Visibility = False
+    set_shape_binder_styles(shape_binder)
+    shape_binder.setExpression(
+        "Placement",
+        f"{sketch.Name}.Placement * placement({center_expr}; {rotation_expr})",
+    )
+    shape_binder.Label = sketch.Label + suffix
+    return shape_binder
+
+
+@Log.timed
+def make_sketch_offset_compound_binder(
+    body, template, sketch, *, name: str, label: str, center_exprs: list, rotation_expr: str
+):
+    """
+    Place a copy of `template` at each of the given centers in one compound
+    profile.
+
+    The copies are held by a single App::Link array with one placement per
+    element and brought into the body by a single shape-binder, so the number
+    of objects does not grow with the number of copies.
+    """
+    assert_body(body)
+    # The template may also be an App::Link to a sketch, e.g. of the template library
+    assert_sketch(template.getLinkedObject(True))
+    assert_sketch(sketch)
+
+    link_array = body.Document.addObject("App::Link", name + "_Array")
+    link_array.LinkedObject = template
+    link_array.ShowElement = False
+    link_array.ElementCount = len(center_exprs)
+    link_array.Visibility = False
+    placements = "; ".join(f"placement({center_expr}; {rotation_expr})" for center_expr in center_exprs)
+    link_array.setExpression("PlacementList", f"list({placements})")
+    link_array.Label = label + "_Array"
+
+    shape_binder = body.newObject("PartDesign::SubShapeBinder", name)
+    shape_binder.Support = (link_array, "")
+    shape_binder.Relative = False
+    shape_binder.Visibility = False
+    set_shape_binder_styles(shape_binder)
+    shape_binder.setExpression("Placement", f"{sketch.Name}.Placement")
+    shape_binder.Label = label
+    return shape_binder
+
+
+# Depth types of Holes which `set_static_pocket_depth` maps to a pocket type
+STATIC_POCKET_DEPTH_TYPES = ["Dimension", "ThroughAll", "UpToFirst", "UpToFace"]
+
+
+@Log.timed
+def make_static_profile_pocket(body, hole, faces: list, suffix: str, *, length=None) -> tuple:
+    """
+    Cut profile faces, given in the coordinates of the Hole's profile sketch,
+    along the Hole in one pocket.  Returns the profile, shape-binder and
+    pocket.
+
+    Unlike the sketch based tools, this does not involve the sketch solver or
+    any expressions: the faces are stored as a plain `Part::Feature` and the
+    result does not follow later changes of the Hole.  The pocket is as deep
+    as the Hole, or `length` if given.
+    """
+    assert_body(body)
+    assert_hole(hole)
+    if length is None and hole.DepthType not in STATIC_POCKET_DEPTH_TYPES:
+        raise ffDesignPreconditionError(f"{hole.Label} has the unsupported depth type {hole.DepthType}")
+
+    profile_sketch = get_hole_profile_sketch(hole)
+
+    profile = body.Document.addObject("Part::Feature", f"{hole.Name}{suffix}_Profile")
+    profile.Shape = Part.makeCompound(faces)
+    profile.Visibility = False
+    profile.Label = f"{hole.Label}{suffix}_Profile"
+
+    shape_binder = body.newObject("PartDesign::SubShapeBinder", f"{hole.Name}{suffix}_Binder")
+    shape_binder.Support = (profile, "")
+    shape_binder.Relative = False
+    shape_binder.Visibility = False
+    set_shape_binder_styles(shape_binder)
+    shape_binder.Placement = profile_sketch.Placement
+    shape_binder.Label = f"{hole.Label}{suffix}_Binder"
+
+    pocket = body.newObject("PartDesign::Pocket", f"{hole.Name}{suffix}")
+    pocket.Profile = (shape_binder, "")
+    pocket.Reversed = hole.Reversed
+    set_static_pocket_depth(pocket, hole, length)
+    pocket.Label = f"{hole.Label}{suffix}"
+    Log.count("static profiles", len(faces))
+    recompute(pocket)
+    return profile, shape_binder, pocket
+
+
+def set_static_pocket_depth(pocket, hole, length=None) -> bool:
+    """
+    Make a pocket of `make_static_profile_pocket` as deep as the Hole, or
+    `length` if given.  Holes ending at a face end the pocket at the same
+    face.  Returns whether the pocket changed.
+    """
+    up_to_face = pocket.UpToFace
+    if length is None and hole.DepthType in ["ThroughAll", "UpToFirst"]:
+        pocket_type, length = hole.DepthType, pocket.Length
+    elif length is None and hole.DepthType == "UpToFace":
+        pocket_type, length, up_to_face = "UpToFace", pocket.Length, hole.UpToFace
+    elif length is None and hole.DepthType not in STATIC_POCKET_DEPTH_TYPES:
+        raise ffDesignPreconditionError(f"{hole.Label} has the unsupported depth type {hole.DepthType}")
+    else:
+        pocket_type, length = "Length", App.Units.Quantity(length if length is not None else hole.Depth)
+    if pocket.Type == pocket_type and abs(pocket.Length.Value - length.Value) < 1e-9 and pocket.UpToFace == up_to_face:
+        return False
+    pocket.Type = pocket_type
+    pocket.Length = length
+    pocket.UpToFace = up_to_face
+    return True
+
+
+def static_shape_key(shape) -> list:
+    """Compare static profiles by their vertices, independent of the order of their faces."""
+    return sorted((round(v.X, 7), round(v.Y, 7), round(v.Z, 7)) for v in shape.Vertexes)
+
+
+def update_static_profile_pocket(hole, profile, shape_binder, pocket, faces: list, *, length=None) -> bool:
+    """
+    Regenerate the objects of `make_static_profile_pocket` from new faces and
+    the current Hole.  Only what differs is touched.  Returns whether anything
+    changed.
+    """
+    changed = False
+    shape = Part.makeCompound(faces)
+    if static_shape_key(shape) != static_shape_key(profile.Shape):
+        profile.Shape = shape
+        changed = True
+
+    placement = get_hole_profile_sketch(hole).Placement
+    if not shape_binder.Placement.isSame(placement, 1e-7):
+        shape_binder.Placement = placement
+        changed = True
+
+    if pocket.Reversed != hole.Reversed:
+        pocket.Reversed = hole.Reversed
+        changed = True
+    changed |= set_static_pocket_depth(pocket, hole, length)
+    Log.count("static profiles", len(faces))
+    return changed
+
+
+def check_freecad_version(*, min_version) -> bool:
+    current = [int(v.split()[0]) for v in App.Version()[:4]]
+    return current >= min_version
+
+
+def undo_shapebinder_is_safe() -> bool:
+    """
+    Undoing transactions where shape-binders are created is broken in FreeCAD
+    1.0 and a fix will be released in 1.1.
+    """
+    return check_freecad_version(min_version=[1, 1, 0])
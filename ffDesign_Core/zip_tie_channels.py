@@ -0,0 +1,197 @@
+import math
+
+import FreeCAD as App
+import Part
+import Sketcher
+
+import ffDesign_Core.utils as Utils
+
+
+def make_zip_tie_channel_settings(
+    body,
+    original,
+    *,
+    width: App.Units.Quantity,
+):
+    Utils.assert_body(body)
+
+    width = App.Units.Quantity(width)
+    assert width.Unit.Type == "Length"
+
+    varset = body.newObject("App::VarSet", f"{original.Name}_ZipTieChannel_Settings")
+    varset.Label = f"{original.Label}_ZipTieChannel_Settings"
+
+    varset.addProperty("App::PropertyLength", "ChannelWidth", group="Base")
+    varset.ChannelWidth = width
+    varset.addProperty("App::PropertyAngle", "ChannelRotation", group="Base")
+    varset.ChannelRotation = "90 deg"
+    Utils.recompute(varset)
+
+    return varset
+
+
+@Utils.Log.timed
+def make_zip_tie_channel_template(
+    body,
+    original,
+    *,
+    thickness: App.Units.Quantity,
+    bridge_dia: App.Units.Quantity,
+):
+    Utils.assert_body(body)
+    sketch = body.newObject("Sketcher::SketchObject", f"{original.Name}_ZipTieChannel_Template")
+    sketch.Label = f"{original.Label}_ZipTieChannel_Template"
+    sketch.Visibility = False
+
+    thickness = App.Units.Quantity(thickness)
+    assert thickness.Unit.Type == "Length"
+    bridge_dia = App.Units.Quantity(bridge_dia)
+    assert bridge_dia.Unit.Type == "Length"
+
+    dist_inner = bridge_dia.Value / 2
+    dist_outer = dist_inner + thickness.Value
+
+    last_geo_id = len(sketch.Geometry)
+    new_geo = [
+        Part.ArcOfCircle(
+            Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), dist_outer),
+            math.pi * 1,
+            math.pi * 0,
+        ),
+        Part.ArcOfCircle(
+            Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), dist_inner),
+            math.pi * 1,
+            math.pi * 0,
+        ),
+        Part.LineSegment(App.Vector(-dist_inner, 0, 0), App.Vector(-dist_outer, 0, 0)),
+        Part.LineSegment(App.Vector(dist_inner, 0, 0), App.Vector(dist_outer, 0, 0)),
+    ]
+    sketch.addGeometry(new_geo, False)
+    Utils.Log.count("geometry", len(new_geo))
+
+    new_constraints = [
+        Sketcher.Constraint("Coincident", last_geo_id + 0, 1, last_geo_id + 2, 2),
+        Sketcher.Constraint("Coincident", last_geo_id + 1, 1, last_geo_id + 2, 1),
+        Sketcher.Constraint("Coincident", last_geo_id + 0, 2, last_geo_id + 3, 2),
+        Sketcher.Constraint("Coincident", last_geo_id + 1, 2, last_geo_id + 3, 1),
+        Sketcher.Constraint("Coincident", last_geo_id + 0, 3, -1, 1),
+        Sketcher.Constraint("Coincident", last_geo_id + 1, 3, -1, 1),
+        Sketcher.Constraint("PointOnObject", last_geo_id + 0, 1, -1),
+        Sketcher.Constraint("PointOnObject", last_geo_id + 0, 2, -1),
+        Sketcher.Constraint("PointOnObject", last_geo_id + 1, 1, -1),
+        Sketcher.Constraint("PointOnObject", last_geo_id + 1, 2, -1),
+    ]
+    sketch.addConstraint(new_constraints)
+    Utils.Log.count("constraints", len(new_constraints))
+
+    last_c = len(sketch.Constraints)
+    new_constraints = [
+        Sketcher.Constraint("Diameter", last_geo_id + 1, bridge_dia.Value),
+        Sketcher.Constraint("DistanceX", last_geo_id + 0, 1, last_geo_id + 1, 1, thickness.Value),
+    ]
+    sketch.addConstraint(new_constraints)
+    Utils.Log.count("constraints", len(new_constraints))
+    sketch.renameConstraint(last_c + 0, "ChannelBridgeDiameter")
+    sketch.renameConstraint(last_c + 1, "ChannelThickness")
+
+    Utils.recompute(sketch)
+    return sketch
+
+
+def make_zip_tie_channel(body, original, template, settings, suffix: str, center_expr: str):
+    Utils.assert_body(body)
+    Utils.assert_sketch(original)
+    Utils.assert_sketch(template)
+    Utils.assert_varset(settings)
+
+    binder = Utils.make_sketch_offset_shape_binder(
+        body,
+        template,
+        sketch=original,
+        suffix=suffix + "_Binder",
+        center_expr=center_expr,
+        rotation_expr=f"rotation({settings.Name}.ChannelRotation; 0; 90 deg)",
+    )
+
+    make_zip_tie_channel_pocket(body, original, binder, settings, suffix)
+
+
+def make_zip_tie_channels_consolidated(body, original, template, settings, points: list):
+    """
+    Place the channel template at all points and cut every channel with a
+    single pocket.
+    """
+    Utils.assert_body(body)
+    Utils.assert_sketch(original)
+    Utils.assert_sketch(template)
+    Utils.assert_varset(settings)
+
+    binder = Utils.make_sketch_offset_compound_binder(
+        body,
+        template,
+        original,
+        name=f"{original.Name}_ZipTieChannels_Binder",
+        label=f"{original.Label}_ZipTieChannels_Binder",
+        center_exprs=[f"vector({original.Name}.Geometry[{i}].X; {original.Name}.Geometry[{i}].Y; 0)" for i in points],
+        rotation_expr=f"rotation({settings.Name}.ChannelRotation; 0; 90 deg)",
+    )
+
+    pocket = make_zip_tie_channel_pocket(body, original, binder, settings, "_ZipTieChannels")
+    # The channel profiles are parallel but not coplanar
+    pocket.AllowMultiFace = True
+
+
+def make_zip_tie_channel_pocket(body, original, binder, settings, suffix: str):
+    pocket = body.newObject("PartDesign::Pocket", original.Name + suffix)
+    pocket.Profile = (binder, "")
+    pocket.Midplane = True
+    binder.Visibility = False
+    pocket.setExpression("Length", f"{settings.Name}.ChannelWidth")
+    pocket.Label = original.Label + suffix
+    Utils.recompute(pocket)
+    return pocket
+
+
+def find_points_in_sketch(sketch):
+    return Utils.SketchGeometry(sketch).points
+
+
+@Utils.Log.timed
+def make_zip_tie_channels_from_sketch(
+    body,
+    sketch,
+    *,
+    width: App.Units.Quantity,
+    thickness: App.Units.Quantity,
+    bridge_dia: App.Units.Quantity,
+    consolidated: bool = True,
+):
+    """
+    Generate zip tie channels at all points of a sketch.
+
+    With `consolidated`, all channels are cut by a single pocket.  Otherwise,
+    each channel gets its own shape-binder and pocket.
+    """
+    Utils.assert_body(body)
+    Utils.assert_sketch(sketch)
+
+    settings = make_zip_tie_channel_settings(body, sketch, width=width)
+    template = make_zip_tie_channel_template(body, sketch, thickness=thickness, bridge_dia=bridge_dia)
+
+    points = find_points_in_sketch(sketch)
+    if consolidated:
+        make_zip_tie_channels_consolidated(body, sketch, template, settings, points)
+        sketch.Visibility = False
+        return
+
+    for point_idx in points:
+        make_zip_tie_channel(
+            body,
+            sketch,
+            template,
+            settings,
+            suffix=f"_ZipTieChannel{point_idx+1:03}",
+            center_expr=f"vector({sketch.Name}.Geometry[{point_idx}].X; {sketch.Name}.Geometry[{point_idx}].Y; 0)",
+        )
+
+    sketch.Visibility = False
@@ -1,34 +1,81 @@
+from PySide import QtCore
+
 import FreeCADGui
 import FreeCAD
 
 import ffDesign_Utils as Utils
+from ffDesign_Core import pipeline
 
 
 class HoleWizardTaskPanel:
-    def __init__(self, hole):
-        Utils.assert_hole(hole)
+    def __init__(self, holes):
+        for hole in holes:
+            Utils.assert_hole(hole)
 
-        self.hole = hole
-        self.form = FreeCADGui.PySideUic.loadUi(Utils.Resources.get_panel("ffDesign_HoleWizard.ui"))
+        self.holes = holes
+        self.form = Utils.Resources.load_panel("ffDesign_HoleWizard.ui")
 
         self.form.AddCounterboreBridges.clicked.connect(self.addCounterboreBridges)
         self.form.AddRibThreads.clicked.connect(self.addRibThreads)
         self.form.AddRoofBridge.clicked.connect(self.addRoofBridge)
         self.form.AddTeardropShape.clicked.connect(self.addTeardropShape)
 
+        # Tools added together by the pipeline, by their checkbox
+        self.pipeline_tools = {
+            self.form.PipelineCounterboreBridges: "counterbore_bridges",
+            self.form.PipelineRibThreads: "rib_threads",
+            self.form.PipelineTeardropShape: "teardrop",
+            self.form.PipelineRoofBridge: "roof_bridge",
+        }
+        for checkbox in self.pipeline_tools:
+            checkbox.stateChanged.connect(self.updatePipelineMessage)
+
         self.updateCommandAvailability()
+        self.updatePipelineMessage()
 
     def updateCommandAvailability(self):
-        has_counterbore_maybe = Utils.hole_has_counterbore_maybe(self.hole)
-        is_threaded = self.hole.Threaded
+        has_counterbore_maybe = any(Utils.hole_has_counterbore_maybe(hole) for hole in self.holes)
+        is_threaded = any(hole.Threaded for hole in self.holes)
 
         self.form.AddCounterboreBridges.setEnabled(has_counterbore_maybe)
         self.form.AddRibThreads.setEnabled(is_threaded)
+        self.form.PipelineCounterboreBridges.setEnabled(has_counterbore_maybe)
+        self.form.PipelineRibThreads.setEnabled(is_threaded)
 
         # The following hole tools are always available
         self.form.AddTeardropShape.setEnabled(True)
         self.form.AddRoofBridge.setEnabled(True)
 
+    def selectedTools(self) -> list:
+        return [
+            name
+            for checkbox, name in self.pipeline_tools.items()
+            if checkbox.isEnabled() and checkbox.checkState() == QtCore.Qt.CheckState.Checked
+        ]
+
+    def updatePipelineMessage(self):
+        """Show up front how conflicting tools will be resolved."""
+        self.form.PipelineMessage.setTextFormat(QtCore.Qt.TextFormat.RichText)
+        try:
+            plan = pipeline.plan_pipeline(self.holes, self.selectedTools(), print_direction=Utils.get_print_direction())
+        except Utils.ffDesignError as e:
+            self.form.PipelineMessage.setText(f'<font color="#c00000">{e.message}</font>')
+            return
+        self.form.PipelineMessage.setText("<br>".join(f'<font color="#008000">{note}</font>' for note in plan.notes))
+
+    def pipelineParams(self) -> dict:
+        return {
+            "counterbore_bridges": {"merge": True},
+            "rib_threads": {"global_template": True},
+            "teardrop": {"angle": "120 deg", "merge": True},
+            "roof_bridge": {
+                "angle": "45 deg",
+                "bridge_clearance": "0.2 mm",
+                "do_counterbore": all(Utils.hole_has_counterbore_sure(hole) for hole in self.holes),
+                "merge": True,
+            },
+        }
+
     def addCounterboreBridges(self):
         FreeCADGui.Control.closeDialog()
         FreeCADGui.runCommand("ffDesign_CounterboreBridges")
@@ -46,36 +93,30 @@ class HoleWizardTaskPanel:
         FreeCADGui.runCommand("ffDesign_Teardrop")
 
     def accept(self):
-        FreeCADGui.Control.closeDialog()
+        try:
+            tools = self.selectedTools()
+            if len(tools) == 0:
+                FreeCADGui.Control.closeDialog()
+                return
+
+            plan = pipeline.plan_pipeline(self.holes, tools, print_direction=Utils.get_print_direction())
+            FreeCADGui.Control.closeDialog()
+
+            for note in plan.notes:
+                Utils.Log.info(note)
+            pipeline.run_pipeline(FreeCAD.ActiveDocument, plan, self.pipelineParams())
+        except Utils.ffDesignError as e:
+            e.emit_to_user()
 
     def reject(self):
         FreeCADGui.Control.closeDialog()
 
 
 class HoleWizardCommand:
-    def GetResources(self):
-        return {
-            "Pixmap": "icons:ffDesign_HoleWizard.svg",
-            "MenuText": FreeCAD.Qt.translate("ffDesign", "Hole Wizard"),
-            "ToolTip": FreeCAD.Qt.translate(
-                "ffDesign",
-                "A wizard for adding various FFF 3d-printing geometry to PartDesign Hole features.\n"
-                "1. Select a Hole feature in the active body.\n"
-                "2. Run this command.\n"
-                "3. Select the kind of geometry you want to add in the task panel.",
-            ),
-        }
-
     def Activated(self):
         try:
-            hole = Utils.get_selected_hole()
-            dialog = HoleWizardTaskPanel(hole)
+            holes = Utils.get_selected_holes()
+            dialog = HoleWizardTaskPanel(holes)
             FreeCADGui.Control.showDialog(dialog)
         except Utils.ffDesignError as e:
             e.emit_to_user()
-
-    def IsActive(self):
-        return Utils.check_hole_tool_preconditions()
-
-
-FreeCADGui.addCommand("ffDesign_HoleWizard", HoleWizardCommand())
@@ -0,0 +1,47 @@
+import collections
+
+import FreeCADGui as Gui
+import FreeCAD as App
+
+import ffDesign_Utils as Utils
+from ffDesign_Core import orientation
+
+
+def get_holes_to_orient() -> list:
+    """The selected Holes, else all Holes of the active body, else all Holes of the document."""
+    if len(Gui.Selection.getSelection()) > 0:
+        return Utils.get_selected_holes()
+
+    body = Gui.ActiveDocument.ActiveView.getActiveObject("pdbody")
+    objects = body.Group if body is not None else App.ActiveDocument.Objects
+    return [obj for obj in objects if obj.TypeId == "PartDesign::Hole"]
+
+
+class OrientHolesCommand:
+    def Activated(self):
+        try:
+            if not App.ActiveDocument:
+                raise Utils.ffDesignPreconditionError("No active document")
+            holes = get_holes_to_orient()
+            if len(holes) == 0:
+                raise Utils.ffDesignPreconditionError("No Hole features to orient")
+
+            # Only properties of the Holes change, this is always safe to undo
+            App.ActiveDocument.openTransaction("Orient Holes")
+            try:
+                with Utils.Log.command("Orient Holes", App.ActiveDocument):
+                    with Utils.DeferredRecompute(App.ActiveDocument):
+                        orientations, changed = orientation.orient_holes(holes, Utils.get_print_direction())
+            except Exception as e:
+                App.ActiveDocument.abortTransaction()
+                raise e from None
+            else:
+                App.ActiveDocument.commitTransaction()
+
+            counts = collections.Counter(o.orientation for o in orientations)
+            Utils.Log.info(
+                f"{counts['vertical']} vertical, {counts['horizontal']} horizontal and {counts['oblique']} oblique "
+                f"Holes, rotated the teardrops and roof bridges of {len(changed)}."
+            )
+        except Utils.ffDesignError as e:
+            e.emit_to_user()
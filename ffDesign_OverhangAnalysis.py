@@ -0,0 +1,96 @@
+from PySide import QtCore, QtGui
+
+import FreeCADGui as Gui
+import FreeCAD as App
+
+import ffDesign_Utils as Utils
+from ffDesign_Core.batch import HOLE_TOOLS
+from ffDesign_Core.overhang_analysis import analyze_overhangs, apply_suggestions
+
+
+class OverhangAnalysisTaskPanel:
+    COLUMNS = ["Hole", "Overhang [mm²]", "Suggested tool"]
+
+    def __init__(self, body):
+        Utils.assert_body(body)
+
+        self.body = body
+        self.print_direction = Utils.get_print_direction()
+        self.overhangs = []
+        self.form = Utils.Resources.load_panel("ffDesign_OverhangAnalysis.ui")
+
+        self.form.Angle.setProperty("rawValue", 45)
+
+        self.form.Table.setColumnCount(len(self.COLUMNS))
+        self.form.Table.setHorizontalHeaderLabels(self.COLUMNS)
+
+        self.form.Refresh.clicked.connect(self.analyze)
+        self.form.Apply.clicked.connect(self.applySuggestions)
+
+        self.analyze()
+
+    def analyze(self):
+        angle = self.form.Angle.property("value")
+        try:
+            with Utils.Log.command("Analyze overhangs", self.body.Document):
+                analysis = analyze_overhangs(self.body, print_direction=self.print_direction, angle=angle)
+        except Utils.ffDesignError as e:
+            e.emit_to_user()
+            return
+        self.overhangs = analysis.holes
+        self.updateTable()
+
+        self.form.InfoMessage.setText(
+            f"{len(self.overhangs)} Holes overhang, {analysis.total_area - analysis.other_area:.1f} mm² in total.  "
+            f"Another {analysis.other_area:.1f} mm² of overhangs do not belong to untreated Holes."
+        )
+
+    def updateTable(self):
+        table = self.form.Table
+        table.setRowCount(len(self.overhangs))
+        for row, overhang in enumerate(self.overhangs):
+            tool = HOLE_TOOLS[overhang.tool].label if overhang.tool is not None else "None"
+            values = [overhang.hole.Label, round(overhang.area, 1), tool]
+            for column, value in enumerate(values):
+                item = QtGui.QTableWidgetItem()
+                item.setData(QtCore.Qt.DisplayRole, value)
+                table.setItem(row, column, item)
+        table.resizeColumnsToContents()
+
+    def selectedOverhangs(self) -> list:
+        rows = sorted({index.row() for index in self.form.Table.selectionModel().selectedRows()})
+        if len(rows) == 0:
+            return self.overhangs
+        return [self.overhangs[row] for row in rows]
+
+    def applySuggestions(self):
+        overhangs = self.selectedOverhangs()
+        if len(overhangs) == 0:
+            return
+        try:
+            apply_suggestions(self.body.Document, overhangs, print_direction=self.print_direction)
+        except Utils.ffDesignError as e:
+            e.emit_to_user()
+            return
+        self.analyze()
+
+    def accept(self):
+        Gui.Control.closeDialog()
+
+    def reject(self):
+        Gui.Control.closeDialog()
+
+
+class OverhangAnalysisCommand:
+    def Activated(self):
+        try:
+            if not App.ActiveDocument:
+                raise Utils.ffDesignPreconditionError("No active document")
+            body = Gui.ActiveDocument.ActiveView.getActiveObject("pdbody")
+            if body is None:
+                raise Utils.ffDesignPreconditionError("No active body to analyze")
+
+            dialog = OverhangAnalysisTaskPanel(body)
+            Gui.Control.showDialog(dialog)
+        except Utils.ffDesignError as e:
+            e.emit_to_user()
@@ -0,0 +1,79 @@
+from PySide import QtCore, QtGui
+
+import FreeCADGui as Gui
+import FreeCAD as App
+
+import ffDesign_Utils as Utils
+from ffDesign_Core.recompute_report import COLUMNS, profile_recompute, sort_costs, write_csv
+
+
+class RecomputeReportTaskPanel:
+    def __init__(self, doc):
+        self.doc = doc
+        self.costs = []
+        self.form = Utils.Resources.load_panel("ffDesign_RecomputeReport.ui")
+
+        self.form.Table.setColumnCount(len(COLUMNS))
+        self.form.Table.setHorizontalHeaderLabels([title for _, title in COLUMNS])
+        self.form.Table.setSortingEnabled(True)
+
+        self.form.Refresh.clicked.connect(self.measure)
+        self.form.ExportCsv.clicked.connect(self.exportCsv)
+
+        self.measure()
+
+    def measure(self):
+        with Utils.Log.command("Measure recompute cost", self.doc):
+            self.costs = sort_costs(profile_recompute(self.doc))
+        self.updateTable()
+
+    def updateTable(self):
+        table = self.form.Table
+        # Sorting while filling would shuffle the rows under our feet
+        table.setSortingEnabled(False)
+        table.setRowCount(len(self.costs))
+        for row, cost in enumerate(self.costs):
+            for column, (field, _) in enumerate(COLUMNS):
+                value = getattr(cost, field)
+                item = QtGui.QTableWidgetItem()
+                if isinstance(value, float):
+                    # Store numbers as such so the columns sort numerically
+                    item.setData(QtCore.Qt.DisplayRole, round(value, 4))
+                elif value is not None:
+                    item.setData(QtCore.Qt.DisplayRole, value)
+                table.setItem(row, column, item)
+        table.setSortingEnabled(True)
+        table.resizeColumnsToContents()
+
+        total = sum(cost.recompute for cost in self.costs)
+        self.form.InfoMessage.setText(f"{len(self.costs)} generated objects, {total:.2f} s recompute time in total.")
+
+    def exportCsv(self):
+        path, _ = QtGui.QFileDialog.getSaveFileName(
+            None, "Export recompute cost report", f"{self.doc.Label}_recompute.csv", "CSV files (*.csv)"
+        )
+        if path == "":
+            return
+        try:
+            write_csv(self.costs, path)
+            Utils.Log.info(f"Recompute cost report written to {path}")
+        except OSError as e:
+            Utils.ffDesignError(f"Cannot write {path}: {e}").emit_to_user()
+
+    def accept(self):
+        Gui.Control.closeDialog()
+
+    def reject(self):
+        Gui.Control.closeDialog()
+
+
+class RecomputeReportCommand:
+    def Activated(self):
+        try:
+            if not App.ActiveDocument:
+                raise Utils.ffDesignPreconditionError("No active document")
+
+            dialog = RecomputeReportTaskPanel(App.ActiveDocument)
+            Gui.Control.showDialog(dialog)
+        except Utils.ffDesignError as e:
+            e.emit_to_user()
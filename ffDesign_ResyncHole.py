@@ -0,0 +1,34 @@
+import FreeCAD as App
+
+import ffDesign_Utils as Utils
+from ffDesign_Core.resync import resync_hole
+
+
+class ResyncHoleCommand:
+    def Activated(self):
+        try:
+            hole = Utils.get_selected_hole()
+            body = Utils.get_active_part_design_body_for_feature(hole)
+
+            # Resynchronizing rib threads may add shape-binders
+            use_transaction = Utils.undo_shapebinder_is_safe()
+            try:
+                if use_transaction:
+                    App.ActiveDocument.openTransaction("Resynchronize Hole")
+                with Utils.Log.command("Resynchronize Hole", App.ActiveDocument):
+                    with Utils.DeferredRecompute(App.ActiveDocument):
+                        results = resync_hole(body, hole)
+            except Exception as e:
+                if use_transaction:
+                    App.ActiveDocument.abortTransaction()
+                raise e from None
+            else:
+                if use_transaction:
+                    App.ActiveDocument.commitTransaction()
+
+            if len(results) == 0:
+                Utils.Log.info(f"Everything generated for {hole.Label} is up to date.")
+            for result in results:
+                Utils.Log.info(f"Resynchronized {result}")
+        except Utils.ffDesignError as e:
+            e.emit_to_user()
@@ -1,111 +1,24 @@
-import math
-
-from PySide import QtCore, QtGui
-
 import FreeCADGui as Gui
 import FreeCAD as App
-import Part
-import Sketcher
 
 import ffDesign_Utils as Utils
-
-
-def make_parametric_teardrop(sketch, *, center_expr: str, diameter_expr: str, angle_expr: str, rotation_expr: str):
-    Utils.assert_sketch(sketch)
-
-    last_geo_id = len(sketch.Geometry)
-    new_geo = [
-        Part.ArcOfCircle(
-            Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), 1),
-            math.pi / 4 * 3,
-            math.pi / 4 * 1,
-        ),
-        Part.LineSegment(App.Vector(-1, 1, 0), App.Vector(0, 2, 0)),
-        Part.LineSegment(App.Vector(1, 1, 0), App.Vector(0, 2, 0)),
-        Part.LineSegment(App.Vector(0, 0, 0), App.Vector(0, 2, 0)),
-    ]
-    sketch.addGeometry(new_geo, False)
-    sketch.toggleConstruction(last_geo_id + 3)
-
-    new_constraints = [
-        Sketcher.Constraint("Coincident", last_geo_id + 1, 2, last_geo_id + 2, 2),
-        Sketcher.Constraint("Coincident", last_geo_id + 1, 2, last_geo_id + 3, 2),
-        Sketcher.Constraint("Coincident", last_geo_id + 0, 3, last_geo_id + 3, 1),
-        Sketcher.Constraint("Tangent", last_geo_id + 0, 1, last_geo_id + 1, 1),
-        Sketcher.Constraint("Tangent", last_geo_id + 0, 2, last_geo_id + 2, 1),
-    ]
-    sketch.addConstraint(new_constraints)
-
-    last_c = len(sketch.Constraints)
-    new_constraints = [
-        Sketcher.Constraint("DistanceX", last_geo_id + 0, 3, 0),
-        Sketcher.Constraint("DistanceY", last_geo_id + 0, 3, 0),
-        Sketcher.Constraint("Diameter", last_geo_id + 0, 2),
-        Sketcher.Constraint("Angle", last_geo_id + 1, 2, last_geo_id + 2, 2, math.pi / 2),
-        Sketcher.Constraint("Angle", last_geo_id + 3, math.pi / 2),
-    ]
-    sketch.addConstraint(new_constraints)
-    sketch.setExpression(f"Constraints[{last_c + 0}]", f"{center_expr}.x * 1mm")
-    sketch.setExpression(f"Constraints[{last_c + 1}]", f"{center_expr}.y * 1mm")
-    sketch.setExpression(f"Constraints[{last_c + 2}]", f"{diameter_expr}")
-    sketch.setExpression(f"Constraints[{last_c + 3}]", f"{angle_expr}")
-    sketch.setExpression(f"Constraints[{last_c + 4}]", f"{rotation_expr}")
-
-    sketch.recompute()
-
-
-def make_teardrops(body, hole, angle: App.Units.Quantity, rotation: App.Units.Quantity):
-    Utils.assert_body(body)
-    Utils.assert_hole(hole)
-
-    angle = App.Units.Quantity(angle)
-    assert angle.Unit.Type == "Angle"
-    rotation = App.Units.Quantity(rotation)
-    assert rotation.Unit.Type == "Angle"
-
-    if "TeardropAngle" not in hole.PropertiesList:
-        hole.addProperty("App::PropertyAngle", "TeardropAngle", group="FusedFilamentDesign")
-    hole.TeardropAngle = angle
-
-    if "TeardropRotation" not in hole.PropertiesList:
-        hole.addProperty("App::PropertyAngle", "TeardropRotation", group="FusedFilamentDesign")
-    hole.TeardropRotation = rotation
-
-    profile_sketch = Utils.get_hole_profile_sketch(hole)
-    teardrop_sketch = Utils.make_derived_sketch(body, profile_sketch, "_Teardrops")
-
-    for index in Utils.get_sketch_circle_indices(profile_sketch):
-        make_parametric_teardrop(
-            teardrop_sketch,
-            center_expr=f"{profile_sketch.Name}.Geometry[{index}].Center",
-            diameter_expr=f"{hole.Name}.Diameter",
-            angle_expr=f"{hole.Name}.TeardropAngle",
-            rotation_expr=f"{hole.Name}.TeardropRotation",
-        )
-
-    pocket = body.newObject("PartDesign::Pocket", f"{hole.Name}_Teardrops")
-    pocket.Profile = (teardrop_sketch, "")
-    pocket.ReferenceAxis = (teardrop_sketch, ["N_Axis"])
-    pocket.Reversed = hole.Reversed
-    teardrop_sketch.Visibility = False
-    pocket.setExpression("Type", f"{hole.Name}.DepthType")
-    pocket.setExpression("Length", f"{hole.Name}.Depth")
-    pocket.Label = f"{hole.Label}_Teardrops"
-    pocket.recompute()
+from ffDesign_Core import orientation, teardrop
 
 
 class TeardropTaskPanel:
-    def __init__(self, body, hole):
-        Utils.assert_body(body)
-        Utils.assert_hole(hole)
+    def __init__(self, holes):
+        for hole in holes:
+            Utils.assert_hole(hole)
 
-        self.body = body
-        self.hole = hole
-        self.form = Gui.PySideUic.loadUi(Utils.Resources.get_panel("ffDesign_Teardrop.ui"))
+        self.holes = holes
+        self.form = Utils.Resources.load_panel("ffDesign_Teardrop.ui")
 
         # Default is 120° teardrop angle
         self.form.Angle120.toggle()
 
+        # The fast mode has no sketch to solve
+        self.form.FastMode.toggled.connect(self.form.ClosedForm.setDisabled)
+
     def accept(self):
         try:
             angle = "120 deg"
@@ -114,17 +27,37 @@ class TeardropTaskPanel:
             elif self.form.Angle120.isChecked():
                 angle = "120 deg"
 
+            fast = self.form.FastMode.isChecked()
+            closed_form = self.form.ClosedForm.isChecked()
+
             Gui.Control.closeDialog()
 
+            # The fast mode cuts through a shape-binder
+            use_transaction = not fast or Utils.undo_shapebinder_is_safe()
             try:
-                App.ActiveDocument.openTransaction("Add teardrop hole")
-                make_teardrops(self.body, self.hole, angle=angle, rotation="90 deg")
-                App.ActiveDocument.recompute()
+                if use_transaction:
+                    App.ActiveDocument.openTransaction("Add teardrop hole")
+                with Utils.Log.command("Add teardrop hole", App.ActiveDocument):
+                    with Utils.DeferredRecompute(App.ActiveDocument):
+                        # Compatible Holes of a body share one sketch and pocket.  They
+                        # lie in the same plane, so their tips point up the same way.
+                        for body, group in Utils.group_mergeable_holes(self.holes, teardrop.merge_key):
+                            teardrop.make_teardrops(
+                                body,
+                                group[0],
+                                angle=angle,
+                                rotation=orientation.hole_tool_rotation(group[0]),
+                                fast=fast,
+                                closed_form=closed_form,
+                                merged_holes=group[1:],
+                            )
             except Exception as e:
-                App.ActiveDocument.abortTransaction()
+                if use_transaction:
+                    App.ActiveDocument.abortTransaction()
                 raise e from None
             else:
-                App.ActiveDocument.commitTransaction()
+                if use_transaction:
+                    App.ActiveDocument.commitTransaction()
         except Utils.ffDesignError as e:
             e.emit_to_user()
 
@@ -133,30 +66,12 @@ class TeardropTaskPanel:
 
 
 class TeardropCommand:
-    def GetResources(self):
-        return {
-            "Pixmap": "icons:ffDesign_Teardrop.svg",
-            "MenuText": App.Qt.translate("ffDesign", "Add teardrop shape"),
-            "ToolTip": App.Qt.translate(
-                "ffDesign",
-                "Add a teardrop shape to a hole.\n"
-                "1. Select a Hole feature in the active body.\n"
-                "2. Run this command.\n",
-            ),
-        }
-
     def Activated(self):
         try:
-            hole = Utils.get_selected_hole()
-            body = Utils.get_active_part_design_body_for_feature(hole)
+            holes = Utils.get_selected_holes()
+            Utils.activate_body_for_holes(holes)
 
-            dialog = TeardropTaskPanel(body, hole)
+            dialog = TeardropTaskPanel(holes)
             Gui.Control.showDialog(dialog)
         except Utils.ffDesignError as e:
             e.emit_to_user()
-
-    def IsActive(self):
-        return Utils.check_hole_tool_preconditions()
-
-
-Gui.addCommand("ffDesign_Teardrop", TeardropCommand())
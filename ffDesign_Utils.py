@@ -5,6 +5,40 @@ from PySide import QtCore, QtGui
 import FreeCADGui as Gui
 import FreeCAD as App
 
+import ffDesign_Core.utils as CoreUtils
+
+# The GUI modules reach all helpers through this module
+from ffDesign_Core.utils import (
+    DeferredRecompute,
+    Log,
+    SketchBatch,
+    SketchGeometry,
+    assert_body,
+    assert_hole,
+    assert_sketch,
+    assert_varset,
+    check_freecad_version,
+    ffDesignError,
+    ffDesignPreconditionError,
+    get_hole_axis,
+    get_hole_orientation,
+    get_hole_profile_sketch,
+    get_preferences,
+    get_print_direction,
+    get_sketch_circle_indices,
+    group_mergeable_holes,
+    hole_has_counterbore_maybe,
+    hole_has_counterbore_sure,
+    hole_prepare_layer_height_property,
+    make_derived_sketch,
+    make_sketch_offset_compound_binder,
+    make_sketch_offset_shape_binder,
+    recompute,
+    set_shape_binder_styles,
+    undo_shapebinder_is_safe,
+    warning_confirm_proceed,
+)
+
 
 class Resources:
     mod_path = os.path.dirname(__file__)
@@ -12,73 +46,39 @@ class Resources:
     panels_path = os.path.join(mod_path, "Resources", "panels")
 
     @classmethod
-    def get_panel(cls, name: str) -> str:
+    def load_panel(cls, name: str):
+        """
+        Build the widget for a task panel.
+
+        The form is parsed again each time.  Qt cannot clone widgets and the
+        task dialog deletes its form on close, while uic cannot compile the
+        Gui:: custom widgets (QuantitySpinBox) into a reusable form class.
+        The panels ship with the addon, so there is no check for the file
+        before loading it, a missing one only shows up as a failed load.
+        """
         path = os.path.join(cls.panels_path, name)
-        if not os.path.exists(path):
-            raise ffDesignError(f"Missing task panel {name!r}!")
-        return path
+        try:
+            form = Gui.PySideUic.loadUi(path)
+        except Exception as e:
+            raise ffDesignError(f"Cannot load task panel {name!r}: {e}") from e
+        if form is None:
+            raise ffDesignError(f"Cannot load task panel {name!r}!")
+        return form
 
     @classmethod
     def register_search_paths(cls):
         QtCore.QDir.addSearchPath("icons", cls.icons_path)
 
 
-class Log:
-    addon = "FusedFilamentDesign"
-
-    @classmethod
-    def error(cls, msg: str) -> None:
-        App.Console.PrintError(f"[{cls.addon}] {msg}\n")
-
-    @classmethod
-    def warning(cls, msg: str) -> None:
-        App.Console.PrintWarning(f"[{cls.addon}] {msg}\n")
-
-    @classmethod
-    def info(cls, msg: str) -> None:
-        App.Console.PrintMessage(f"[{cls.addon}] {msg}\n")
-
-
-class ffDesignError(Exception):
-    def __init__(self, message: str, *, dialog: bool = True):
-        self.message = message
-        self.dialog = dialog
-        super().__init__(message)
-
-    def emit_to_user(self):
-        Log.error(self.message)
-        if self.dialog:
-            # Also show as a modal dialog
-            QtGui.QMessageBox.warning(None, Log.addon, f"[{Log.addon}] {self.message}")
-
-
-class ffDesignPreconditionError(ffDesignError):
-    """A precondition for using a command was not met."""
-
-    pass
-
-
-def warning_confirm_proceed(message: str, question: str = "Proceed anyway?"):
-    Log.warning(message)
-    reply = QtGui.QMessageBox.question(None, Log.addon, f"[{Log.addon}] {message}\n{question}")
-    if reply != QtGui.QMessageBox.Yes:
-        raise ffDesignError("Aborted on user request due to previous warning", dialog=False)
-
-
-def assert_body(obj):
-    assert obj.TypeId == "PartDesign::Body"
-
-
-def assert_hole(obj):
-    assert obj.TypeId == "PartDesign::Hole"
+class DialogInteraction(CoreUtils.Interaction):
+    """Report errors and ask for confirmation using modal dialogs."""
 
+    def show_error(self, message: str) -> None:
+        QtGui.QMessageBox.warning(None, Log.addon, f"[{Log.addon}] {message}")
 
-def assert_sketch(obj):
-    assert obj.TypeId == "Sketcher::SketchObject"
-
-
-def assert_varset(obj):
-    assert obj.TypeId == "App::VarSet"
+    def confirm(self, message: str, question: str) -> bool:
+        reply = QtGui.QMessageBox.question(None, Log.addon, f"[{Log.addon}] {message}\n{question}")
+        return reply == QtGui.QMessageBox.Yes
 
 
 def get_active_part_design_body_for_feature(obj):
@@ -135,6 +135,32 @@ def check_hole_tool_preconditions() -> bool:
         return False
 
 
+def get_selected_holes() -> list:
+    """Like `get_selected_hole()`, but any number of Hole features may be selected."""
+    if not App.ActiveDocument:
+        raise ffDesignPreconditionError("No active document")
+
+    sel = Gui.Selection.getSelection()
+    if len(sel) <= 1:
+        return [get_selected_hole()]
+
+    for obj in sel:
+        if obj.TypeId != "PartDesign::Hole":
+            raise ffDesignPreconditionError(
+                f"Selected object {obj.Label} is not a PartDesign Hole feature (is a {obj.TypeId!r} instead)."
+            )
+    return sel
+
+
+def activate_body_for_holes(holes: list):
+    """
+    Make the body of the Holes the active body, as for a single feature.
+    Holes across several bodies are treated in their own bodies.
+    """
+    if len({hole.getParent().Name for hole in holes}) == 1:
+        get_active_part_design_body_for_feature(holes[0])
+
+
 def get_selected_sketch():
     if not App.ActiveDocument:
         raise ffDesignPreconditionError("No active document")
@@ -157,135 +183,7 @@ def check_sketch_tool_preconditions() -> bool:
         return False
 
 
-def hole_has_counterbore_maybe(hole) -> bool:
-    """
-    Check if a Hole feature has a counterbore.
-
-    This check is True if it maybe has a counterbore, but it could also be a
-    countersink or counterdrill.
-
-    If this check is False, the hole definitely does not have any counterbore.
-    """
-    assert_hole(hole)
-
-    return hole.HoleCutType != "None"
-
-
-def hole_has_counterbore_sure(hole) -> bool:
-    """
-    Check if a Hole feature has a counterbore.
-
-    This check is True the hole for sure has some type of counterbore.
-
-    If this check is False, the hole may still have a counterbore, but it could
-    also be a countersink, counterdrill or none at all.
-    """
-    assert_hole(hole)
-
-    return hole.HoleCutType in [
-        "Counterbore",
-        "ISO 4762",
-        "ISO 14583 (partial)",
-        "DIN 7984",
-        "ISO 4762 + 7089",
-        "ISO 14583",
-        "ISO 12474",
-    ]
-
-
-def hole_prepare_layer_height_property(hole):
-    assert_hole(hole)
-
-    if "LayerHeight" not in hole.PropertiesList:
-        hole.addProperty("App::PropertyLength", "LayerHeight", group="FusedFilamentDesign")
-        # TODO: Add some configuration setting for the default layer height
-        hole.LayerHeight = "0.2 mm"
-
-
-def get_hole_profile_sketch(hole):
-    assert_hole(hole)
-
-    if len(hole.Profile) < 1:
-        raise ffDesignError("Hole does not have a profile!")
-
-    # TODO: Check for list of profiles
-
-    profile_sketch = hole.Profile[0]
-    if profile_sketch.TypeId != "Sketcher::SketchObject":
-        raise ffDesignError("Hole profile must be a Sketch!")
-
-    return profile_sketch
-
-
-def make_derived_sketch(body, original, suffix: str):
-    assert_body(body)
-    assert_sketch(original)
-
-    sketch = body.newObject("Sketcher::SketchObject", original.Name + suffix)
-    sketch.AttachmentSupport = [(original, "")]
-    sketch.MapMode = "ObjectXY"
-    sketch.Label = original.Label + suffix
-    sketch.recompute()
-    return sketch
-
-
-def get_sketch_circle_indices(sketch):
-    assert_sketch(sketch)
-
-    def is_valid_circle(index, obj):
-        return obj.TypeId == "Part::GeomCircle" and not sketch.getConstruction(index)
-
-    return [i for i, obj in enumerate(sketch.Geometry) if is_valid_circle(i, obj)]
-
-
-def set_shape_binder_styles(binder):
-    binder.ViewObject.LineColor = (1.0, 0.84, 0.0, 0.60)
-    binder.ViewObject.PointColor = (1.0, 0.84, 0.0, 0.60)
-    m = binder.ViewObject.ShapeAppearance[0]
-    m.DiffuseColor = (1.0, 0.84, 0.0, 0.60)
-    binder.ViewObject.ShapeAppearance = (m,)
-    binder.ViewObject.Transparency = 60
-
-
-def make_sketch_offset_shape_binder(body, template, sketch, suffix: str, center_expr: str, rotation_expr: str):
-    assert_body(body)
-    assert_sketch(template)
-    assert_sketch(sketch)
-
-    shape_binder = body.newObject("PartDesign::SubShapeBinder", sketch.Name + suffix)
-    shape_binder.Support = (template, "")
-    shape_binder.Relative = False
-    shape_binder.Visibility = False
-    set_shape_binder_styles(shape_binder)
-    shape_binder.setExpression(
-        "Placement",
-        f"{sketch.Name}.Placement * placement({center_expr}; {rotation_expr})",
-    )
-    shape_binder.Label = sketch.Label + suffix
-    return shape_binder
-
-
-def check_freecad_version(*, min_version) -> bool:
-    current = [int(v.split()[0]) for v in App.Version()[:4]]
-    return current >= min_version
-
-
-def undo_shapebinder_is_safe() -> bool:
-    """
-    Undoing transactions where shape-binders are created is broken in FreeCAD
-    1.0 and a fix will be released in 1.1.
-    """
-    return check_freecad_version(min_version=[1, 1, 0])
-
-
 class ffDesignAboutCommand:
-    def GetResources(self):
-        return {
-            "Pixmap": "icons:ffDesign_Logo.svg",
-            "MenuText": App.Qt.translate("ffDesign", "FusedFilamentDesign"),
-            "ToolTip": App.Qt.translate("ffDesign", "About the FusedFilamentDesign addon."),
-        }
-
     def Activated(self):
         QtGui.QMessageBox.information(
             None,
@@ -298,4 +196,4 @@ class ffDesignAboutCommand:
 
 
 Resources.register_search_paths()
-Gui.addCommand("ffDesign_About", ffDesignAboutCommand())
+CoreUtils.set_interaction(DialogInteraction())
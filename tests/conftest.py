@@ -0,0 +1,74 @@
+"""
+Shared fixtures for the FusedFilamentDesign tests.
+
+The tests need a Python that can import FreeCAD, e.g. the one bundled with
+FreeCAD, and are run from the root of the addon:
+
+    python -m pytest tests
+
+Without FreeCAD, they are skipped.
+"""
+
+import os
+import sys
+
+import pytest
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ADDON_DIR not in sys.path:
+    sys.path.insert(0, ADDON_DIR)
+
+
+@pytest.fixture
+def doc():
+    App = pytest.importorskip("FreeCAD")
+    doc = App.newDocument("ffDesignTest")
+    yield doc
+    App.closeDocument(doc.Name)
+
+
+@pytest.fixture
+def make_hole(doc):
+    """
+    Factory for Holes in a body with a box-shaped base, drilled at the
+    `centers` of their profile sketch.  The profile sketch is placed by
+    `rotation`, so its normal is the axis of the Hole.
+    """
+    import FreeCAD as App
+    import Part
+
+    body = doc.addObject("PartDesign::Body", "Body")
+    box = body.newObject("PartDesign::AdditiveBox", "Base")
+    box.Length = box.Width = box.Height = 40
+    box.Placement.Base = App.Vector(-20, -20, -20)
+
+    def make_hole(
+        centers=((0, 0),),
+        *,
+        rotation=None,
+        threaded: bool = True,
+        thread_size: str = "M3",
+        counterbore: bool = False,
+    ):
+        profile = body.newObject("Sketcher::SketchObject", "HoleProfile")
+        profile.addGeometry([Part.Circle(App.Vector(x, y, 0), App.Vector(0, 0, 1), 1.5) for x, y in centers], False)
+        profile.Placement = App.Placement(App.Vector(0, 0, 0), rotation or App.Rotation())
+
+        hole = body.newObject("PartDesign::Hole", "Hole")
+        hole.Profile = profile
+        hole.Threaded = threaded
+        if threaded:
+            hole.ThreadType = "ISOMetricProfile"
+            hole.ThreadSize = thread_size
+        hole.DepthType = "Dimension"
+        hole.Depth = 6
+        if counterbore:
+            hole.HoleCutType = "Counterbore"
+            hole.HoleCutDiameter = 6
+            hole.HoleCutDepth = 2
+        profile.Visibility = False
+        doc.recompute()
+        return hole
+
+    make_hole.body = body
+    return make_hole
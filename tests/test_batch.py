@@ -0,0 +1,66 @@
+import pytest
+
+App = pytest.importorskip("FreeCAD")
+
+from ffDesign_Core import batch
+from ffDesign_Core.batch import HoleQuery, find_holes
+
+HORIZONTAL = App.Rotation(App.Vector(1, 0, 0), 90)
+OBLIQUE = App.Rotation(App.Vector(1, 0, 0), 45)
+Z = App.Vector(0, 0, 1)
+
+
+def names(holes: list) -> list:
+    return [hole.Name for hole in holes]
+
+
+@pytest.fixture
+def holes(make_hole):
+    return {
+        "m3": make_hole(),
+        "m4_counterbore": make_hole([(10, 0)], thread_size="M4", counterbore=True),
+        "plain_horizontal": make_hole([(-10, 0)], rotation=HORIZONTAL, threaded=False),
+        "m3_oblique": make_hole([(0, 10)], rotation=OBLIQUE),
+    }
+
+
+def test_empty_query_matches_all(make_hole, holes):
+    assert names(find_holes(make_hole.body, HoleQuery(print_direction=Z))) == names(holes.values())
+    # Also across the whole document
+    assert names(find_holes(make_hole.body.Document, HoleQuery(print_direction=Z))) == names(holes.values())
+
+
+def test_thread_size(make_hole, holes):
+    # Spellings of the same size match
+    query = HoleQuery(thread_size="m3", print_direction=Z)
+    assert names(find_holes(make_hole.body, query)) == names([holes["m3"], holes["m3_oblique"]])
+
+
+def test_threaded_and_counterbored(make_hole, holes):
+    query = HoleQuery(threaded=False, print_direction=Z)
+    assert names(find_holes(make_hole.body, query)) == [holes["plain_horizontal"].Name]
+    query = HoleQuery(counterbored=True, print_direction=Z)
+    assert names(find_holes(make_hole.body, query)) == [holes["m4_counterbore"].Name]
+
+
+def test_orientation(make_hole, holes):
+    query = HoleQuery(orientation="horizontal", print_direction=Z)
+    assert names(find_holes(make_hole.body, query)) == [holes["plain_horizontal"].Name]
+    query = HoleQuery(orientation="oblique", print_direction=Z)
+    assert names(find_holes(make_hole.body, query)) == [holes["m3_oblique"].Name]
+    # Printed along Y, the horizontal Hole stands upright
+    query = HoleQuery(orientation="vertical", print_direction=App.Vector(0, 1, 0))
+    assert names(find_holes(make_hole.body, query)) == [holes["plain_horizontal"].Name]
+
+
+def test_untreated_by(make_hole, holes):
+    hole = holes["plain_horizontal"]
+    batch.apply_hole_tool(hole.Document, "teardrop", [hole], {"rotation": "90 deg"})
+    query = HoleQuery(orientation="horizontal", untreated_by="teardrop", print_direction=Z)
+    assert find_holes(make_hole.body, query) == []
+
+
+def test_unsuitable_holes_are_skipped(make_hole, holes):
+    # Only the Hole with a counterbore gets counterbore bridges
+    treated = batch.apply_hole_tool(make_hole.body.Document, "counterbore_bridges", list(holes.values()))
+    assert names(treated) == [holes["m4_counterbore"].Name]
@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+App = pytest.importorskip("FreeCAD")
+
+import Part
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import teardrop
+
+HORIZONTAL = App.Rotation(App.Vector(1, 0, 0), 90)
+
+
+def fast_teardrops(make_hole, hole, rotation="90 deg"):
+    teardrop.make_teardrops(make_hole.body, hole, "90 deg", rotation, fast=True)
+    hole.Document.recompute()
+    return {t.role: t.obj for t in Utils.get_treatments(hole, "teardrop")}
+
+
+@pytest.mark.parametrize("angle", [90, 120])
+def test_teardrop_face_area(angle):
+    radius, angle = 1.5, math.radians(angle)
+    face = teardrop.teardrop_face(App.Vector(0, 0, 0), radius, angle, 0)
+    tip = radius / math.sin(angle / 2)
+    # The kite between the center, the flanks and the tip, plus the rest of the circle
+    area = radius * math.sqrt(tip**2 - radius**2) + radius**2 * (math.pi + angle) / 2
+    assert face.Area == pytest.approx(area)
+
+
+def test_fast_teardrops(make_hole):
+    hole = make_hole([(0, 0), (10, 0)], rotation=HORIZONTAL)
+    treatments = fast_teardrops(make_hole, hole)
+    assert set(treatments) == {"_Teardrops_Profile", "_Teardrops_Binder", "_Teardrops"}
+    assert len(treatments["_Teardrops_Profile"].Shape.Faces) == 2
+    pocket = treatments["_Teardrops"]
+    assert pocket.isValid()
+    assert pocket.Type == "Length"
+    assert pocket.Length.Value == pytest.approx(hole.Depth.Value)
+
+
+@pytest.mark.parametrize("depth_type", ["ThroughAll", "UpToFirst"])
+def test_static_pocket_follows_depth_type(make_hole, depth_type):
+    hole = make_hole(rotation=HORIZONTAL)
+    pocket = fast_teardrops(make_hole, hole)["_Teardrops"]
+    hole.DepthType = depth_type
+    assert Utils.set_static_pocket_depth(pocket, hole)
+    assert pocket.Type == depth_type
+    # Nothing left to change
+    assert not Utils.set_static_pocket_depth(pocket, hole)
+
+
+def test_static_pocket_explicit_length(make_hole):
+    hole = make_hole(rotation=HORIZONTAL)
+    pocket = fast_teardrops(make_hole, hole)["_Teardrops"]
+    assert Utils.set_static_pocket_depth(pocket, hole, "2 mm")
+    assert pocket.Type == "Length"
+    assert pocket.Length.Value == pytest.approx(2)
+
+
+def test_update_static_profile_pocket(make_hole):
+    hole = make_hole(rotation=HORIZONTAL)
+    treatments = fast_teardrops(make_hole, hole)
+    objects = [treatments[role] for role in ["_Teardrops_Profile", "_Teardrops_Binder", "_Teardrops"]]
+    assert not Utils.update_static_profile_pocket(hole, *objects, teardrop.teardrop_faces([hole]))
+
+    hole.TeardropRotation = "270 deg"
+    assert Utils.update_static_profile_pocket(hole, *objects, teardrop.teardrop_faces([hole]))
+    expected = Part.makeCompound(teardrop.teardrop_faces([hole]))
+    assert Utils.static_shape_key(objects[0].Shape) == Utils.static_shape_key(expected)
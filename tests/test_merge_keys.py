@@ -0,0 +1,49 @@
+import types
+
+from ffDesign_Core import merge_keys
+
+
+def length(value: float):
+    return types.SimpleNamespace(Value=value)
+
+
+def fake_hole(*, depth_type="Dimension", depth=6.0, cut_type="None", cut_depth=0.0, layer_height=None):
+    hole = types.SimpleNamespace(
+        DepthType=depth_type,
+        Depth=length(depth),
+        HoleCutType=cut_type,
+        HoleCutDepth=length(cut_depth),
+        PropertiesList=["DepthType", "Depth", "HoleCutType", "HoleCutDepth"],
+    )
+    if layer_height is not None:
+        hole.LayerHeight = length(layer_height)
+        hole.PropertiesList.append("LayerHeight")
+    return hole
+
+
+def test_depth_key():
+    assert merge_keys.teardrop_merge_key(fake_hole(depth=6.0)) == merge_keys.teardrop_merge_key(fake_hole(depth=6.0))
+    assert merge_keys.teardrop_merge_key(fake_hole(depth=6.0)) != merge_keys.teardrop_merge_key(fake_hole(depth=8.0))
+    # Rounding noise does not split groups
+    assert merge_keys.hole_depth_key(fake_hole(depth=6.0)) == merge_keys.hole_depth_key(fake_hole(depth=6.0 + 1e-9))
+    # The depth of Holes through all does not matter
+    through_all = merge_keys.hole_depth_key(fake_hole(depth_type="ThroughAll", depth=6.0))
+    assert through_all == merge_keys.hole_depth_key(fake_hole(depth_type="ThroughAll", depth=8.0))
+
+
+def test_roof_bridge_key():
+    plain = fake_hole(cut_depth=2.0)
+    counterbored = fake_hole(cut_type="Counterbore", cut_depth=2.0)
+    assert merge_keys.roof_bridge_merge_key(plain) == merge_keys.hole_depth_key(plain)
+    assert merge_keys.roof_bridge_merge_key(counterbored) != merge_keys.roof_bridge_merge_key(plain)
+    deeper = fake_hole(cut_type="Counterbore", cut_depth=3.0)
+    assert merge_keys.roof_bridge_merge_key(counterbored) != merge_keys.roof_bridge_merge_key(deeper)
+
+
+def test_counterbore_bridges_key_uses_the_effective_layer_height():
+    untreated = fake_hole(cut_type="Counterbore", cut_depth=2.0)
+    treated = fake_hole(cut_type="Counterbore", cut_depth=2.0, layer_height=merge_keys.DEFAULT_LAYER_HEIGHT)
+    assert merge_keys.counterbore_bridges_merge_key(untreated) == merge_keys.counterbore_bridges_merge_key(treated)
+
+    thicker = fake_hole(cut_type="Counterbore", cut_depth=2.0, layer_height=0.3)
+    assert merge_keys.counterbore_bridges_merge_key(thicker) != merge_keys.counterbore_bridges_merge_key(untreated)
@@ -0,0 +1,101 @@
+import types
+
+import pytest
+
+App = pytest.importorskip("FreeCAD")
+pytest.importorskip("numpy")
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core.orientation import DEFAULT_ROTATION, classify_holes
+
+Z = App.Vector(0, 0, 1)
+
+
+def fake_hole(rotation: App.Rotation):
+    """Only the placement of the profile sketch matters for the classification."""
+    placement = App.Placement(App.Vector(5, 5, 5), rotation)
+    sketch = types.SimpleNamespace(TypeId="Sketcher::SketchObject", getGlobalPlacement=lambda: placement)
+    return types.SimpleNamespace(TypeId="PartDesign::Hole", Profile=[sketch])
+
+
+def classify(rotation: App.Rotation, print_direction=Z, **kwargs):
+    (orientation,) = classify_holes([fake_hole(rotation)], print_direction, **kwargs)
+    return orientation
+
+
+def test_no_holes():
+    assert classify_holes([], Z) == []
+
+
+def test_vertical():
+    orientation = classify(App.Rotation())
+    assert orientation.orientation == "vertical"
+    assert orientation.tilt == pytest.approx(0)
+    assert orientation.rotation is None
+    assert orientation.tool_rotation == DEFAULT_ROTATION
+
+
+def test_upside_down_is_vertical():
+    orientation = classify(App.Rotation(App.Vector(1, 0, 0), 180))
+    assert orientation.orientation == "vertical"
+    assert orientation.tilt == pytest.approx(0)
+
+
+@pytest.mark.parametrize(
+    "axis, angle, up",
+    [
+        # Axis along -Y, global Z is +Y in the sketch
+        (App.Vector(1, 0, 0), 90, 90),
+        # Axis along +X, global Z is -X in the sketch
+        (App.Vector(0, 1, 0), 90, 180),
+        # Axis along -X, global Z is +X in the sketch, not 360°
+        (App.Vector(0, 1, 0), -90, 0),
+        (App.Vector(1, 0, 0), -90, 270),
+    ],
+)
+def test_horizontal(axis, angle, up):
+    orientation = classify(App.Rotation(axis, angle))
+    assert orientation.orientation == "horizontal"
+    assert orientation.tilt == pytest.approx(90)
+    assert orientation.rotation == pytest.approx(up)
+    assert orientation.tool_rotation == f"{orientation.rotation} deg"
+
+
+def test_oblique():
+    orientation = classify(App.Rotation(App.Vector(1, 0, 0), 45))
+    assert orientation.orientation == "oblique"
+    assert orientation.tilt == pytest.approx(45)
+    assert orientation.rotation == pytest.approx(90)
+
+
+def test_tolerance():
+    rotation = App.Rotation(App.Vector(1, 0, 0), 0.5)
+    assert classify(rotation).orientation == "vertical"
+    assert classify(rotation, tolerance=0.1).orientation == "oblique"
+    assert classify(App.Rotation(App.Vector(1, 0, 0), 89.5)).orientation == "horizontal"
+
+
+def test_print_direction():
+    # The length of the print direction does not matter
+    assert classify(App.Rotation(App.Vector(1, 0, 0), 45), App.Vector(0, 0, 5)).tilt == pytest.approx(45)
+    # A part printed lying on its side
+    orientation = classify(App.Rotation(), App.Vector(0, -1, 0))
+    assert orientation.orientation == "horizontal"
+    assert orientation.rotation == pytest.approx(270)
+
+
+def test_matches_single_hole_classification():
+    rotations = [
+        App.Rotation(),
+        App.Rotation(App.Vector(1, 0, 0), 90),
+        App.Rotation(App.Vector(1, 1, 0), 30),
+        App.Rotation(App.Vector(0, 1, 1), 120),
+        App.Rotation(10, 20, 30),
+    ]
+    holes = [fake_hole(rotation) for rotation in rotations]
+    for print_direction in [Z, App.Vector(0, 1, 0), App.Vector(1, 1, 1)]:
+        orientations = classify_holes(holes, print_direction)
+        assert [o.hole for o in orientations] == holes
+        assert [o.orientation for o in orientations] == [
+            Utils.get_hole_orientation(hole, print_direction) for hole in holes
+        ]
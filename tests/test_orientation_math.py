@@ -0,0 +1,85 @@
+import math
+
+import numpy as np
+import pytest
+
+from ffDesign_Core.orientation_math import classify_axes
+
+UP = (0, 0, 1)
+
+
+def about_x(degrees: float) -> np.ndarray:
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    return np.array([[1, 0, 0], [0, c, -s], [0, s, c]])
+
+
+def about_y(degrees: float) -> np.ndarray:
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    return np.array([[c, 0, s], [0, 1, 0], [-s, 0, c]])
+
+
+def classify(rotation: np.ndarray, print_direction=UP, **kwargs) -> tuple:
+    tilts, orientations, angles = classify_axes(np.array([rotation]), print_direction, **kwargs)
+    return float(tilts[0]), str(orientations[0]), float(angles[0])
+
+
+def test_no_axes():
+    tilts, orientations, angles = classify_axes(np.zeros((0, 3, 3)), UP)
+    assert len(tilts) == len(orientations) == len(angles) == 0
+
+
+@pytest.mark.parametrize("rotation", [np.eye(3), about_x(180)])
+def test_vertical(rotation):
+    tilt, orientation, _ = classify(rotation)
+    assert orientation == "vertical"
+    assert tilt == pytest.approx(0)
+
+
+@pytest.mark.parametrize(
+    "rotation, up",
+    [
+        # Axis along -Y, global Z is +Y in the sketch
+        (about_x(90), 90),
+        # Axis along +X, global Z is -X in the sketch
+        (about_y(90), 180),
+        # Axis along -X, global Z is +X in the sketch, not 360°
+        (about_y(-90), 0),
+        (about_x(-90), 270),
+    ],
+)
+def test_horizontal(rotation, up):
+    tilt, orientation, angle = classify(rotation)
+    assert orientation == "horizontal"
+    assert tilt == pytest.approx(90)
+    assert angle == pytest.approx(up)
+
+
+def test_oblique():
+    tilt, orientation, angle = classify(about_x(45))
+    assert orientation == "oblique"
+    assert tilt == pytest.approx(45)
+    assert angle == pytest.approx(90)
+
+
+def test_tolerance():
+    assert classify(about_x(0.5))[1] == "vertical"
+    assert classify(about_x(0.5), tolerance=0.1)[1] == "oblique"
+    assert classify(about_x(89.5))[1] == "horizontal"
+
+
+def test_print_direction():
+    # The length of the print direction does not matter
+    assert classify(about_x(45), (0, 0, 5))[0] == pytest.approx(45)
+    # A part printed lying on its side
+    _, orientation, angle = classify(np.eye(3), (0, -1, 0))
+    assert orientation == "horizontal"
+    assert angle == pytest.approx(270)
+
+
+def test_all_at_once():
+    rotations = [np.eye(3), about_x(90), about_x(45), about_y(-90)]
+    tilts, orientations, angles = classify_axes(np.array(rotations), UP)
+    assert [classify(rotation) for rotation in rotations] == [
+        (float(t), str(o), float(a)) for t, o, a in zip(tilts, orientations, angles)
+    ]
+    assert orientations.tolist() == ["vertical", "horizontal", "oblique", "horizontal"]
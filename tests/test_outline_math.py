@@ -0,0 +1,66 @@
+import math
+
+import pytest
+
+from ffDesign_Core import outline_math
+
+
+def distance(a: tuple, b: tuple) -> float:
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def test_rotate_offset():
+    assert outline_math.rotate_offset((2, 1), 0) == pytest.approx((2, 1))
+    assert outline_math.rotate_offset((2, 1), math.pi / 2) == pytest.approx((-1, 2))
+
+
+@pytest.mark.parametrize("angle", [90, 120])
+def test_teardrop_flanks_touch_the_circle(angle):
+    radius = 1.5
+    offsets = outline_math.teardrop_offsets(radius, math.radians(angle))
+    tip = offsets["Tip"]
+    for name in ["Start", "End"]:
+        point = offsets[name]
+        assert distance(point, (0, 0)) == pytest.approx(radius)
+        # The flank is perpendicular to the radius
+        assert (tip[0] - point[0]) * point[0] + (tip[1] - point[1]) * point[1] == pytest.approx(0)
+    assert offsets["Start"] == pytest.approx((offsets["End"][0], -offsets["End"][1]))
+
+
+def test_teardrop_opening_angle():
+    offsets = outline_math.teardrop_offsets(2, math.radians(90))
+    assert offsets["Tip"] == pytest.approx((2 * math.sqrt(2), 0))
+
+
+def test_roof_bridge_roof_at_clearance():
+    radius, angle, clearance = 1.5, math.radians(45), 0.2
+    offsets = outline_math.roof_bridge_offsets(radius, angle, clearance)
+    assert offsets["RoofStart"][0] == pytest.approx(radius + clearance)
+    assert offsets["RoofEnd"] == pytest.approx((offsets["RoofStart"][0], -offsets["RoofStart"][1]))
+    assert offsets["RoofEnd"][1] > 0
+    assert not outline_math.roof_reaches_tip(radius, angle, clearance)
+
+    # The roof corners lie on the flanks from the circle to the tip
+    tip = (outline_math.roof_bridge_tip_distance(radius, angle), 0)
+    start = offsets["Start"]
+    corner = offsets["RoofEnd"]
+    assert distance(start, corner) + distance(corner, tip) == pytest.approx(distance(start, tip))
+
+
+def test_roof_bridge_clamped_at_tip():
+    radius, angle = 1.5, math.radians(45)
+    tip_distance = outline_math.roof_bridge_tip_distance(radius, angle)
+    assert tip_distance == pytest.approx(radius * math.sqrt(2))
+
+    for clearance in [tip_distance - radius, 5.0]:
+        offsets = outline_math.roof_bridge_offsets(radius, angle, clearance)
+        assert outline_math.roof_reaches_tip(radius, angle, clearance)
+        # No roof left, both corners are the tip
+        assert offsets["RoofStart"] == pytest.approx((tip_distance, 0))
+        assert offsets["RoofEnd"] == pytest.approx((tip_distance, 0))
+
+
+def test_bridge_offset():
+    assert outline_math.bridge_offset(5, 3) == pytest.approx(4)
+    # A counterbore narrower than the bore has no bridges
+    assert outline_math.bridge_offset(1, 3) == 0
@@ -0,0 +1,47 @@
+import pytest
+
+App = pytest.importorskip("FreeCAD")
+
+from ffDesign_Core import overhang_analysis
+
+HORIZONTAL = App.Rotation(App.Vector(1, 0, 0), 90)
+
+
+def test_horizontal_hole(make_hole):
+    hole = make_hole(rotation=HORIZONTAL)
+    analysis = overhang_analysis.analyze_overhangs(make_hole.body)
+    (overhang,) = analysis.holes
+    assert overhang.hole == hole
+    assert overhang.tool == "teardrop"
+    assert 0 < overhang.area <= analysis.total_area
+    assert analysis.other_area == pytest.approx(analysis.total_area - overhang.area)
+
+
+def test_counterbore_gets_roof_bridge(make_hole):
+    make_hole(rotation=HORIZONTAL, counterbore=True)
+    (overhang,) = overhang_analysis.analyze_overhangs(make_hole.body).holes
+    assert overhang.tool == "roof_bridge"
+
+
+def test_vertical_bore_does_not_overhang(make_hole):
+    make_hole()
+    analysis = overhang_analysis.analyze_overhangs(make_hole.body)
+    assert analysis.holes == []
+    # The flat ceiling of the Hole is not part of its bore
+    assert analysis.other_area > 0
+
+
+def test_largest_overhang_first(make_hole):
+    small = make_hole([(0, 0)], rotation=HORIZONTAL)
+    large = make_hole([(-10, 0), (10, 0)], rotation=HORIZONTAL)
+    analysis = overhang_analysis.analyze_overhangs(make_hole.body)
+    assert [overhang.hole for overhang in analysis.holes] == [large, small]
+
+
+def test_tessellation_is_cached(make_hole):
+    make_hole(rotation=HORIZONTAL)
+    shape = make_hole.body.Shape
+    faces = shape.Faces
+    tessellation = overhang_analysis.get_tessellation(shape, faces, 0.05)
+    assert overhang_analysis.get_tessellation(shape, faces, 0.05) is tessellation
+    assert overhang_analysis.get_tessellation(shape, faces, 0.1) is not tessellation
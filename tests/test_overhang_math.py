@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+import pytest
+
+from ffDesign_Core import overhang_math
+
+UP = (0, 0, 1)
+
+
+def tessellation(normals, heights):
+    """One unit-area facet per normal, with its centroid at the height along Z."""
+    normals = np.array(normals, dtype=float)
+    normals /= np.linalg.norm(normals, axis=1)[:, np.newaxis]
+    centroids = np.array([(0, 0, z) for z in heights], dtype=float)
+    n = len(normals)
+    return overhang_math.Tessellation(centroids, normals, np.ones(n), np.arange(n))
+
+
+def test_facets():
+    points = np.array([(0, 0, 0), (2, 0, 0), (0, 2, 0), (1, 0, 0)], dtype=float)
+    triangles = np.array([(0, 1, 2), (0, 2, 1), (0, 1, 3)])
+    result = overhang_math.facets(points, triangles, np.array([4, 5, 6]))
+    # The last triangle is degenerate
+    assert result.faces.tolist() == [4, 5]
+    assert result.areas == pytest.approx([2, 2])
+    assert result.normals == pytest.approx(np.array([(0, 0, 1), (0, 0, -1)]))
+    assert result.centroids[0] == pytest.approx((2 / 3, 2 / 3, 0))
+
+
+def test_overhanging_facets():
+    t = tessellation(
+        [(0, 0, -1), (0, 0, -1), (1, 0, -1), (2, 0, -1), (1, 0, 0), (0, 0, 1)],
+        [0, 5, 5, 5, 5, 5],
+    )
+    overhanging = overhang_math.overhanging_facets(t, UP, math.radians(45))
+    # On the bed, flat ceiling, 45° is not beyond 45°, 27° from the wall, wall, floor
+    assert overhanging.tolist() == [False, True, False, False, False, False]
+    overhanging = overhang_math.overhanging_facets(t, UP, math.radians(20))
+    assert overhanging.tolist() == [False, True, True, True, False, False]
+
+
+def test_overhanging_facets_print_direction():
+    t = tessellation([(0, 0, -1), (0, -1, 0), (0, -1, 0)], [0, 0, 0])
+    t.centroids = np.array([(0, 0, 0), (0, 0, 0), (0, 5, 0)], dtype=float)
+    # Printed along Y, with a length that does not matter
+    overhanging = overhang_math.overhanging_facets(t, (0, 3, 0), math.radians(45))
+    assert overhanging.tolist() == [False, False, True]
+
+
+def test_overhanging_facets_empty():
+    assert len(overhang_math.overhanging_facets(overhang_math.empty_tessellation(), UP, 1)) == 0
+
+
+def test_face_areas():
+    t = overhang_math.Tessellation(
+        np.zeros((4, 3)), np.zeros((4, 3)), np.array([1.0, 2.0, 4.0, 8.0]), np.array([0, 2, 2, 1])
+    )
+    mask = np.array([True, True, True, False])
+    assert overhang_math.face_areas(t, mask, 4).tolist() == [1, 0, 6, 0]
+
+
+def test_nearest_bore():
+    origins = np.array([(0, 0, 0), (10, 0, 0), (10, 0.005, 5)], dtype=float)
+    directions = np.array([(0, 0, 1), (0, 0, 1), (1, 0, 0)], dtype=float)
+    # Anywhere on the axis, in either direction
+    assert overhang_math.nearest_bore((0, 0, -3), (0, 0, -1), origins, directions) == 0
+    assert overhang_math.nearest_bore((10, 0.001, 7), UP, origins, directions) == 1
+    # Off the axis or not parallel to it
+    assert overhang_math.nearest_bore((1, 0, 0), UP, origins, directions) is None
+    assert overhang_math.nearest_bore((0, 0, 0), (0, 1, 0), origins, directions) is None
+    assert overhang_math.nearest_bore((0, 0, 0), UP, origins[:0], directions[:0]) is None
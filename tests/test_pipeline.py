@@ -0,0 +1,82 @@
+import pytest
+
+App = pytest.importorskip("FreeCAD")
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core.pipeline import plan_pipeline
+
+HORIZONTAL = App.Rotation(App.Vector(1, 0, 0), 90)
+OBLIQUE = App.Rotation(App.Vector(1, 0, 0), 45)
+
+
+def steps(plan) -> dict:
+    return {name: [hole.Name for hole in holes] for name, holes in plan.steps}
+
+
+def test_steps_in_pipeline_order(make_hole):
+    hole = make_hole(counterbore=True)
+    plan = plan_pipeline([hole], ["rib_threads", "counterbore_bridges"])
+    assert [name for name, _ in plan.steps] == ["counterbore_bridges", "rib_threads"]
+    assert plan.holes == [hole]
+    assert plan.notes == []
+
+
+def test_roof_bridge_replaces_teardrop(make_hole):
+    hole = make_hole(rotation=HORIZONTAL)
+    plan = plan_pipeline([hole], ["teardrop", "roof_bridge"])
+    assert steps(plan) == {"roof_bridge": [hole.Name]}
+    assert plan.notes == [f"{hole.Label}: Using the roof bridge instead of the teardrop shape."]
+
+
+def test_vertical_hole_keeps_counterbore_bridges(make_hole):
+    hole = make_hole(counterbore=True)
+    plan = plan_pipeline([hole], ["counterbore_bridges", "teardrop"])
+    assert steps(plan) == {"counterbore_bridges": [hole.Name]}
+    assert plan.notes == [f"{hole.Label}: Hole is printed vertically, skipping the teardrop shape."]
+
+
+def test_horizontal_hole_keeps_overhang_tool(make_hole):
+    hole = make_hole(rotation=HORIZONTAL, counterbore=True)
+    plan = plan_pipeline([hole], ["counterbore_bridges", "teardrop", "roof_bridge"])
+    assert steps(plan) == {"roof_bridge": [hole.Name]}
+    assert plan.notes == [
+        f"{hole.Label}: Using the roof bridge instead of the teardrop shape.",
+        f"{hole.Label}: Hole is printed horizontally, skipping the counterbore bridges.",
+    ]
+
+
+def test_conflicts_follow_print_direction(make_hole):
+    hole = make_hole(counterbore=True)
+    # Printed on its side, the vertical Hole becomes a horizontal one
+    plan = plan_pipeline([hole], ["counterbore_bridges", "teardrop"], print_direction=App.Vector(0, 1, 0))
+    assert steps(plan) == {"teardrop": [hole.Name]}
+
+
+def test_oblique_hole_needs_a_choice(make_hole):
+    hole = make_hole(rotation=OBLIQUE, counterbore=True)
+    with pytest.raises(Utils.ffDesignError):
+        plan_pipeline([hole], ["counterbore_bridges", "teardrop"])
+    # Without a conflict, oblique Holes are fine
+    assert steps(plan_pipeline([hole], ["teardrop"])) == {"teardrop": [hole.Name]}
+
+
+def test_unsuitable_holes_are_skipped_per_tool(make_hole):
+    threaded = make_hole()
+    plain = make_hole(threaded=False)
+    plan = plan_pipeline([threaded, plain], ["teardrop", "rib_threads"])
+    assert steps(plan) == {"teardrop": [threaded.Name, plain.Name], "rib_threads": [threaded.Name]}
+    assert len(plan.notes) == 1
+    assert plan.notes[0].startswith(f"{plain.Label}: Skipping the thread forming ribs")
+
+
+def test_holes_without_counterbore_are_skipped(make_hole):
+    hole = make_hole()
+    plan = plan_pipeline([hole], ["counterbore_bridges"])
+    assert plan.steps == []
+    assert plan.notes[0].startswith(f"{hole.Label}: Skipping the counterbore bridges")
+
+
+def test_unknown_tool(make_hole):
+    hole = make_hole()
+    with pytest.raises(Utils.ffDesignError):
+        plan_pipeline([hole], ["teardrops"])
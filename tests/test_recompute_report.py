@@ -0,0 +1,33 @@
+import pytest
+
+App = pytest.importorskip("FreeCAD")
+
+import Part
+import Sketcher
+
+from ffDesign_Core import recompute_report
+
+
+def test_solve_leaves_the_document_alone(doc):
+    sketch = doc.addObject("Sketcher::SketchObject", "Sketch")
+    sketch.addGeometry(Part.Circle(App.Vector(0, 0, 0), App.Vector(0, 0, 1), 2), False)
+    sketch.addConstraint(Sketcher.Constraint("Coincident", 0, 3, -1, 1))
+    doc.recompute()
+    names = [obj.Name for obj in doc.Objects]
+    n_documents = len(App.listDocuments())
+
+    (cost,) = recompute_report.profile_recompute(doc, [sketch])
+    assert cost.solver is not None
+    # Only the radius is free
+    assert cost.dof == 1
+    assert [obj.Name for obj in doc.Objects] == names
+    assert len(App.listDocuments()) == n_documents
+    assert App.ActiveDocument == doc
+    assert not any(obj.isTouched() for obj in doc.Objects)
+
+
+def test_table_lists_dof():
+    cost = recompute_report.RecomputeCost("Sketch", "Sketch", "Sketcher::SketchObject", 0.5, 0.1, 3)
+    header, line = recompute_report.format_table([cost]).splitlines()
+    assert "DoF" in header
+    assert line.split()[-2:] == ["3", "-"]
@@ -0,0 +1,94 @@
+import types
+
+import pytest
+
+App = pytest.importorskip("FreeCAD")
+
+import Part
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import resync, teardrop
+
+
+def fake_geometry(circles: list):
+    return types.SimpleNamespace(circles=circles, tag=lambda index: f"tag{index}")
+
+
+PROFILE = types.SimpleNamespace(Name="Sketch", Label="Profile")
+
+
+def test_fingerprint_is_read_from_the_object():
+    obj = types.SimpleNamespace(PropertiesList=["ProfileCircleTags"], ProfileCircleTags=["a", "b"], Label="Teardrops")
+    assert resync.profile_circle_tags(obj, PROFILE, fake_geometry([0, 1]), []) == ["a", "b"]
+
+
+def test_legacy_objects_are_adopted_by_their_references():
+    obj = types.SimpleNamespace(PropertiesList=[], Label="Teardrops")
+    expressions = [
+        "Sketch.Geometry[2].Center.x",
+        "Sketch.Geometry[2].Center.y",
+        "Sketch.Geometry[0].Center.x",
+        "Sketch.Geometry[0].Center.y",
+        # Other sketches do not count
+        "Sketch001.Geometry[1].Center.x",
+        "Sketch.Geometry[2].Center.x",
+    ]
+    tags = resync.profile_circle_tags(obj, PROFILE, fake_geometry([0, 2]), expressions)
+    assert tags == ["tag2", "tag0", "tag2"]
+
+
+def test_legacy_objects_need_their_circles():
+    obj = types.SimpleNamespace(PropertiesList=[], Label="Teardrops")
+    with pytest.raises(Utils.ffDesignError):
+        resync.profile_circle_tags(obj, PROFILE, fake_geometry([0]), ["Sketch.Geometry[3].Center.x"])
+
+
+def test_result_changed():
+    assert not resync.ResyncResult("Sketch").changed
+    assert resync.ResyncResult("Sketch", renumbered=1).changed
+    assert resync.ResyncResult("Profile", regenerated=True).changed
+    assert str(resync.ResyncResult("Sketch", 1, 2, 3)) == "Sketch: 1 added, 2 removed, 3 renumbered"
+
+
+def circle_tags(profile) -> list:
+    geometry = Utils.SketchGeometry(profile)
+    return [geometry.tag(index) for index in geometry.circles]
+
+
+@pytest.fixture
+def teardrop_hole(make_hole):
+    hole = make_hole([(0, 0), (10, 0), (0, 10)])
+    teardrop.make_teardrops(make_hole.body, hole, "90 deg", "90 deg")
+    hole.Document.recompute()
+    return hole
+
+
+def teardrop_result(results: list, hole):
+    (sketch,) = [t.obj for t in Utils.get_treatments(hole) if t.role == "_Teardrops"]
+    return sketch, next((r for r in results if r.name == sketch.Label), None)
+
+
+def test_resync_without_changes(teardrop_hole):
+    body = teardrop_hole.getParent()
+    assert resync.resync_hole(body, teardrop_hole) == []
+
+
+def test_resync_added_and_removed_circles(teardrop_hole):
+    body = teardrop_hole.getParent()
+    profile = Utils.get_hole_profile_sketch(teardrop_hole)
+    kept = circle_tags(profile)[1:]
+    sketch, _ = teardrop_result([], teardrop_hole)
+    n_geometry = len(sketch.Geometry)
+    profile.delGeometry(0)
+    profile.addGeometry(Part.Circle(App.Vector(10, 10, 0), App.Vector(0, 0, 1), 1.5), False)
+    teardrop_hole.Document.recompute()
+
+    _, result = teardrop_result(resync.resync_hole(body, teardrop_hole), teardrop_hole)
+    # The kept circles moved to lower indices, but are bound to the profile
+    # digest and need no renumbering
+    assert (result.added, result.removed, result.renumbered) == (1, 1, 0)
+    assert list(sketch.ProfileCircleTags) == kept + [circle_tags(profile)[-1]]
+    assert len(sketch.Geometry) == n_geometry
+
+    # Nothing left to do
+    assert resync.resync_hole(body, teardrop_hole) == []
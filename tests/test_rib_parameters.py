@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+pytest.importorskip("FreeCAD")
+
+from ffDesign_Core.rib_parameters import RibParameterDatabase
+
+
+def write_layer(path, layer: dict) -> str:
+    path.write_text(json.dumps(layer))
+    return str(path)
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A database reading the shipped parameters and a site and a user layer from `tmp_path`."""
+    site = tmp_path / "site.json"
+    user = tmp_path / "user.json"
+    db = RibParameterDatabase()
+    monkeypatch.setattr(db, "layer_paths", lambda: [RibParameterDatabase.builtin_path, str(site), str(user)])
+    return db, site, user
+
+
+def test_database_builtin_layer(database):
+    db, _, _ = database
+    assert db["M3"].outer_diameter == 3.4
+    assert db["M3"].name == "M3"
+    assert "M3x0.5" in db
+    assert "M3x0.35" not in db
+    with pytest.raises(KeyError):
+        db["M3x0.35"]
+
+
+def test_database_layers_override_single_values(database):
+    db, site, user = database
+    write_layer(site, {"M3x0.5": {"outer_diameter": 3.5, "rib_diameter": 1.5}})
+    write_layer(user, {"m3": {"rib_diameter": 1.6}})
+
+    rib_param = db.get("M3")
+    # The site layer is merged under the spelling of the built-in size
+    assert rib_param.outer_diameter == 3.5
+    # The user layer wins over the site layer
+    assert rib_param.rib_diameter == 1.6
+    # Values not overridden stay with the shipped ones
+    assert rib_param.core_bore == 2.5
+
+
+def test_database_new_sizes(database):
+    db, site, _ = database
+    complete = {
+        "normative": 10,
+        "core_diameter": 8.16,
+        "core_bore": 8.5,
+        "entrance_depth": 1.6,
+        "outer_diameter": 10.6,
+        "rib_engagement": 0.6,
+        "rib_diameter": 3.0,
+    }
+    write_layer(site, {"M10x1.5": complete, "M12": {"normative": 12}})
+
+    assert db["M10"].core_bore == 8.5
+    # Incomplete sizes are left out instead of failing all lookups
+    assert "M12" not in db
+    assert "M10" in db.sizes()
+
+
+def test_database_ignores_broken_layers(database):
+    db, site, _ = database
+    site.write_text("{not json")
+    assert db["M4"].outer_diameter == 4.4
+
+
+def test_database_reload(database):
+    db, site, _ = database
+    assert db["M5"].outer_diameter == 5.4
+    write_layer(site, {"M5": {"outer_diameter": 5.6}})
+    # Loaded once, until reloaded
+    assert db["M5"].outer_diameter == 5.4
+    db.reload()
+    assert db["M5"].outer_diameter == 5.6
+
+
+def test_site_layer_from_environment(monkeypatch, tmp_path):
+    site = str(tmp_path / "site.json")
+    monkeypatch.setenv("FFDESIGN_SITE_RIB_PARAMETERS", site)
+    assert RibParameterDatabase.layer_paths()[1] == site
@@ -0,0 +1,81 @@
+import dataclasses
+import json
+
+import pytest
+
+App = pytest.importorskip("FreeCAD")
+
+from ffDesign_Core import rib_template_cache, rib_threads
+from ffDesign_Core.rib_parameters import RIB_PARAMETERS
+from ffDesign_Core.rib_template_cache import RibTemplateCache, cache_key
+
+M3 = RIB_PARAMETERS["M3"]
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    """A fresh cache used by `make_rib_template`, keeping its disk file in `tmp_path`."""
+    cache = RibTemplateCache()
+    monkeypatch.setattr(rib_threads, "RIB_TEMPLATE_CACHE", cache)
+    monkeypatch.setattr(RibTemplateCache, "disk_path", staticmethod(lambda: str(tmp_path / "cache.json")))
+    monkeypatch.setattr(RibTemplateCache, "use_disk", staticmethod(lambda: False))
+    return cache
+
+
+def make_template(doc, rib_param=M3):
+    sketch = doc.addObject("Sketcher::SketchObject", "Template")
+    rib_threads.make_rib_template(sketch, rib_param)
+    assert sketch.solve() == 0
+    return sketch
+
+
+def test_cache_key():
+    # Only parameters of the sketch are part of the key
+    assert cache_key(dataclasses.replace(M3, entrance_depth=M3.entrance_depth + 1, core_bore=5)) == cache_key(M3)
+    assert cache_key(dataclasses.replace(M3, outer_diameter=M3.outer_diameter + 0.1)) != cache_key(M3)
+    assert cache_key(M3).startswith(f"r{rib_template_cache.TEMPLATE_REVISION}:")
+
+
+def test_copy_matches_built_template(doc, cache):
+    built = make_template(doc)
+    assert cache.get(M3) is not None
+    copied = make_template(doc)
+    assert len(copied.Geometry) == len(built.Geometry)
+    assert [c.Type for c in copied.Constraints] == [c.Type for c in built.Constraints]
+    assert [copied.getConstruction(i) for i in range(len(copied.Geometry))] == [
+        built.getConstruction(i) for i in range(len(built.Geometry))
+    ]
+    doc.recompute()
+    assert len(copied.Shape.Edges) == len(built.Shape.Edges)
+    assert copied.Shape.Length == pytest.approx(built.Shape.Length)
+
+
+def test_other_parameters_are_not_copied(doc, cache):
+    make_template(doc)
+    assert cache.get(dataclasses.replace(M3, rib_diameter=M3.rib_diameter + 0.2)) is None
+
+
+def test_only_empty_sketches_are_filled(doc, cache):
+    make_template(doc)
+    sketch = make_template(doc)
+    assert not cache.instantiate(sketch, M3)
+
+
+def test_disk_round_trip(doc, cache, monkeypatch, tmp_path):
+    monkeypatch.setattr(RibTemplateCache, "use_disk", staticmethod(lambda: True))
+    built = make_template(doc)
+    entries = json.loads((tmp_path / "cache.json").read_text())
+    assert list(entries) == [cache_key(M3)]
+
+    restored = RibTemplateCache()
+    cached = restored.get(M3)
+    assert cached is not None
+    assert len(cached.geometry) == len(built.Geometry)
+    assert len(cached.constraints) == len(built.Constraints)
+
+
+def test_disk_entries_of_other_revisions_are_ignored(cache, monkeypatch, tmp_path):
+    monkeypatch.setattr(RibTemplateCache, "use_disk", staticmethod(lambda: True))
+    key = "r0:" + cache_key(M3).split(":", 1)[1]
+    (tmp_path / "cache.json").write_text(json.dumps({key: {"geometry": [], "construction": [], "constraints": []}}))
+    assert RibTemplateCache().get(M3) is None
@@ -0,0 +1,51 @@
+import pytest
+
+App = pytest.importorskip("FreeCAD")
+
+import ffDesign_Core.utils as Utils
+from ffDesign_Core import roof_bridge
+
+HORIZONTAL = App.Rotation(App.Vector(1, 0, 0), 90)
+
+
+def make_roof_bridges(make_hole, hole, clearance: str, **kwargs):
+    roof_bridge.make_roof_bridges(
+        make_hole.body,
+        hole,
+        angle="45 deg",
+        rotation="90 deg",
+        do_counterbore=False,
+        bridge_clearance=clearance,
+        **kwargs,
+    )
+    hole.Document.recompute()
+
+
+@pytest.mark.parametrize("closed_form", [False, True])
+def test_roof_bridges(make_hole, closed_form):
+    hole = make_hole([(0, 0), (10, 0)], rotation=HORIZONTAL)
+    make_roof_bridges(make_hole, hole, "0.2 mm", closed_form=closed_form)
+    (sketch,) = [
+        t.obj
+        for t in Utils.get_treatments(hole, "roof_bridge")
+        if t.role == "_RoofBridge" and t.obj.TypeId == "Sketcher::SketchObject"
+    ]
+    assert sketch.isValid()
+    assert len(sketch.Shape.Wires) == 2
+
+
+def test_closed_form_refuses_clearance_at_the_tip(make_hole):
+    hole = make_hole(rotation=HORIZONTAL)
+    # The tip of the M3 bore is 1.5 mm * (sqrt(2) - 1) above the circle
+    with pytest.raises(Utils.ffDesignPreconditionError):
+        make_roof_bridges(make_hole, hole, "1 mm", closed_form=True)
+    assert Utils.get_treatments(hole, "roof_bridge") == []
+
+
+def test_fast_mode_leaves_the_tip(make_hole):
+    hole = make_hole(rotation=HORIZONTAL)
+    make_roof_bridges(make_hole, hole, "1 mm", fast=True)
+    (profile,) = [t.obj for t in Utils.get_treatments(hole, "roof_bridge") if t.role == "_RoofBridge_Profile"]
+    (face,) = profile.Shape.Faces
+    # Arc and two flanks, no roof line
+    assert len(face.Edges) == 3
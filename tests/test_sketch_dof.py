@@ -0,0 +1,69 @@
+import types
+
+from ffDesign_Core import sketch_dof
+from ffDesign_Core.sketch_dof import GEO_UNDEF
+
+LINE = types.SimpleNamespace(TypeId="Part::GeomLineSegment")
+CIRCLE = types.SimpleNamespace(TypeId="Part::GeomCircle")
+
+
+def constraint(type_: str, first=GEO_UNDEF, first_pos=0, second=GEO_UNDEF, second_pos=0, third=GEO_UNDEF, **kwargs):
+    fields = dict(
+        Type=type_, First=first, FirstPos=first_pos, Second=second, SecondPos=second_pos, Third=third, Driving=True
+    )
+    fields.update(kwargs)
+    return types.SimpleNamespace(**fields)
+
+
+def test_unconstrained():
+    assert sketch_dof.degrees_of_freedom([LINE, CIRCLE], []) == 7
+    assert sketch_dof.degrees_of_freedom([], []) == 0
+
+
+def test_fully_constrained_circle():
+    constraints = [
+        constraint("Coincident", 0, 3, -1, 1),
+        constraint("Diameter", 0),
+    ]
+    assert sketch_dof.degrees_of_freedom([CIRCLE], constraints) == 0
+
+
+def test_reference_and_inactive_constraints_do_not_count():
+    constraints = [
+        constraint("Diameter", 0, Driving=False),
+        constraint("Radius", 0, IsActive=False),
+    ]
+    assert sketch_dof.degrees_of_freedom([CIRCLE], constraints) == 3
+
+
+def test_block():
+    assert sketch_dof.degrees_of_freedom([LINE, CIRCLE], [constraint("Block", 1)]) == 4
+
+
+def test_tangent_at_vertices():
+    geometry = [LINE, LINE]
+    assert sketch_dof.constraint_equations(constraint("Tangent", 0, 0, 1, 0), geometry) == 1
+    assert sketch_dof.constraint_equations(constraint("Tangent", 0, 2, 1, 0), geometry) == 2
+    assert sketch_dof.constraint_equations(constraint("Tangent", 0, 2, 1, 1), geometry) == 3
+    assert sketch_dof.constraint_equations(constraint("Angle", 0, 0, 1, 0, third=2), geometry) == 3
+
+
+def test_unknown_types():
+    assert sketch_dof.degrees_of_freedom([types.SimpleNamespace(TypeId="Part::GeomBSplineCurve")], []) is None
+    assert sketch_dof.degrees_of_freedom([LINE], [constraint("InternalAlignment", 0)]) is None
+
+
+def test_over_constrained_is_not_negative():
+    constraints = [constraint("Coincident", 0, 3, -1, 1), constraint("Coincident", 0, 3, -1, 1)]
+    assert sketch_dof.degrees_of_freedom([CIRCLE], constraints) == 0
+
+
+def test_external_to_internal():
+    # The axes and undefined fields stay
+    assert sketch_dof.external_to_internal(-1, 5) == -1
+    assert sketch_dof.external_to_internal(-2, 5) == -2
+    assert sketch_dof.external_to_internal(GEO_UNDEF, 5) == GEO_UNDEF
+    assert sketch_dof.external_to_internal(3, 5) == 3
+    # External geometry follows the internal one
+    assert sketch_dof.external_to_internal(-3, 5) == 5
+    assert sketch_dof.external_to_internal(-4, 5) == 6
@@ -0,0 +1,23 @@
+import pytest
+
+from ffDesign_Core.thread_sizes import canonical_thread_size
+
+
+@pytest.mark.parametrize(
+    "thread_size, canonical",
+    [
+        ("M3", "M3"),
+        ("M3x0.5", "M3"),
+        ("m3 X 0.5", "M3"),
+        (" M2.5 ", "M2.5"),
+        ("M3.0", "M3"),
+        ("M8x1.25", "M8"),
+        ("M8x1.0", "M8x1"),
+        ("M8x1", "M8x1"),
+        ("M3x0.35", "M3x0.35"),
+        # Not ISO metric, only stripped
+        (" 1/4-20 UNC ", "1/4-20 UNC"),
+    ],
+)
+def test_canonical_thread_size(thread_size, canonical):
+    assert canonical_thread_size(thread_size) == canonical
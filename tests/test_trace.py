@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+pytest.importorskip("FreeCAD")
+
+import ffDesign_Core.utils as Utils
+
+
+def read_events(path) -> list:
+    # The closing bracket of the event array is optional
+    return json.loads(path.read_text().rstrip().rstrip(",") + "]")
+
+
+def test_command_span_keeps_its_detail(tmp_path):
+    path = tmp_path / "trace.json"
+    spans = [
+        Utils.Span("Add teardrops", "Document", 0, 1.0, 2.0),
+        Utils.Span("tessellate", "12 faces", 1, 1.1, 1.5),
+        Utils.Span("recompute", None, 1, 1.5, 1.9),
+    ]
+    Utils.write_trace(str(path), spans, {"sketches": 3})
+    command, tessellate, recompute = read_events(path)
+    assert command["args"] == {"detail": "Document", "sketches": 3}
+    assert tessellate["args"] == {"detail": "12 faces"}
+    assert "args" not in recompute
+    assert command["dur"] == 1000000
+
+
+def test_appends_to_existing_trace(tmp_path):
+    path = tmp_path / "trace.json"
+    Utils.write_trace(str(path), [Utils.Span("first", None, 0, 0.0, 1.0)], {})
+    Utils.write_trace(str(path), [Utils.Span("second", None, 0, 1.0, 2.0)], {})
+    assert [event["name"] for event in read_events(path)] == ["first", "second"]